@@ -1,18 +1,23 @@
-import mysql.connector
+import re
+import time
 from mysql.connector import Error
 from tkinter import *
-from tkinter import ttk, messagebox
-import os
-from dotenv import load_dotenv
+from tkinter import ttk, messagebox, filedialog
+from catalog import SchemaCatalog
+from db import DatabasePool
+from executor import QueryExecutor
+from exporter import Exporter
+from importer import BulkImporter
+from paging import GridPager
+from profiler import Profiler
+from search import RESULT_COLUMNS, SEARCH_TABLES, TrigramIndex, merge_results, search_fulltext
+from service import (ADD_MOVIE_FIELDS, CANNED_QUERIES, PURGE_BATCH, PURGE_INACTIVE_DAYS, PURGE_PAUSE_MS,
+                     USER_BATCH_LIMIT, CineBaseService, log_condition, user_id_condition)
+from virtual_grid import VirtualGrid, display
 
-# Load environment variables
-load_dotenv()
 
-DB_HOST = os.getenv("DB_HOST", "localhost")
-DB_PORT = int(os.getenv("DB_PORT", "3306"))
-DB_USER = os.getenv("DB_USER", "root")
-DB_PASS = os.getenv("DB_PASS", "")
-DB_NAME = os.getenv("DB_NAME", "cinebase")
+SEARCH_DEBOUNCE_MS = 250
+LOG_TAIL_MS = 2000          # Review_Log poll interval of the live tail
 
 
 class CineBaseApp:
@@ -20,27 +25,106 @@ class CineBaseApp:
         self.root = root
         self.root.title("🎬 CineBase Database GUI")
         self.root.geometry("1100x700")
-
-        self.conn = None
-        self.cursor = None
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # Every statement is timed; slow ones are EXPLAINed on a connection of their own
+        self.profiler = Profiler()
+        self.db_pool = DatabasePool(profiler=self.profiler)
+        self.profiler.connect = lambda: self.db_pool.dedicated_connection(profile=False)
+        self.catalog = SchemaCatalog()
+        # All data operations go through the service layer, which the API server shares
+        self.service = CineBaseService(self.db_pool, self.catalog)
+        self.service.on_invalidate.append(self.tables_changed)
+        self.result_cache = self.service.cache
+        self.search_index = TrigramIndex()
+        # All queries run on the executor's worker threads with connections from the pool
+        self.executor = QueryExecutor(self.root, self.db_pool)
+        self.executor.listeners.append(self.show_activity)
         self.role = StringVar(value="Admin")  # Default role
-
-        self.connect_db()
+        self.status = StringVar(value="")
+        self.cache_status = StringVar(value="")
+        self.db_status = StringVar(value="")
+        self.db_state = "connecting"    # "connecting", "connected" or "offline"
+        self.table_names = []
+
+        # Tabs other than Tables are built when first selected; until then their widgets do not exist
+        self.tab_builders = {}          # tab widget name -> builder of a tab not built yet
+        self.table_pager = self.query_pager = self.log_pager = None
+        self.importer = None
+        self.log_tail = None
+        self.log_tailing = BooleanVar(value=False)
+        self._tail_after = None
+
+        # The window is shown straight away; the database is reached in the background
         self.build_gui()
+        self.connect_db()
 
     # ---------------- Database Connection ----------------
     def connect_db(self):
-        try:
-            self.conn = mysql.connector.connect(
-                host=DB_HOST,
-                port=DB_PORT,
-                user=DB_USER,
-                password=DB_PASS,
-                database=DB_NAME
-            )
-            self.cursor = self.conn.cursor()
-        except Error as e:
-            messagebox.showerror("Database Error", f"Could not connect:\n{e}")
+        """Reach the database in the background, loading the table list; the toolbar shows the outcome"""
+        config = self.db_pool.config
+        self.db_state = "connecting"
+        self.db_status.set(f"⏳ Connecting to {config.get('host')}...")
+        self.reconnect_btn.config(state=DISABLED)
+        self.refresh_tables()
+
+    def show_connection(self, error=None, version=None):
+        config = self.db_pool.config
+        if error is None:
+            self.db_state = "connected"
+            self.db_status.set(f"🟢 MySQL {version} on {config.get('host')}/{config.get('database')}")
+            self.reconnect_btn.config(state=DISABLED)
+        else:
+            self.db_state = "offline"
+            self.db_status.set(f"🔴 Not connected to {config.get('host')}")
+            self.reconnect_btn.config(state=NORMAL)
+
+    def show_activity(self, running):
+        stats = self.db_pool.stats()
+        pool = f"Pool {stats['in_use']}/{stats['size']} in use, {stats['reconnects']} reconnects"
+        if running:
+            self.status.set(f"⏳ {running} quer{'y' if running == 1 else 'ies'} running | {pool}")
+        else:
+            self.status.set(pool)
+        self.show_cache_stats()
+
+    def show_cache_stats(self):
+        stats = self.result_cache.stats()
+        self.cache_status.set(
+            f"Cache {stats['hits']} hits / {stats['misses']} misses ({stats['hit_rate']:.0%}), "
+            f"{stats['entries']} entries, {stats['bytes'] / 1e6:.1f} MB")
+
+    def invalidate_cache(self, tables):
+        """Forget cached results that a write made outside the service (an import) may have changed"""
+        self.service.invalidate(tables)
+        self.show_cache_stats()
+
+    def tables_changed(self, affected):
+        """Service listener; called on the worker thread that made the write"""
+        if affected & {t.lower() for t in SEARCH_TABLES}:
+            self.search_index.stale = True     # rebuilt on the next search
+
+    def clear_cache(self):
+        self.result_cache.clear()
+        self.show_cache_stats()
+
+    def cancel_queries(self):
+        self.executor.cancel_all()
+        if self.importer is not None:
+            self.importer.stop()      # LOAD DATA runs outside the executor's connections
+
+    def show_paging_error(self, e):
+        messagebox.showerror("Error", f"Could not fetch more rows: {e}")
+
+    def on_close(self):
+        if self.importer is not None:
+            self.importer.stop()
+        self.stop_tail()
+        for pager in (self.table_pager, self.query_pager, self.log_pager):
+            if pager is not None and pager.pager is not None:
+                pager.pager.close()
+        self.executor.shutdown()
+        self.root.destroy()
 
     # ---------------- GUI Layout ----------------
     def build_gui(self):
@@ -51,24 +135,48 @@ class CineBaseApp:
         role_menu = ttk.Combobox(top_frame, textvariable=self.role, values=["Admin", "User"], state="readonly", width=10)
         role_menu.pack(side=LEFT, padx=5)
         role_menu.bind("<<ComboboxSelected>>", lambda e: self.refresh_role())
-
-        tab_control = ttk.Notebook(self.root)
-
-        self.table_tab = ttk.Frame(tab_control)
-        self.proc_tab = ttk.Frame(tab_control)
-        self.query_tab = ttk.Frame(tab_control)
-        self.log_tab = ttk.Frame(tab_control)
-
-        tab_control.add(self.table_tab, text="📋 Tables")
-        tab_control.add(self.proc_tab, text="⚙️ Procedures / Functions")
-        tab_control.add(self.query_tab, text="🔍 Custom Queries")
-        tab_control.add(self.log_tab, text="🪵 Trigger Log")
-        tab_control.pack(expand=1, fill="both")
-
-        self.build_table_tab()
-        self.build_proc_tab()
-        self.build_query_tab()
-        self.build_log_tab()
+        Label(top_frame, textvariable=self.db_status, font=("Arial", 10)).pack(side=LEFT, padx=10)
+        self.reconnect_btn = Button(top_frame, text="Reconnect", command=self.connect_db, state=DISABLED)
+        self.reconnect_btn.pack(side=LEFT, padx=5)
+
+        Button(top_frame, text="Cancel Queries", command=self.cancel_queries).pack(side=RIGHT, padx=10)
+        Label(top_frame, textvariable=self.status, font=("Arial", 10)).pack(side=RIGHT, padx=5)
+        Button(top_frame, text="Clear Cache", command=self.clear_cache).pack(side=RIGHT, padx=5)
+        Label(top_frame, textvariable=self.cache_status, font=("Arial", 10)).pack(side=RIGHT, padx=5)
+
+        self.tab_control = ttk.Notebook(self.root)
+        self.table_tab = self.add_tab("📋 Tables", self.build_table_tab)
+        self.search_tab = self.add_tab("🔎 Search", self.build_search_tab)
+        self.proc_tab = self.add_tab("⚙️ Procedures / Functions", self.build_proc_tab)
+        self.query_tab = self.add_tab("🔍 Custom Queries", self.build_query_tab)
+        self.log_tab = self.add_tab("🪵 Trigger Log", self.build_log_tab)
+        self.import_tab = self.add_tab("📥 Bulk Import", self.build_import_tab)
+        self.perf_tab = self.add_tab("⏱️ Performance", self.build_perf_tab)
+        self.tab_control.pack(expand=1, fill="both")
+        self.tab_control.bind("<<NotebookTabChanged>>", lambda e: self.tab_changed())
+
+        self.ensure_tab(self.table_tab)
+
+    def add_tab(self, text, builder):
+        """An empty tab; builder() fills it in when the tab is first selected"""
+        tab = ttk.Frame(self.tab_control)
+        self.tab_control.add(tab, text=text)
+        self.tab_builders[str(tab)] = builder
+        return tab
+
+    def ensure_tab(self, tab):
+        builder = self.tab_builders.pop(str(tab), None)
+        if builder is not None:
+            builder()
+
+    def tab_built(self, tab):
+        return str(tab) not in self.tab_builders
+
+    def tab_changed(self):
+        tab = self.tab_control.select()
+        self.ensure_tab(tab)
+        if tab == str(self.perf_tab):
+            self.refresh_performance()
 
     # ---------------- Role Refresh ----------------
     def refresh_role(self):
@@ -79,11 +187,12 @@ class CineBaseApp:
         state = NORMAL if is_admin else DISABLED
         for btn in [self.add_btn, self.edit_btn, self.delete_btn]:
             btn.config(state=state)
+        if self.tab_built(self.import_tab) and self.importer is None:
+            self.import_btn.config(state=state)
 
-        # Refresh Procedures tab (rebuild for current role)
-        for widget in self.proc_tab.winfo_children():
-            widget.destroy()
-        self.build_proc_tab()
+        # Show or hide the admin-only procedures; the tab and its output stay as they are
+        if self.tab_built(self.proc_tab):
+            self.show_proc_role()
 
     # ---------------- Tab 1: Table Browser ----------------
     def build_table_tab(self):
@@ -94,7 +203,6 @@ class CineBaseApp:
 
         self.table_combo = ttk.Combobox(frame_top, state="readonly")
         self.table_combo.pack(side=LEFT, padx=10)
-        self.refresh_tables()
 
         Button(frame_top, text="Load", command=self.load_table_data).pack(side=LEFT, padx=5)
         self.add_btn = Button(frame_top, text="Add Row", command=self.add_row)
@@ -104,41 +212,78 @@ class CineBaseApp:
         self.delete_btn = Button(frame_top, text="Delete Row", command=self.delete_row)
         self.delete_btn.pack(side=LEFT, padx=5)
         Button(frame_top, text="Refresh Tables", command=self.refresh_tables).pack(side=LEFT, padx=5)
+        Button(frame_top, text="Export...", command=self.export_table).pack(side=LEFT, padx=5)
 
-        self.tree = ttk.Treeview(self.table_tab)
-        self.tree.pack(fill=BOTH, expand=True, padx=10, pady=10)
+        self.loaded_table = None        # table currently shown in the grid
+        self.table_grid = VirtualGrid(self.table_tab)
+        self.table_grid.pack(fill=BOTH, expand=True, padx=10, pady=10)
+        self.table_pager = GridPager(self.table_grid, self.executor, on_error=self.show_paging_error,
+                                     profiler=self.profiler, name="Tables")
 
     def refresh_tables(self):
-        try:
-            self.cursor.execute("SHOW TABLES;")
-            tables = [t[0] for t in self.cursor.fetchall()]
+        def work(conn):
+            # Refreshing reloads the schema catalog, picking up DDL made elsewhere
+            return conn.get_server_info(), self.service.tables(conn, reload=True)
+
+        def show(result):
+            version, tables = result
+            self.show_connection(version=version)
+            self.table_names = tables
             self.table_combo["values"] = tables
+            if self.tab_built(self.import_tab):
+                self.import_table["values"] = tables
             if tables:
                 self.table_combo.current(0)
-        except Error as e:
-            messagebox.showerror("Error", f"Error fetching tables: {e}")
+
+        def failed(e):
+            self.show_connection(error=e)
+            messagebox.showerror("Database Error", f"Could not fetch the tables:\n{e}")
+
+        self.executor.submit(work, show, failed, key="tables")
+
+    def with_table_info(self, table, on_done, error_message):
+        """
+        Hand the catalog entry for `table` to on_done, straight away when the
+        catalog is fresh, otherwise after reloading it in the background
+        """
+        def failed(e):
+            messagebox.showerror("Error", f"{error_message}: {e}")
+
+        def done(info):
+            if info is None:
+                failed(f"Unknown table {table}")
+            else:
+                on_done(info)
+
+        if self.catalog.is_fresh():
+            done(self.catalog.table(table))
+            return
+        self.executor.submit(lambda conn: self.catalog.ensure(conn).get(table), done, failed)
+
+    def key_values(self, info, row):
+        """Primary key columns of `info` and their values in a row read from the grid"""
+        cols = self.table_grid.columns
+        pk = info.primary_key
+        return pk, [row[cols.index(c)] for c in pk]
 
     def load_table_data(self):
         table = self.table_combo.get()
         if not table:
             return
-        try:
-            self.cursor.execute(f"SELECT * FROM {table}")
-            rows = self.cursor.fetchall()
-            cols = [desc[0] for desc in self.cursor.description]
 
-            self.tree.delete(*self.tree.get_children())
-            self.tree["columns"] = cols
-            self.tree["show"] = "headings"
+        def work(conn):
+            pager = self.service.table_pager(conn, table)
+            return pager, pager.next_page(conn)
 
-            for col in cols:
-                self.tree.heading(col, text=col)
-                self.tree.column(col, width=120)
+        def show(result):
+            self.loaded_table = table
+            self.table_pager.show(*result)
 
-            for row in rows:
-                self.tree.insert("", "end", values=row)
-        except Error as e:
-            messagebox.showerror("Error", f"Could not load table data: {e}")
+        self.executor.submit(
+            work,
+            show,
+            lambda e: messagebox.showerror("Error", f"Could not load table data: {e}"),
+            key="table")
 
     def add_row(self):
         if self.role.get() != "Admin":
@@ -148,9 +293,9 @@ class CineBaseApp:
         table = self.table_combo.get()
         if not table:
             return
-        try:
-            self.cursor.execute(f"DESCRIBE {table}")
-            cols = [r[0] for r in self.cursor.fetchall()]
+
+        def open_dialog(info):
+            cols = info.column_names
             add_win = Toplevel(self.root)
             add_win.title(f"Add Record to {table}")
             entries = {}
@@ -161,87 +306,168 @@ class CineBaseApp:
                 entries[col] = e
 
             def save():
-                values = [entries[c].get() or None for c in cols]
-                placeholders = ", ".join(["%s"] * len(cols))
-                try:
-                    self.cursor.execute(f"INSERT INTO {table} VALUES ({placeholders})", values)
-                    self.conn.commit()
+                values = {c: entries[c].get() or None for c in cols}
+
+                def work(conn):
+                    return self.service.insert_row(conn, table, values)
+
+                def done(_):
+                    self.show_cache_stats()
                     messagebox.showinfo("Success", "Record added successfully!")
                     add_win.destroy()
                     self.load_table_data()
-                except Error as e:
-                    messagebox.showerror("Error", f"Insert failed: {e}")
+
+                self.executor.submit_write(work, done, lambda e: messagebox.showerror("Error", f"Insert failed: {e}"))
 
             Button(add_win, text="Save", command=save).grid(row=len(cols), columnspan=2, pady=10)
 
-        except Error as e:
-            messagebox.showerror("Error", f"Could not add record: {e}")
+        self.with_table_info(table, open_dialog, "Could not add record")
 
     def edit_row(self):
         if self.role.get() != "Admin":
             messagebox.showinfo("Access Denied", "Only Admins can edit records.")
             return
 
-        table = self.table_combo.get()
-        selected = self.tree.focus()
+        table = self.loaded_table
+        selected = self.selected_rows()
         if not selected:
             messagebox.showwarning("Select Row", "Please select a row to edit.")
             return
+        if len(selected) > 1:
+            self.edit_rows(table, selected)
+            return
 
-        values = self.tree.item(selected, "values")
-        self.cursor.execute(f"DESCRIBE {table}")
-        cols = [r[0] for r in self.cursor.fetchall()]
+        values = selected[0]
 
-        edit_win = Toplevel(self.root)
-        edit_win.title(f"Edit Record in {table}")
-        entries = {}
+        def open_dialog(info):
+            pk, pk_values = self.key_values(info, values)
+            if not pk:
+                messagebox.showwarning("No Primary Key", f"{table} has no primary key; rows cannot be edited.")
+                return
+            cols = self.table_grid.columns
+            edit_win = Toplevel(self.root)
+            edit_win.title(f"Edit Record in {table}")
+            entries = {}
 
-        for i, (col, val) in enumerate(zip(cols, values)):
-            Label(edit_win, text=col).grid(row=i, column=0, padx=10, pady=5)
-            e = Entry(edit_win)
-            e.grid(row=i, column=1, padx=10, pady=5)
-            e.insert(0, val)
-            entries[col] = e
+            for i, (col, val) in enumerate(zip(cols, values)):
+                Label(edit_win, text=col).grid(row=i, column=0, padx=10, pady=5)
+                e = Entry(edit_win)
+                e.grid(row=i, column=1, padx=10, pady=5)
+                e.insert(0, display(val))
+                entries[col] = e
 
-        def update():
-            new_values = [entries[c].get() for c in cols]
-            set_clause = ", ".join([f"{c}=%s" for c in cols])
-            pk = cols[0]
-            try:
-                self.cursor.execute(f"UPDATE {table} SET {set_clause} WHERE {pk}=%s", new_values + [values[0]])
-                self.conn.commit()
-                messagebox.showinfo("Success", "Record updated successfully!")
-                edit_win.destroy()
-                self.load_table_data()
-            except Error as e:
-                messagebox.showerror("Error", f"Update failed: {e}")
+            def update():
+                # Only columns the user changed; an emptied one becomes NULL
+                new_values = {c: entries[c].get() or None for c, v in zip(cols, values)
+                              if entries[c].get() != display(v)}
+                if not new_values:
+                    messagebox.showwarning("Nothing to Change", "No value was changed.")
+                    return
+
+                def work(conn):
+                    return self.service.update_rows(conn, table, [pk_values], new_values)
+
+                def done(_):
+                    self.show_cache_stats()
+                    messagebox.showinfo("Success", "Record updated successfully!")
+                    edit_win.destroy()
+                    self.load_table_data()
+
+                self.executor.submit_write(work, done, lambda e: messagebox.showerror("Error", f"Update failed: {e}"))
+
+            Button(edit_win, text="Update", command=update).grid(row=len(cols), columnspan=2, pady=10)
+
+        self.with_table_info(table, open_dialog, "Could not edit record")
+
+    def selected_rows(self):
+        """Rows selected in the table grid (Ctrl/Shift-click), or the focused row"""
+        rows = self.table_grid.selected_rows()
+        if not rows and self.table_grid.focus() is not None:
+            rows = [self.table_grid.row(self.table_grid.focus())]
+        return rows
+
+    def edit_rows(self, table, rows):
+        """Set the same values on several rows with one batched UPDATE in one transaction"""
+        def open_dialog(info):
+            pk = info.primary_key
+            if not pk:
+                messagebox.showwarning("No Primary Key", f"{table} has no primary key; rows cannot be edited.")
+                return
+            keys = [self.key_values(info, row)[1] for row in rows]
+            cols = [c for c in self.table_grid.columns if c not in pk]
+            edit_win = Toplevel(self.root)
+            edit_win.title(f"Edit {len(rows)} Records in {table}")
+            Label(edit_win, text="Tick the columns to change; an empty value sets NULL.").grid(
+                row=0, columnspan=3, padx=10, pady=5)
+            entries = {}
+            for i, col in enumerate(cols, start=1):
+                change = BooleanVar(value=False)
+                Checkbutton(edit_win, variable=change).grid(row=i, column=0, padx=5)
+                Label(edit_win, text=col).grid(row=i, column=1, padx=10, pady=5)
+                e = Entry(edit_win)
+                e.grid(row=i, column=2, padx=10, pady=5)
+                entries[col] = (change, e)
+
+            def update():
+                changed = [(c, e.get() or None) for c, (change, e) in entries.items() if change.get()]
+                if not changed:
+                    messagebox.showwarning("Nothing to Change", "Tick at least one column to change.")
+                    return
+
+                def work(conn):
+                    return self.service.update_rows(conn, table, keys, dict(changed))
+
+                def done(updated):
+                    self.show_cache_stats()
+                    messagebox.showinfo("Success", f"{updated} of {len(keys)} records updated successfully!")
+                    edit_win.destroy()
+                    self.load_table_data()
+
+                self.executor.submit_write(work, done, lambda e: messagebox.showerror("Error", f"Update failed: {e}"))
 
-        Button(edit_win, text="Update", command=update).grid(row=len(cols), columnspan=2, pady=10)
+            Button(edit_win, text="Update All", command=update).grid(row=len(cols) + 1, columnspan=3, pady=10)
+
+        self.with_table_info(table, open_dialog, "Could not edit records")
 
     def delete_row(self):
         if self.role.get() != "Admin":
             messagebox.showinfo("Access Denied", "Only Admins can delete records.")
             return
 
-        table = self.table_combo.get()
-        selected = self.tree.focus()
+        table = self.loaded_table
+        selected = self.selected_rows()
         if not selected:
             messagebox.showwarning("Select Row", "Please select a row to delete.")
             return
 
-        values = self.tree.item(selected, "values")
-        pk_value = values[0]
-        pk_col = self.tree["columns"][0]
-        confirm = messagebox.askyesno("Confirm", f"Delete record {pk_value}?")
-        if not confirm:
-            return
-        try:
-            self.cursor.execute(f"DELETE FROM {table} WHERE {pk_col}=%s", (pk_value,))
-            self.conn.commit()
-            messagebox.showinfo("Deleted", "Record deleted successfully.")
-            self.load_table_data()
-        except Error as e:
-            messagebox.showerror("Error", f"Delete failed: {e}")
+        def confirm_delete(info):
+            keys = [self.key_values(info, row)[1] for row in selected]
+            pk = info.primary_key
+            if not pk:
+                messagebox.showwarning("No Primary Key", f"{table} has no primary key; rows cannot be deleted.")
+                return
+            if len(keys) == 1:
+                label = ", ".join(display(v) for v in keys[0])
+                confirm = messagebox.askyesno("Confirm", f"Delete record {label}?")
+            else:
+                confirm = messagebox.askyesno("Confirm", f"Delete {len(keys)} records from {table}?")
+            if not confirm:
+                return
+
+            def work(conn):
+                return self.service.delete_rows(conn, table, keys)
+
+            def done(deleted):
+                self.show_cache_stats()
+                if len(keys) == 1:
+                    messagebox.showinfo("Deleted", "Record deleted successfully.")
+                else:
+                    messagebox.showinfo("Deleted", f"{deleted} records deleted successfully.")
+                self.load_table_data()
+
+            self.executor.submit_write(work, done, lambda e: messagebox.showerror("Error", f"Delete failed: {e}"))
+
+        self.with_table_info(table, confirm_delete, "Could not delete record")
 
     # ---------------- Tab 2: Procedures / Functions ----------------
     def build_proc_tab(self):
@@ -250,12 +476,14 @@ class CineBaseApp:
 
         Label(frame, text="Stored Procedures / Functions", font=("Arial", 13, "bold")).grid(row=0, columnspan=2, pady=10)
 
-        role = self.role.get()
-
-        if role == "Admin":
-            Button(frame, text="Add Movie with Genre", command=self.call_add_movie_proc).grid(row=1, column=0, padx=10, pady=5)
-        else:
-            Label(frame, text="(User mode: movie addition disabled)").grid(row=1, column=0, padx=10, pady=5)
+        # Admin-only actions and the User-mode note share a cell; show_proc_role() shows one or the other
+        self.admin_proc_widgets = [
+            Button(frame, text="Add Movie with Genre", command=self.call_add_movie_proc),
+            Button(frame, text="Purge Inactive Users", command=self.call_purge_users_proc)]
+        self.admin_proc_widgets[0].grid(row=1, column=0, padx=10, pady=5)
+        self.admin_proc_widgets[1].grid(row=3, column=0, padx=10, pady=5)
+        self.user_proc_label = Label(frame, text="(User mode: movie addition disabled)")
+        self.user_proc_label.grid(row=1, column=0, padx=10, pady=5)
 
         Button(frame, text="Get Average Rating", command=self.call_avg_rating_proc).grid(row=1, column=1, padx=10, pady=5)
         Button(frame, text="Get User Review Count", command=self.call_user_review_func).grid(row=2, column=0, padx=10, pady=5)
@@ -263,13 +491,26 @@ class CineBaseApp:
 
         self.proc_output = Text(self.proc_tab, height=20)
         self.proc_output.pack(fill=BOTH, padx=20, pady=10)
+        self.show_proc_role()
+
+    def show_proc_role(self):
+        is_admin = self.role.get() == "Admin"
+        for widget in self.admin_proc_widgets:
+            if is_admin:
+                widget.grid()
+            else:
+                widget.grid_remove()
+        if is_admin:
+            self.user_proc_label.grid_remove()
+        else:
+            self.user_proc_label.grid()
 
     # -------- Procedures ----------
     def call_add_movie_proc(self):
         win = Toplevel(self.root)
         win.title("Add Movie With Genre")
 
-        fields = ["movieTitle", "releaseDate", "runtime", "languageName", "countryName", "genreName"]
+        fields = ADD_MOVIE_FIELDS
         entries = {}
         for i, f in enumerate(fields):
             Label(win, text=f).grid(row=i, column=0, padx=10, pady=5)
@@ -278,15 +519,18 @@ class CineBaseApp:
             entries[f] = e
 
         def execute():
-            vals = [entries[f].get() for f in fields]
-            try:
-                self.cursor.callproc("AddMovieWithGenre", vals)
-                self.conn.commit()
+            vals = {f: entries[f].get() for f in fields}
+
+            def work(conn):
+                self.service.add_movie(conn, vals)
+
+            def done(_):
+                self.show_cache_stats()
                 messagebox.showinfo("Success", "Movie added successfully via procedure!")
                 win.destroy()
                 self.load_table_data()
-            except Error as e:
-                messagebox.showerror("Error", f"Procedure failed: {e}")
+
+            self.executor.submit_write(work, done, lambda e: messagebox.showerror("Error", f"Procedure failed: {e}"))
 
         Button(win, text="Run", command=execute).grid(row=len(fields), columnspan=2, pady=10)
 
@@ -305,36 +549,92 @@ class CineBaseApp:
         def execute():
             m_id = movie_entry.get() or None
             s_id = show_entry.get() or None
-            try:
-                self.cursor.callproc("GetAverageRating", [m_id, s_id])
-                for result in self.cursor.stored_results():
-                    rows = result.fetchall()
-                    self.proc_output.insert(END, f"Results:\n{rows}\n\n")
+
+            def work(conn):
+                return self.service.average_rating(conn, m_id, s_id)
+
+            def done(result):
+                _, rows = result
+                self.proc_output.insert(END, f"Results:\n{rows}\n\n")
                 win.destroy()
-            except Error as e:
-                messagebox.showerror("Error", f"Procedure failed: {e}")
+
+            self.executor.submit(work, done, lambda e: messagebox.showerror("Error", f"Procedure failed: {e}"))
 
         Button(win, text="Run", command=execute).grid(row=2, columnspan=2, pady=10)
 
+    def call_purge_users_proc(self):
+        win = Toplevel(self.root)
+        win.title("Purge Inactive Users")
+
+        settings = [("Joined more than (days) ago:", PURGE_INACTIVE_DAYS),
+                    ("Users per transaction:", PURGE_BATCH),
+                    ("Pause between batches (ms):", PURGE_PAUSE_MS)]
+        entries = []
+        for i, (label, default) in enumerate(settings):
+            Label(win, text=label).grid(row=i, column=0, padx=10, pady=5, sticky=W)
+            e = Entry(win)
+            e.insert(0, str(default))
+            e.grid(row=i, column=1, padx=10, pady=5)
+            entries.append(e)
+
+        def purge(days, batch, pause, dry_run):
+            return lambda conn: self.service.purge_users(conn, days, batch, pause, dry_run)
+
+        def execute():
+            try:
+                days, batch, pause = (int(e.get()) for e in entries)
+            except ValueError:
+                messagebox.showerror("Error", "Enter whole numbers.")
+                return
+
+            def deleted(result):
+                eligible, count = result
+                self.show_cache_stats()
+                self.proc_output.insert(END, f"Purged {count} of {eligible} inactive users.\n\n")
+
+            def counted(result):
+                eligible, _ = result
+                if not eligible:
+                    messagebox.showinfo("Purge", "No users are eligible.", parent=win)
+                    return
+                if not messagebox.askyesno(
+                        "Confirm Purge",
+                        f"Delete {eligible} users who joined more than {days} days ago and never wrote a review?",
+                        parent=win):
+                    return
+                win.destroy()
+                # Every batch commits on its own, so a failed purge is simply run again
+                self.executor.submit_write(purge(days, batch, pause, False), deleted,
+                                           lambda e: messagebox.showerror("Error", f"Purge failed: {e}"))
+
+            self.executor.submit(purge(days, batch, pause, True), counted,
+                                 lambda e: messagebox.showerror("Error", f"Procedure failed: {e}"))
+
+        Button(win, text="Purge...", command=execute).grid(row=len(settings), columnspan=2, pady=10)
+
     # -------- Functions ----------
     def call_user_review_func(self):
         win = Toplevel(self.root)
         win.title("Get User Review Count")
 
-        Label(win, text="Enter UserID:").grid(row=0, column=0, padx=10, pady=5)
+        Label(win, text="Enter UserID (or a list / range, e.g. 1, 5, 10-20):").grid(row=0, column=0, padx=10, pady=5)
         user_entry = Entry(win)
         user_entry.grid(row=0, column=1, padx=10, pady=5)
 
         def execute():
-            try:
-                user_id = user_entry.get()
-                query = f"SELECT GetUserReviewCount({user_id});"
-                self.cursor.execute(query)
-                result = self.cursor.fetchone()
-                self.proc_output.insert(END, f"User {user_id} has given {result[0]} reviews.\n\n")
+            user_id = user_entry.get().strip()
+            if not user_id.isdigit():
+                self.run_user_stats(user_id, "reviews", win)
+                return
+
+            def done(count):
+                self.proc_output.insert(END, f"User {user_id} has given {count} reviews.\n\n")
                 win.destroy()
-            except Error as e:
-                messagebox.showerror("Error", f"Function call failed: {e}")
+
+            self.executor.submit(
+                lambda conn: self.service.user_review_count(conn, user_id),
+                done,
+                lambda e: messagebox.showerror("Error", f"Function call failed: {e}"))
 
         Button(win, text="Run", command=execute).grid(row=1, columnspan=2, pady=10)
 
@@ -342,35 +642,61 @@ class CineBaseApp:
         win = Toplevel(self.root)
         win.title("Calculate Age (by UserID)")
 
-        Label(win, text="Enter UserID:").grid(row=0, column=0, padx=10, pady=5)
+        Label(win, text="Enter UserID (or a list / range, e.g. 1, 5, 10-20):").grid(row=0, column=0, padx=10, pady=5)
         user_entry = Entry(win)
         user_entry.grid(row=0, column=1, padx=10, pady=5)
 
         def execute():
-            try:
-                user_id = user_entry.get()
-                if not user_id.isdigit():
-                    messagebox.showwarning("Invalid Input", "Please enter a valid numeric UserID.")
-                    return
+            user_id = user_entry.get().strip()
+            if not user_id.isdigit():
+                self.run_user_stats(user_id, "age", win)
+                return
+
+            def work(conn):
+                return self.service.user_age(conn, user_id)
 
-                self.cursor.execute("SELECT DateOfBirth FROM Users WHERE UserID = %s", (user_id,))
-                result = self.cursor.fetchone()
-                if not result or not result[0]:
+            def done(result):
+                dob, age = result
+                if dob is None:
                     messagebox.showinfo("No DOB", f"User {user_id} has no DateOfBirth recorded.")
                     return
-
-                dob = result[0]
-                self.cursor.execute(f"SELECT CalculateAge('{dob}');")
-                age_result = self.cursor.fetchone()
-                age = age_result[0] if age_result else "Unknown"
-
                 self.proc_output.insert(END, f"User {user_id} (DOB: {dob}) is {age} years old.\n\n")
                 win.destroy()
-            except Error as e:
-                messagebox.showerror("Error", f"Function call failed: {e}")
+
+            self.executor.submit(work, done, lambda e: messagebox.showerror("Error", f"Function call failed: {e}"))
 
         Button(win, text="Run", command=execute).grid(row=1, columnspan=2, pady=10)
 
+    def run_user_stats(self, text, what, win):
+        """Review counts or ages ("reviews" / "age") for a list or range of UserIDs in one query"""
+        try:
+            user_id_condition(text)
+        except ValueError as e:
+            messagebox.showwarning("Invalid Input", f"Please enter valid numeric UserIDs.\n{e}")
+            return
+
+        def work(conn):
+            return self.service.user_stats(conn, text)
+
+        def done(result):
+            rows, truncated, missing = result
+            lines = []
+            for user_id, dob, age, reviews in rows:
+                if what == "reviews":
+                    lines.append(f"User {user_id} has given {reviews} reviews.")
+                elif dob is None:
+                    lines.append(f"User {user_id} has no DateOfBirth recorded.")
+                else:
+                    lines.append(f"User {user_id} (DOB: {dob}) is {age} years old.")
+            if truncated:
+                lines.append(f"(Only the first {USER_BATCH_LIMIT} users are listed.)")
+            if missing:
+                lines.append(f"No such user(s): {', '.join(map(str, missing))}")
+            self.proc_output.insert(END, "\n".join(lines) + "\n\n")
+            win.destroy()
+
+        self.executor.submit(work, done, lambda e: messagebox.showerror("Error", f"Function call failed: {e}"))
+
     # ---------------- Tab 3: Custom Queries ----------------
     def build_query_tab(self):
         frame = Frame(self.query_tab)
@@ -383,128 +709,544 @@ class CineBaseApp:
 
         Button(btn_frame, text="🔗 Nested Query: Users with Award-Winning Reviews", 
                command=self.run_nested_query, width=40).pack(pady=5)
-        Button(btn_frame, text="🔀 Join Query: Detailed Movie Info with Genres", 
+        Button(btn_frame, text="🔀 Title Details: Movies and Shows by Rating",
                command=self.run_join_query, width=40).pack(pady=5)
         Button(btn_frame, text="📊 Aggregate Query: Genre Statistics", 
                command=self.run_aggregate_query, width=40).pack(pady=5)
+        Button(btn_frame, text="🧮 Genre Statistics: Recompute from Reviews",
+               command=self.run_genre_statistics_proc, width=40).pack(pady=5)
+        Button(btn_frame, text="💾 Export Last Query Result...",
+               command=self.export_query_result, width=40).pack(pady=5)
 
         # Results display
         Label(self.query_tab, text="Query Results:", font=("Arial", 11, "bold")).pack(pady=(10, 5))
         
-        self.query_tree = ttk.Treeview(self.query_tab)
-        self.query_tree.pack(fill=BOTH, expand=True, padx=10, pady=10)
-
-        # Scrollbars
-        vsb = ttk.Scrollbar(self.query_tab, orient="vertical", command=self.query_tree.yview)
-        vsb.pack(side=RIGHT, fill=Y)
-        self.query_tree.configure(yscrollcommand=vsb.set)
+        self.query_grid = VirtualGrid(self.query_tab, anchor="center")
+        self.query_grid.pack(fill=BOTH, expand=True, padx=10, pady=10)
+        self.query_pager = GridPager(self.query_grid, self.executor, on_error=self.show_paging_error,
+                                     profiler=self.profiler, name="Custom Queries")
+        self.last_query = None      # (query, title) of the result shown in the grid
+        # Drill-down: double-click a title detail row to see all of it
+        self.query_grid.body.bind("<Double-Button-1>", lambda e: self.show_title_detail())
 
     def run_nested_query(self):
         """Find users who have reviewed award-winning movies (Nested Query)"""
-        query = """
-        SELECT DISTINCT u.UserID, u.Username, u.Email, u.Country
-        FROM Users u
-        WHERE u.UserID IN (
-            SELECT r.UserID
-            FROM Review r
-            WHERE r.MovieID IN (
-                SELECT aw.MovieID
-                FROM Award_Winner aw
-                WHERE aw.MovieID IS NOT NULL
-            )
-        )
-        """
-        self.execute_and_display_query(query, "Users Who Reviewed Award-Winning Movies")
+        title, query = CANNED_QUERIES["award-reviewers"]
+        self.execute_and_display_query(query, title)
 
     def run_join_query(self):
-        """Get detailed movie information with genres and ratings (Join Query)"""
-        query = """
-        SELECT 
-            m.MovieID,
-            m.Title,
-            m.ReleaseDate,
-            m.Runtime,
-            m.Language,
-            m.Country,
-            GROUP_CONCAT(DISTINCT g.Name ORDER BY g.Name SEPARATOR ', ') AS Genres,
-            ROUND(AVG(r.Rating), 2) AS AvgRating,
-            COUNT(DISTINCT r.ReviewID) AS Reviews
-        FROM Movie m
-        LEFT JOIN Movie_Genre mg ON m.MovieID = mg.MovieID
-        LEFT JOIN Genre g ON mg.GenreID = g.GenreID
-        LEFT JOIN Review r ON m.MovieID = r.MovieID
-        GROUP BY m.MovieID, m.Title, m.ReleaseDate, m.Runtime, m.Language, m.Country
-        ORDER BY AvgRating DESC
-        """
-        self.execute_and_display_query(query, "Detailed Movie Information")
+        """Movies and shows with genres, credits, counts and ratings, best rated first, from Title_Detail"""
+        def work(conn):
+            pager = self.service.title_pager()
+            return pager, pager.next_page(conn)
+
+        def done(result):
+            query, _ = self.service.title_query()
+            self.last_query = (query, "Title Details")
+            self.query_pager.show(*result)
+
+        self.executor.submit(
+            work, done,
+            lambda e: messagebox.showerror("Query Error", f"Failed to load title details:\n{e}"),
+            key="query")
+
+    def show_title_detail(self):
+        cols = self.query_grid.columns
+        index = self.query_grid.focus()
+        if index is None or "TitleType" not in cols or "TitleID" not in cols:
+            return
+        row = self.query_grid.row(index)
+
+        win = Toplevel(self.root)
+        win.title(f"{row[cols.index('TitleType')]}: {row[cols.index('Title')]}")
+        text = Text(win, width=90, height=20, wrap=WORD)
+        text.pack(fill=BOTH, expand=True, padx=10, pady=10)
+        for col, value in zip(cols, row):
+            if col != "RatingRank":
+                text.insert(END, f"{col}: {display(value)}\n")
+        text.config(state=DISABLED)
 
     def run_aggregate_query(self):
         """Get statistics on content by genre (Aggregate Query)"""
-        query = """
-        SELECT 
-            g.Name AS Genre,
-            COUNT(DISTINCT mg.MovieID) AS Movies,
-            COUNT(DISTINCT sg.ShowID) AS Shows,
-            COUNT(DISTINCT mg.MovieID) + COUNT(DISTINCT sg.ShowID) AS Total,
-            ROUND(AVG(r.Rating), 2) AS AvgRating,
-            MAX(r.Rating) AS MaxRating,
-            MIN(r.Rating) AS MinRating
-        FROM Genre g
-        LEFT JOIN Movie_Genre mg ON g.GenreID = mg.GenreID
-        LEFT JOIN Show_Genre sg ON g.GenreID = sg.GenreID
-        LEFT JOIN Review r ON (r.MovieID = mg.MovieID OR r.ShowID = sg.ShowID)
-        GROUP BY g.GenreID, g.Name
-        ORDER BY Total DESC
-        """
-        self.execute_and_display_query(query, "Genre Statistics")
+        title, query = CANNED_QUERIES["genre-stats"]
+        self.execute_and_display_query(query, title)
+
+    def run_genre_statistics_proc(self):
+        """Recompute genre statistics from Review via GetGenreStatistics (per-title aggregates merged per genre)"""
+        self.call_and_display_proc(self.service.genre_statistics, "GetGenreStatistics",
+                                   "Genre Statistics (recomputed)")
+
+    def call_and_display_proc(self, work, proc, title):
+        """Helper method to run a service procedure call, work(conn), and display its result set in the grid"""
+        def done(result):
+            self.last_query = None
+            cols, rows = result
+            self.query_pager.show_rows(cols, rows)
+            messagebox.showinfo("Procedure Executed", f"{title}\n\nReturned {len(rows)} row(s)")
+
+        self.executor.submit(
+            work, done,
+            lambda e: messagebox.showerror("Procedure Error", f"Failed to call {proc}:\n{e}"),
+            key="query")
 
     def execute_and_display_query(self, query, title):
-        """Helper method to execute a query and display results in the tree"""
+        """Helper method to execute a query and display results in the grid"""
+        def work(conn):
+            # Streamed page by page; the rest loads as the grid is scrolled
+            return self.service.stream_query(conn, query)
+
+        def done(result):
+            pager, (cols, rows) = result
+            self.last_query = (query, title)
+            if pager is None:
+                self.query_pager.show_rows(cols, rows)
+                messagebox.showinfo("Query Executed", f"{title}\n\nReturned {len(rows)} row(s) (cached)")
+                return
+            self.query_pager.show(pager, rows)
+
+            if pager.at_end:
+                summary = f"Returned {pager.row_count} row(s)"
+            else:
+                summary = f"Showing first {pager.row_count} row(s), more load as you scroll"
+            messagebox.showinfo("Query Executed", f"{title}\n\n{summary}")
+
+        self.executor.submit(
+            work, done,
+            lambda e: messagebox.showerror("Query Error", f"Failed to execute query:\n{e}"),
+            key="query")
+
+    # ---------------- Tab 4: Trigger Log ----------------
+    def build_log_tab(self):
+        buttons = Frame(self.log_tab)
+        buttons.pack(pady=10)
+        Label(buttons, text="From:").pack(side=LEFT, padx=(5, 2))
+        self.log_since = StringVar()
+        Entry(buttons, textvariable=self.log_since, width=18).pack(side=LEFT)
+        Label(buttons, text="To:").pack(side=LEFT, padx=(10, 2))
+        self.log_until = StringVar()
+        Entry(buttons, textvariable=self.log_until, width=18).pack(side=LEFT)
+        Label(buttons, text="(YYYY-MM-DD [HH:MM])").pack(side=LEFT, padx=5)
+        Button(buttons, text="Load Review Log", command=self.load_log).pack(side=LEFT, padx=5)
+        Checkbutton(buttons, text="Live Tail", variable=self.log_tailing, command=self.toggle_tail).pack(side=LEFT, padx=5)
+        Button(buttons, text="Export Log...", command=self.export_log).pack(side=LEFT, padx=5)
+        self.log_grid = VirtualGrid(self.log_tab, col_width=130)
+        self.log_grid.pack(fill=BOTH, expand=True, padx=10, pady=10)
+        self.log_pager = GridPager(self.log_grid, self.executor, on_error=self.show_paging_error,
+                                   profiler=self.profiler, name="Trigger Log")
+
+    def log_range(self):
+        """(since, until) from the From / To fields; None after telling the user they are invalid"""
+        since, until = self.log_since.get(), self.log_until.get()
         try:
-            self.cursor.execute(query)
-            rows = self.cursor.fetchall()
-            cols = [desc[0] for desc in self.cursor.description]
+            log_condition(since, until)
+        except ValueError as e:
+            messagebox.showwarning("Invalid Time Range", str(e))
+            return None
+        return since, until
 
-            # Clear previous results
-            self.query_tree.delete(*self.query_tree.get_children())
-            
-            # Configure columns
-            self.query_tree["columns"] = cols
-            self.query_tree["show"] = "headings"
+    def load_log(self):
+        log_range = self.log_range()
+        if log_range is None:
+            return
+        self.stop_tail()
+
+        def work(conn):
+            # Newest first; LogID breaks ties between entries logged in the same second
+            pager = self.service.log_pager(None, *log_range)
+            return pager, pager.next_page(conn)
+
+        self.executor.submit(
+            work,
+            lambda result: self.log_pager.show(*result),
+            lambda e: messagebox.showerror("Error", f"Could not load logs: {e}"),
+            key="log")
+
+    def export_log(self):
+        log_range = self.log_range()
+        if log_range is not None:
+            query, params = self.service.log_query(*log_range)
+            self.export_query(query, "Review_Log", params=params)
+
+    # -------- Live tail ----------
+    def toggle_tail(self):
+        if self.log_tailing.get():
+            self.start_tail()
+        else:
+            self.stop_tail()
 
-            for col in cols:
-                self.query_tree.heading(col, text=col)
-                self.query_tree.column(col, width=120, anchor="center")
+    def start_tail(self):
+        """
+        Show the newest entries (as many as the tail's ring buffer keeps) oldest
+        first, then poll for entries added since (LogID > last seen) and append only those
+        """
+        log_range = self.log_range()
+        if log_range is None:
+            self.log_tailing.set(False)
+            return
+        self.stop_tail()
+        self.log_tailing.set(True)
+        self.log_pager.close()
+        tail = self.log_tail = self.service.log_tail(*log_range)
+
+        def done(rows):
+            if tail is not self.log_tail:
+                return
+            self.log_pager.show_rows(tail.columns, rows)
+            self.log_grid.see(len(self.log_grid) - 1)
+            self.schedule_tail()
+
+        def failed(e):
+            self.stop_tail()
+            messagebox.showerror("Error", f"Could not load logs: {e}")
 
-            # Insert data
-            for row in rows:
-                self.query_tree.insert("", "end", values=row)
+        self.executor.submit(tail.start, done, failed, key="log")
 
-            messagebox.showinfo("Query Executed", f"{title}\n\nReturned {len(rows)} row(s)")
-        except Error as e:
-            messagebox.showerror("Query Error", f"Failed to execute query:\n{e}")
+    def schedule_tail(self, delay=LOG_TAIL_MS):
+        self._tail_after = self.root.after(delay, self.poll_tail)
 
-    # ---------------- Tab 4: Trigger Log ----------------
-    def build_log_tab(self):
-        Button(self.log_tab, text="Load Review Log", command=self.load_log).pack(pady=10)
-        self.log_tree = ttk.Treeview(self.log_tab)
-        self.log_tree.pack(fill=BOTH, expand=True, padx=10, pady=10)
+    def poll_tail(self):
+        self._tail_after = None
+        tail = self.log_tail
+        if tail is None:
+            return
 
-    def load_log(self):
+        def done(result):
+            if tail is not self.log_tail:
+                return
+            rows, dropped = result
+            if rows:
+                following = self.log_grid.at_end()
+                self.log_grid.append_rows(rows)
+                self.log_grid.drop_front(dropped)
+                if following:
+                    self.log_grid.see(len(self.log_grid) - 1)
+            # Catching up after a burst: poll again straight away
+            self.schedule_tail(0 if tail.behind else LOG_TAIL_MS)
+
+        def failed(e):
+            if tail is self.log_tail:
+                self.status.set(f"Live tail: {e}")
+                self.schedule_tail(LOG_TAIL_MS * 5)
+
+        self.executor.submit(tail.poll, done, failed, key="log-tail")
+
+    def stop_tail(self):
+        self.log_tail = None
+        self.log_tailing.set(False)
+        if self._tail_after is not None:
+            self.root.after_cancel(self._tail_after)
+            self._tail_after = None
+
+    # ---------------- Export ----------------
+    def export_table(self):
+        table = self.table_combo.get()
+        if table:
+            self.export_query(f"SELECT * FROM {table}", table)
+
+    def export_query_result(self):
+        if self.last_query is None:
+            messagebox.showinfo("Export", "Run one of the queries first; procedure results cannot be exported.")
+            return
+        query, title = self.last_query
+        self.export_query(query, title)
+
+    def export_query(self, query, name, params=None):
+        """Stream the result of `query` to a file chosen by the user, chunk by chunk"""
+        path = filedialog.asksaveasfilename(
+            title=f"Export {name}",
+            initialfile=re.sub(r"\W+", "_", name).strip("_") + ".csv",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl"), ("Parquet", "*.parquet")])
+        if not path:
+            return
         try:
-            self.cursor.execute("SELECT * FROM Review_Log ORDER BY ActionTime DESC")
-            rows = self.cursor.fetchall()
-            cols = [d[0] for d in self.cursor.description]
-            self.log_tree.delete(*self.log_tree.get_children())
-            self.log_tree["columns"] = cols
-            self.log_tree["show"] = "headings"
-            for c in cols:
-                self.log_tree.heading(c, text=c)
-                self.log_tree.column(c, width=130)
-            for r in rows:
-                self.log_tree.insert("", "end", values=r)
-        except Error as e:
-            messagebox.showerror("Error", f"Could not load logs: {e}")
+            exporter = Exporter(self.db_pool, query, path, params=params)
+        except ValueError as e:
+            messagebox.showerror("Export Error", str(e))
+            return
+
+        def done(progress):
+            messagebox.showinfo("Export Complete", f"Exported {progress} to\n{path}")
+
+        # Streams on a connection of its own; Cancel Queries stops it through exporter.stop()
+        task = self.executor.submit_stream(
+            exporter.run, exporter.stop, done,
+            lambda e: messagebox.showerror("Export Error", f"Export of {name} failed:\n{e}"))
+        self.show_export_progress(exporter, task)
+
+    def show_export_progress(self, exporter, task):
+        if task.done() or task.cancelled:
+            return
+        self.status.set(f"⏳ Exporting... {exporter.progress}")
+        self.root.after(500, self.show_export_progress, exporter, task)
+
+    # ---------------- Tab 5: Bulk Import ----------------
+    def build_import_tab(self):
+        frame = Frame(self.import_tab)
+        frame.pack(fill=X, pady=20, padx=10)
+
+        Label(frame, text="File (CSV or JSONL):", font=("Arial", 11)).grid(row=0, column=0, padx=10, pady=5, sticky="w")
+        self.import_path = StringVar()
+        Entry(frame, textvariable=self.import_path, width=60).grid(row=0, column=1, padx=5, pady=5)
+        Button(frame, text="Browse...", command=self.choose_import_file).grid(row=0, column=2, padx=5, pady=5)
+
+        Label(frame, text="Target Table:", font=("Arial", 11)).grid(row=1, column=0, padx=10, pady=5, sticky="w")
+        self.import_table = ttk.Combobox(frame, state="readonly", values=self.table_names)
+        self.import_table.grid(row=1, column=1, padx=5, pady=5, sticky="w")
+
+        self.import_load_data = BooleanVar(value=True)
+        Checkbutton(frame, text="Use LOAD DATA LOCAL INFILE for CSV when the server allows it",
+                    variable=self.import_load_data).grid(row=2, column=1, padx=5, pady=5, sticky="w")
+
+        buttons = Frame(frame)
+        buttons.grid(row=3, column=1, pady=10, sticky="w")
+        self.import_btn = Button(buttons, text="Import", command=self.run_import,
+                                 state=NORMAL if self.role.get() == "Admin" else DISABLED)
+        self.import_btn.pack(side=LEFT, padx=5)
+        self.stop_import_btn = Button(buttons, text="Stop", command=self.stop_import, state=DISABLED)
+        self.stop_import_btn.pack(side=LEFT, padx=5)
+
+        Label(self.import_tab, text="Movie / TV_Show files may include a Genre column (names separated by |).",
+              font=("Arial", 10)).pack(pady=5)
+        self.import_status = StringVar(value="")
+        Label(self.import_tab, textvariable=self.import_status, font=("Arial", 11)).pack(pady=10)
+
+        self.import_task = None
+
+    def choose_import_file(self):
+        path = filedialog.askopenfilename(
+            title="Choose a file to import",
+            filetypes=[("CSV / JSONL", "*.csv *.jsonl *.ndjson *.json"), ("All files", "*.*")])
+        if path:
+            self.import_path.set(path)
+
+    def run_import(self):
+        if self.role.get() != "Admin":
+            messagebox.showinfo("Access Denied", "Only Admins can import data.")
+            return
+
+        path = self.import_path.get()
+        table = self.import_table.get()
+        if not path or not table:
+            messagebox.showwarning("Import", "Please choose a file and a target table.")
+            return
+
+        def start(info):
+            try:
+                importer = BulkImporter(self.db_pool, info, path, load_data=self.import_load_data.get())
+            except ValueError as e:
+                messagebox.showerror("Import Error", str(e))
+                return
+
+            def done(progress):
+                self.finish_import()
+                verb = "Stopped after" if progress.stopped else "Imported"
+                self.import_status.set(f"{verb} {progress} into {table} using {progress.method}")
+
+            def failed(e):
+                self.finish_import()
+                self.import_status.set(f"Import failed; {importer.progress.committed:,} rows were committed")
+                messagebox.showerror("Import Error", f"Import into {table} failed:\n{e}")
+
+            self.importer = importer
+            self.import_btn.config(state=DISABLED)
+            self.stop_import_btn.config(state=NORMAL)
+            # Not retried: a retried import would insert the committed rows again
+            self.import_task = self.executor.submit_write(importer.run, done, failed, key="import")
+            self.show_import_progress()
+
+        self.with_table_info(table, start, "Could not start import")
+
+    def show_import_progress(self):
+        """Poll the running import's counters; the worker never touches Tk"""
+        if self.importer is None:
+            return
+        if self.import_task.cancelled and self.import_task.done():
+            # Cancelled from the toolbar: no callback will come
+            committed = self.importer.progress.committed
+            self.finish_import()
+            self.import_status.set(f"Import cancelled; {committed:,} rows were committed")
+            return
+        self.import_status.set(f"Importing... {self.importer.progress}")
+        self.root.after(250, self.show_import_progress)
+
+    def stop_import(self):
+        if self.importer is not None:
+            self.importer.stop()
+            self.import_status.set("Stopping after the current batch...")
+
+    def finish_import(self):
+        # Committed rows change the target table and, for titles, Genre and the genre links
+        self.invalidate_cache([self.importer.table, "Genre"])
+        self.importer = None
+        self.import_task = None
+        self.import_btn.config(state=NORMAL if self.role.get() == "Admin" else DISABLED)
+        self.stop_import_btn.config(state=DISABLED)
+
+    # ---------------- Tab 6: Search ----------------
+    def build_search_tab(self):
+        frame = Frame(self.search_tab)
+        frame.pack(fill=X, pady=10)
+
+        Label(frame, text="Search titles and people:", font=("Arial", 11)).pack(side=LEFT, padx=10)
+        self.search_text = StringVar()
+        entry = Entry(frame, textvariable=self.search_text, width=50)
+        entry.pack(side=LEFT, padx=5)
+        entry.bind("<KeyRelease>", lambda e: self.schedule_search())
+        entry.bind("<Return>", lambda e: self.run_search())
+        Button(frame, text="Rebuild Index", command=self.build_search_index).pack(side=LEFT, padx=5)
+
+        self.search_status = StringVar(value="Type at least two characters")
+        Label(self.search_tab, textvariable=self.search_status, font=("Arial", 10)).pack(pady=5)
+
+        self.search_grid = VirtualGrid(self.search_tab, col_width=180)
+        self.search_grid.pack(fill=BOTH, expand=True, padx=10, pady=10)
+        self._search_after = None
+        self._index_building = False
+
+    def schedule_search(self):
+        """Debounce typing: search once the user pauses"""
+        if self._search_after is not None:
+            self.root.after_cancel(self._search_after)
+        self._search_after = self.root.after(SEARCH_DEBOUNCE_MS, self.run_search)
+
+    def run_search(self):
+        self._search_after = None
+        text = self.search_text.get().strip()
+        if len(text) < 2:
+            self.search_grid.set_columns(RESULT_COLUMNS)
+            return
+        if self.search_index.stale:
+            self.build_search_index()
+
+        # Typo-tolerant matches from the in-memory index straight away ...
+        started = time.perf_counter()
+        fuzzy = self.search_index.search(text) if self.search_index.ready else []
+        self.show_search_results(fuzzy, [], f"{len(fuzzy)} fuzzy match(es) in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+        # ... then merged with the FULLTEXT hits when they arrive
+        def work(conn):
+            started = time.perf_counter()
+            return search_fulltext(conn, text), time.perf_counter() - started
+
+        def done(result):
+            if text != self.search_text.get().strip():
+                return
+            fulltext, elapsed = result
+            self.show_search_results(
+                fuzzy, fulltext, f"{len(fuzzy)} fuzzy + {len(fulltext)} full-text match(es), full-text in {elapsed * 1000:.0f} ms")
+
+        self.executor.submit(
+            work, done,
+            lambda e: self.search_status.set(f"Full-text search failed: {e}"),
+            key="search")
+
+    def show_search_results(self, fuzzy, fulltext, summary):
+        self.search_grid.set_columns(RESULT_COLUMNS)
+        self.search_grid.append_rows(merge_results(fuzzy, fulltext))
+        if not self.search_index.ready:
+            summary += " (fuzzy index still building)"
+        self.search_status.set(summary)
+
+    def build_search_index(self):
+        if self._index_building:
+            return
+        self._index_building = True
+        self.search_index.stale = False
+        self.search_status.set("Building search index...")
+
+        def done(count):
+            self._index_building = False
+            self.search_status.set(f"Search index ready: {count:,} titles and names")
+            if len(self.search_text.get().strip()) >= 2:
+                self.run_search()
+
+        def failed(e):
+            self._index_building = False
+            self.search_status.set(f"Could not build the search index: {e}")
+
+        self.executor.submit(self.search_index.build, done, failed, key="search-index")
+
+    # ---------------- Tab 7: Performance ----------------
+    def build_perf_tab(self):
+        buttons = Frame(self.perf_tab)
+        buttons.pack(pady=10)
+        Button(buttons, text="Refresh", command=self.refresh_performance).pack(side=LEFT, padx=5)
+        Button(buttons, text="Reset", command=self.reset_performance).pack(side=LEFT, padx=5)
+        Button(buttons, text="Export JSON...", command=self.export_performance).pack(side=LEFT, padx=5)
+        self.perf_summary = StringVar(value="")
+        Label(buttons, textvariable=self.perf_summary, font=("Arial", 10)).pack(side=LEFT, padx=10)
+
+        Label(self.perf_tab, text="Statements by total time (times in ms; grid rows are render times)",
+              font=("Arial", 11, "bold")).pack(pady=(5, 0))
+        self.perf_grid = VirtualGrid(self.perf_tab, col_width=90)
+        self.perf_grid.pack(fill=BOTH, expand=True, padx=10, pady=5)
+
+        slow_frame = Frame(self.perf_tab)
+        slow_frame.pack(fill=X, padx=10)
+        Label(slow_frame, text=f"Slow statements (over {self.profiler.slow_seconds * 1000:.0f} ms), newest first",
+              font=("Arial", 11, "bold")).pack(side=LEFT)
+        Button(slow_frame, text="Show Plan", command=self.show_slow_plan).pack(side=LEFT, padx=10)
+        self.slow_grid = VirtualGrid(self.perf_tab, col_width=90)
+        self.slow_grid.pack(fill=BOTH, expand=True, padx=10, pady=5)
+        self.slow_queries = []
+
+    def refresh_performance(self):
+        columns = ["Statement", "Calls", "Errors", "Total", "Mean", "p50", "p90", "p99", "Max", "Rows", "Bytes"]
+        rows = []
+        for kind, summaries in (("", self.profiler.query_summary()), ("[grid] ", self.profiler.render_summary())):
+            for q in summaries:
+                rows.append((kind + q["fingerprint"], q["calls"], q["errors"], round(q["total_ms"], 1),
+                             round(q["mean_ms"], 2), round(q["p50_ms"], 2), round(q["p90_ms"], 2),
+                             round(q["p99_ms"], 2), round(q["max_ms"], 1), q["rows"], q["bytes"]))
+        self.perf_grid.set_columns(columns, widths=[500] + [80] * (len(columns) - 1))
+        self.perf_grid.append_rows(rows)
+
+        self.slow_queries = self.profiler.slow_queries()
+        self.slow_grid.set_columns(["At", "ms", "Rows", "Plan", "SQL"], widths=[140, 80, 80, 80, 800])
+        self.slow_grid.append_rows([
+            (time.strftime("%H:%M:%S", time.localtime(q.at)), round(q.seconds * 1000, 1), q.rows,
+             "yes" if q.plan else ("error" if q.plan_error else "-"), q.fingerprint)
+            for q in self.slow_queries])
+        total = sum(q["calls"] for q in self.profiler.query_summary())
+        self.perf_summary.set(f"{total:,} statements, {len(rows)} fingerprints, {len(self.slow_queries)} slow")
+
+    def reset_performance(self):
+        self.profiler.reset()
+        self.refresh_performance()
+
+    def export_performance(self):
+        path = filedialog.asksaveasfilename(
+            title="Export Performance Data", initialfile="cinebase_profile.json",
+            defaultextension=".json", filetypes=[("JSON", "*.json")])
+        if not path:
+            return
+        try:
+            self.profiler.export_json(path)
+        except OSError as e:
+            messagebox.showerror("Export Error", str(e))
+            return
+        messagebox.showinfo("Export Complete", f"Performance data written to\n{path}")
+
+    def show_slow_plan(self):
+        index = self.slow_grid.focus()
+        if index is None or index >= len(self.slow_queries):
+            messagebox.showwarning("Select Row", "Please select a slow statement.")
+            return
+        query = self.slow_queries[index]
+        win = Toplevel(self.root)
+        win.title("Query Plan")
+        text = Text(win, width=140, height=30)
+        text.pack(fill=BOTH, expand=True, padx=10, pady=10)
+        text.insert(END, f"{query.fingerprint}\n\n{query.seconds * 1000:.1f} ms, {query.rows} rows\n\n")
+        if query.plan:
+            columns, rows = query.plan
+            text.insert(END, "\n".join(
+                "  ".join(f"{c}={display(v)}" for c, v in zip(columns, row) if v is not None) for row in rows))
+        elif query.plan_error:
+            text.insert(END, f"EXPLAIN failed: {query.plan_error}")
+        else:
+            text.insert(END, "No plan (not explainable, or EXPLAIN still running; refresh and retry).")
 
 
 if __name__ == "__main__":
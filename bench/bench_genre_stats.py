@@ -0,0 +1,159 @@
+"""
+Scaling benchmark for the genre statistics query.
+
+Grows Review step by step with synthetic reviews of the existing users,
+movies and shows, and at every size times CALL GetGenreStatistics() and,
+for comparison, the old OR-join aggregate (capped with MAX_EXECUTION_TIME).
+It then fits time against review count: a log-log slope close to 1 means the
+query scales linearly with Review.
+
+This writes to the configured database; run it against a scratch copy.
+The synthetic reviews are deleted again unless --keep is given.
+
+    python bench/bench_genre_stats.py --scales 10000 20000 40000 80000
+"""
+
+import argparse
+import math
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import mysql.connector  # noqa: E402
+from db import db_config  # noqa: E402
+
+BATCH = 5000
+OR_JOIN_TIMEOUT_MS = 60000
+
+OR_JOIN_QUERY = """
+SELECT /*+ MAX_EXECUTION_TIME({timeout}) */
+    g.Name AS Genre,
+    COUNT(DISTINCT mg.MovieID) AS TotalMovies,
+    COUNT(DISTINCT sg.ShowID) AS TotalShows,
+    ROUND(AVG(r.Rating), 2) AS AverageRating
+FROM Genre g
+LEFT JOIN Movie_Genre mg ON g.GenreID = mg.GenreID
+LEFT JOIN Show_Genre sg ON g.GenreID = sg.GenreID
+LEFT JOIN Review r ON (r.MovieID = mg.MovieID OR r.ShowID = sg.ShowID)
+GROUP BY g.GenreID, g.Name
+"""
+
+
+def ids(cursor, table, column):
+    cursor.execute(f"SELECT {column} FROM {table}")
+    return [r[0] for r in cursor.fetchall()]
+
+
+def grow_reviews(conn, count, users, movies, shows, rng):
+    """Insert `count` random reviews, each for a movie or a show."""
+    cursor = conn.cursor()
+    sql = "INSERT INTO Review (Rating, UserID, MovieID, ShowID) VALUES (%s, %s, %s, %s)"
+    remaining = count
+    while remaining > 0:
+        n = min(BATCH, remaining)
+        batch = []
+        for _ in range(n):
+            if shows and (not movies or rng.random() < 0.4):
+                batch.append((rng.randint(1, 10), rng.choice(users), None, rng.choice(shows)))
+            else:
+                batch.append((rng.randint(1, 10), rng.choice(users), rng.choice(movies), None))
+        cursor.executemany(sql, batch)
+        conn.commit()
+        remaining -= n
+    cursor.close()
+
+
+def time_call(conn, repeat):
+    samples = []
+    for _ in range(repeat):
+        cursor = conn.cursor()
+        started = time.perf_counter()
+        cursor.callproc("GetGenreStatistics")
+        for result in cursor.stored_results():
+            result.fetchall()
+        samples.append(time.perf_counter() - started)
+        cursor.close()
+    return statistics.median(samples)
+
+
+def time_or_join(conn):
+    cursor = conn.cursor()
+    started = time.perf_counter()
+    try:
+        cursor.execute(OR_JOIN_QUERY.format(timeout=OR_JOIN_TIMEOUT_MS))
+        cursor.fetchall()
+        return time.perf_counter() - started
+    except mysql.connector.Error:
+        return None     # hit MAX_EXECUTION_TIME
+    finally:
+        cursor.close()
+
+
+def loglog_slope(sizes, times):
+    xs = [math.log(s) for s in sizes]
+    ys = [math.log(t) for t in times]
+    mx, my = statistics.mean(xs), statistics.mean(ys)
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / sum((x - mx) ** 2 for x in xs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scaling benchmark for GetGenreStatistics")
+    parser.add_argument("--scales", type=int, nargs="+", default=[10000, 20000, 40000, 80000],
+                        help="Review sizes to measure at (ascending)")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per size; the median is reported")
+    parser.add_argument("--skip-or-join", action="store_true", help="do not time the old OR-join query")
+    parser.add_argument("--keep", action="store_true", help="keep the synthetic reviews")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    conn = mysql.connector.connect(**db_config())
+    cursor = conn.cursor()
+    users = ids(cursor, "Users", "UserID")
+    movies = ids(cursor, "Movie", "MovieID")
+    shows = ids(cursor, "TV_Show", "ShowID")
+    cursor.execute("SELECT COUNT(*), IFNULL(MAX(ReviewID), 0) FROM Review")
+    size, first_new_id = cursor.fetchone()
+    cursor.close()
+    if not users or not (movies or shows):
+        sys.exit("Need at least one user and one movie or show to generate reviews")
+
+    sizes, times = [], []
+    print(f"{'reviews':>10} {'GetGenreStatistics':>20} {'per 1k reviews':>16} {'OR-join':>12}")
+    try:
+        for target in sorted(args.scales):
+            if target > size:
+                grow_reviews(conn, target - size, users, movies, shows, rng)
+                size = target
+            elapsed = time_call(conn, args.repeat)
+            or_join = None if args.skip_or_join else time_or_join(conn)
+            sizes.append(size)
+            times.append(elapsed)
+            if args.skip_or_join:
+                or_join_text = "-"
+            elif or_join is None:
+                or_join_text = f">{OR_JOIN_TIMEOUT_MS / 1000:.0f}s"
+            else:
+                or_join_text = f"{or_join * 1000:.1f} ms"
+            print(f"{size:>10} {elapsed * 1000:>17.1f} ms {elapsed * 1e6 / size:>13.3f} ms {or_join_text:>12}")
+    finally:
+        if not args.keep:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM Review WHERE ReviewID > %s", (first_new_id,))
+            conn.commit()
+            cursor.close()
+        conn.close()
+
+    if len(sizes) > 1:
+        slope = loglog_slope(sizes, times)
+        verdict = "linear" if slope < 1.25 else "super-linear"
+        print(f"\nlog-log slope {slope:.2f} ({verdict}; 1.0 = time grows in proportion to Review)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Cold-start benchmark for the Tk app.
+
+Starts `app.py` in a fresh Python process --repeat times and measures, from
+the moment the process is spawned:
+
+  * window:    the main window has been drawn (imports, Tk, the first tab),
+  * connected: the background connect finished and the table list is shown.
+
+The medians are printed and saved to bench/results/startup-<timestamp>.json
+next to the bench_suite.py results. Needs a display (use xvfb-run on a
+headless machine) and the database configured in .env; if the database is
+unreachable, `connected` measures how long it takes to give up.
+
+    python bench/bench_startup.py --repeat 10
+"""
+
+import argparse
+import datetime
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "bench", "results")
+CONNECT_TIMEOUT = 60        # seconds a child waits for the connection before giving up
+STAGES = ["window", "connected"]
+
+
+def child():
+    """Runs in the spawned process: start the app and report each stage on stdout"""
+    sys.path.insert(0, ROOT)
+    from tkinter import Tk, messagebox
+
+    import app
+
+    # Nobody is there to dismiss an error dialog; report the error instead
+    messagebox.showerror = lambda title, message, **kwargs: print(f"error {message!r}", file=sys.stderr)
+
+    root = Tk()
+    cine = app.CineBaseApp(root)
+    root.update()
+    print("window", flush=True)
+
+    deadline = time.monotonic() + CONNECT_TIMEOUT
+    while cine.db_state == "connecting" and time.monotonic() < deadline:
+        root.update()
+        time.sleep(0.002)
+    print(f"connected {cine.db_state}", flush=True)
+    cine.on_close()
+
+
+def run_once():
+    """{stage: seconds since spawn} of one cold start"""
+    started = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--child"], cwd=ROOT,
+                            stdout=subprocess.PIPE, text=True)
+    times, state = {}, None
+    for line in proc.stdout:
+        stage, _, rest = line.strip().partition(" ")
+        if stage in STAGES:
+            times[stage] = time.perf_counter() - started
+            state = rest or state
+    proc.wait()
+    if proc.returncode or len(times) < len(STAGES):
+        raise RuntimeError(f"the app did not start (exit status {proc.returncode})")
+    return times, state
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time cold starts of the CineBase GUI")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="where to save the results (default: bench/results/startup-<timestamp>.json)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        child()
+        return
+
+    runs = []
+    for n in range(args.repeat):
+        times, state = run_once()
+        runs.append(times)
+        print(f"  run {n + 1}: " + ", ".join(f"{s} {1000 * times[s]:.0f} ms" for s in STAGES) + f" ({state})",
+              flush=True)
+
+    results = {"time": datetime.datetime.now().isoformat(timespec="seconds"), "state": state,
+               "runs": [{s: round(1000 * t[s], 1) for s in STAGES} for t in runs]}
+    for stage in STAGES:
+        results[f"{stage}_median_ms"] = round(1000 * statistics.median(t[stage] for t in runs), 1)
+        print(f"{stage:>10}: median {results[f'{stage}_median_ms']:.0f} ms")
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, "startup-" + datetime.datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Saved {output}")
+
+
+if __name__ == "__main__":
+    main()
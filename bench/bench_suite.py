@@ -0,0 +1,225 @@
+"""
+Benchmark suite for CineBase.
+
+Times, against the database configured in .env:
+  * every query in sql/cinebase_queries.sql,
+  * every stored procedure and function, through CineBaseService as the GUI
+    and the API call them,
+  * the load_table_data path (the first and a deep keyset page of a table),
+  * the execute_and_display_query path (streaming each canned query's first
+    page on a connection of its own),
+  * the trigger log pages, the live tail start and the full-text search.
+
+The result cache is off, so every run goes to the server. Each case runs
+--warmup times untimed and then --repeat times. The results (min, median,
+p90 and mean in ms, with the table sizes, server version and git commit) are
+saved to bench/results/<timestamp>.json. --compare prints the change against
+an earlier file and exits non-zero if a case got slower by more than
+--threshold. Fill the database with bench/generate_data.py first.
+
+    python bench/bench_suite.py
+    python bench/bench_suite.py --compare bench/results/20260101-120000.json
+
+This is a script like the other bench/ tools rather than a pytest-benchmark
+module: tests/ is the suite that runs anywhere without a database, while
+every case here needs a populated one, and a run is only comparable with
+another at the same table sizes, which are saved with the results.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from catalog import SchemaCatalog  # noqa: E402
+from db import DatabasePool  # noqa: E402
+from explain_check import QUERIES_SQL, queries_from_sql_file  # noqa: E402
+from profiler import percentile  # noqa: E402
+from result_cache import ResultCache  # noqa: E402
+from search import search_fulltext  # noqa: E402
+from service import CANNED_QUERIES, CineBaseService, query_all  # noqa: E402
+
+RESULTS_DIR = os.path.join(ROOT, "bench", "results")
+TABLES = ["Movie", "Review", "Users", "Review_Log"]     # browsed in the load_table_data cases
+COUNTED_TABLES = ["Users", "Movie", "TV_Show", "Season", "Episode", "Person", "Role", "Review",
+                  "Award_Winner", "Movie_Genre", "Show_Genre", "Review_Log", "Title_Detail"]
+USER_RANGE = 1000           # users in the set-based user statistics case
+SEARCH_TEXT = "star"
+
+
+def scalar(conn, sql, params=()):
+    _, rows = query_all(conn, sql, params)
+    return rows[0][0] if rows else None
+
+
+def sample_ids(conn):
+    """Ids the cases look up: the most reviewed movie / show and a span of users"""
+    return {
+        "movie": scalar(conn, "SELECT MovieID FROM Movie_Rating_Stats ORDER BY ReviewCount DESC LIMIT 1"),
+        "show": scalar(conn, "SELECT ShowID FROM Show_Rating_Stats ORDER BY ReviewCount DESC LIMIT 1"),
+        "user": scalar(conn, "SELECT MIN(UserID) FROM Users WHERE DateOfBirth IS NOT NULL"),
+        "max_review": scalar(conn, "SELECT MAX(ReviewID) FROM Review") or 0,
+    }
+
+
+def build_cases(service, ids):
+    """{name: work(conn)}, in the order they run"""
+    cases = {}
+    for name, sql in queries_from_sql_file(QUERIES_SQL).items():
+        cases[f"query: {name}"] = lambda conn, sql=sql: query_all(conn, sql)
+
+    cases["proc: GetAverageRating (movie)"] = lambda conn: service.average_rating(conn, movie_id=ids["movie"])
+    cases["proc: GetAverageRating (show)"] = lambda conn: service.average_rating(conn, show_id=ids["show"])
+    cases["proc: GetGenreStatistics"] = service.genre_statistics
+    cases["function: GetUserReviewCount"] = lambda conn: service.user_review_count(conn, ids["user"])
+    cases["function: CalculateAge"] = lambda conn: service.user_age(conn, ids["user"])
+    first_user = ids["user"] or 1
+    cases[f"function: user stats ({USER_RANGE} users)"] = lambda conn: service.user_stats(
+        conn, f"{first_user}-{first_user + USER_RANGE - 1}")
+
+    def first_page(table):
+        def work(conn):
+            pager = service.table_pager(conn, table)
+            try:
+                return pager.next_page(conn)
+            finally:
+                pager.close()
+        return work
+
+    def deep_page(conn):
+        pager = service.table_pager(conn, "Review")
+        pager.last_key = (ids["max_review"] // 2,)
+        return pager.next_page(conn)
+
+    for table in TABLES:
+        cases[f"load_table_data: {table}"] = first_page(table)
+    cases["load_table_data: Review, middle page"] = deep_page
+
+    def stream(query):
+        def work(conn):
+            pager, result = service.stream_query(conn, query)
+            if pager is not None:
+                pager.close()
+            return result
+        return work
+
+    for name, (_, query) in CANNED_QUERIES.items():
+        cases[f"execute_and_display_query: {name}"] = stream(query)
+
+    cases["title details: first page"] = lambda conn: service.titles(conn)
+    cases["title details: shows only"] = lambda conn: service.titles(conn, title_type="show")
+    cases["title details: drill-down"] = lambda conn: service.title_detail(conn, "movie", ids["movie"])
+    cases["trigger log: first page"] = lambda conn: service.review_log(conn)
+    cases["trigger log: last day"] = lambda conn: service.review_log(
+        conn, since=(datetime.datetime.now() - datetime.timedelta(days=1)).strftime("%Y-%m-%d %H:%M:%S"))
+    cases["trigger log: live tail start"] = lambda conn: service.log_tail().start(conn)
+    cases["search: full-text"] = lambda conn: search_fulltext(conn, SEARCH_TEXT)
+    return cases
+
+
+def time_case(conn, work, warmup, repeat):
+    for _ in range(warmup):
+        work(conn)
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        work(conn)
+        times.append(1000 * (time.perf_counter() - started))
+    return {
+        "min_ms": round(min(times), 3),
+        "median_ms": round(statistics.median(times), 3),
+        "p90_ms": round(percentile(sorted(times), 90), 3),
+        "mean_ms": round(statistics.mean(times), 3),
+        "runs": repeat,
+    }
+
+
+def environment(conn):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    rows = {}
+    for table in COUNTED_TABLES:
+        rows[table] = scalar(conn, f"SELECT COUNT(*) FROM {table}")
+    return {
+        "time": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "server": scalar(conn, "SELECT VERSION()"),
+        "rows": rows,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Print each case's median against the baseline; returns the names that regressed"""
+    regressed = []
+    old_cases = baseline["cases"]
+    print(f"\nAgainst {baseline['environment'].get('time')} (commit {baseline['environment'].get('commit')}):")
+    for name, result in results["cases"].items():
+        old = old_cases.get(name)
+        if old is None:
+            print(f"  {name:<55} new")
+            continue
+        change = result["median_ms"] / old["median_ms"] - 1 if old["median_ms"] else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressed.append(name)
+        print(f"  {name:<55} {old['median_ms']:10.2f} -> {result['median_ms']:10.2f} ms  {change:+7.1%}{flag}")
+    if baseline["environment"].get("rows") != results["environment"]["rows"]:
+        print("  (table sizes differ from the baseline run)")
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time CineBase queries, procedures and GUI data paths")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--filter", help="only run cases whose name contains this text")
+    parser.add_argument("--output", help="where to save the results (default: bench/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="slowdown of the median that counts as a regression (default 0.10)")
+    args = parser.parse_args(argv)
+
+    db_pool = DatabasePool(size=2)
+    service = CineBaseService(db_pool, SchemaCatalog(), cache=ResultCache(max_bytes=0))
+    results = {"cases": {}}
+    with db_pool.connection() as conn:
+        results["environment"] = environment(conn)
+        cases = build_cases(service, sample_ids(conn))
+        for name, work in cases.items():
+            if args.filter and args.filter.lower() not in name.lower():
+                continue
+            try:
+                result = time_case(conn, work, args.warmup, args.repeat)
+            except Exception as e:
+                print(f"  {name:<55} failed: {e}")
+                conn.rollback()
+                continue
+            results["cases"][name] = result
+            print(f"  {name:<55} median {result['median_ms']:10.2f} ms  p90 {result['p90_ms']:10.2f} ms", flush=True)
+
+    output = args.output or os.path.join(RESULTS_DIR, datetime.datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, default=str)
+    print(f"Saved {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
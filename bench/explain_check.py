@@ -0,0 +1,249 @@
+"""
+EXPLAIN-based plan regression check.
+
+Runs EXPLAIN on every query in sql/cinebase_queries.sql, every SELECT string
+literal in app.py and the representative paging / procedure queries below,
+against the database configured in .env. Load it with realistic row counts
+first; on the five-row seed data the optimizer scans everything anyway.
+
+A table read with access type ALL (a full scan) fails the check unless it is
+listed in ALLOWED_FULL_SCANS or was already a full scan in the recorded
+baseline. Exit status is 1 on regressions, so this can gate CI.
+
+    python bench/explain_check.py             # compare against the baseline
+    python bench/explain_check.py --record    # write a new baseline
+"""
+
+import argparse
+import ast
+import datetime
+import decimal
+import json
+import os
+import re
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import mysql.connector  # noqa: E402
+from db import db_config  # noqa: E402
+from paging import KeysetPager  # noqa: E402
+from service import CineBaseService  # noqa: E402
+
+BASELINE = os.path.join(ROOT, "bench", "explain_baseline.json")
+QUERIES_SQL = os.path.join(ROOT, "sql", "cinebase_queries.sql")
+APP_SOURCES = [os.path.join(ROOT, "app.py"), os.path.join(ROOT, "service.py")]
+
+
+class StatementRecorder:
+    """Stands in for a connection and keeps the statement a pager runs on it"""
+
+    def __init__(self, columns):
+        self.description = [(c,) for c in columns]
+        self.statement = None
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, params=()):
+        self.statement = (sql, list(params))
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+
+def keyset_page(pager, key=None):
+    """(sql, params) of the page after `key`, exactly as KeysetPager builds it for the app"""
+    recorder = StatementRecorder(pager.key_cols)
+    pager.last_key = key
+    pager.next_page(recorder)
+    return recorder.statement
+
+
+_pagers = CineBaseService(None, None)
+_now = datetime.datetime.now().replace(microsecond=0)
+
+# Dynamic SQL built at runtime (keyset pages, as (sql, params)) and the hot
+# statements inside procedures and triggers, with placeholders filled in.
+EXTRA_QUERIES = {
+    "keyset page: Review": keyset_page(KeysetPager("Review", ["ReviewID"]), (1000,)),
+    "keyset page: Review_Log newest first": keyset_page(_pagers.log_pager(), (_now, 1000)),
+    "Review_Log tail poll": "SELECT * FROM Review_Log WHERE LogID > 1000 ORDER BY LogID LIMIT 1000",
+    "Review_Log time range": keyset_page(_pagers.log_pager(since=_now - datetime.timedelta(days=1), until=_now)),
+    "GetUserReviewCount": "SELECT COUNT(*) FROM Review WHERE UserID = 1",
+    "before_user_delete": "SELECT EXISTS (SELECT 1 FROM Review WHERE UserID = 1)",
+    "PurgeInactiveUsers: candidates": (
+        "SELECT u.UserID FROM Users u LEFT JOIN Review r ON r.UserID = u.UserID "
+        "WHERE r.ReviewID IS NULL AND u.JoinDate < CURRENT_DATE - INTERVAL 365 DAY"),
+    "ApplyReviewToStats: movie range": "SELECT MIN(Rating), MAX(Rating) FROM Review WHERE MovieID = 1",
+    "ApplyReviewToStats: show range": "SELECT MIN(Rating), MAX(Rating) FROM Review WHERE ShowID = 1",
+    "GetAverageRating": "SELECT s.RatingSum / NULLIF(s.RatingCount, 0) FROM Movie_Rating_Stats s WHERE s.MovieID = 1",
+    "Title_Detail page by rating": keyset_page(_pagers.title_pager(), (decimal.Decimal("8.00"), "Show", 1000)),
+    "RefreshTitleDetail: episodes": (
+        "SELECT COUNT(*) FROM Season se JOIN Episode e ON e.SeasonID = se.SeasonID WHERE se.ShowID = 1"),
+    "search: FULLTEXT title": (
+        "SELECT MovieID, Title FROM Movie WHERE MATCH(Title) AGAINST ('+star* +wa*' IN BOOLEAN MODE) LIMIT 50"),
+}
+
+# Tables a query has to read in full by design (it reports on every row),
+# by table name; aliases in the plan are resolved to it.
+ALLOWED_FULL_SCANS = {
+    "Genre",                # genre statistics list every genre
+    "Movie",                # the join query lists every movie
+    "Users",                # small driving table of the nested query
+}
+
+
+def strip_sql_comments(sql):
+    return "\n".join(line.split("--", 1)[0] for line in sql.splitlines())
+
+
+def queries_from_sql_file(path):
+    with open(path, encoding="utf-8") as f:
+        text = strip_sql_comments(f.read())
+    queries = {}
+    for n, statement in enumerate(s.strip() for s in text.split(";")):
+        if re.match(r"(SELECT|WITH)\b", statement, re.I):
+            queries[f"{os.path.basename(path)} #{n}"] = statement
+    return queries
+
+
+def query_scopes(tree):
+    """(name, node) of every function and of every module-level constant"""
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            yield node.name, node
+    for node in tree.body:
+        if not isinstance(node, ast.Assign) or not isinstance(node.targets[0], ast.Name):
+            continue
+        target = node.targets[0].id
+        if isinstance(node.value, ast.Dict):
+            for key, value in zip(node.value.keys, node.value.values):
+                if isinstance(key, ast.Constant):
+                    yield f"{target}[{key.value}]", value
+        else:
+            yield target, node.value
+
+
+def queries_from_python(path):
+    """
+    Every plain string literal in `path` that is a SELECT statement, named after
+    the function or module-level constant it appears in (dict entries by their
+    key) so baseline entries survive unrelated edits.
+    f-strings and str.format() templates are skipped; their dynamic parts
+    cannot be explained statically.
+    """
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    in_fstring = {id(part) for node in ast.walk(tree) if isinstance(node, ast.JoinedStr) for part in node.values}
+    queries = {}
+    seen = set()
+    for scope, root in query_scopes(tree):
+        found = 0
+        for node in ast.walk(root):
+            if not isinstance(node, ast.Constant) or not isinstance(node.value, str) or id(node) in in_fstring:
+                continue
+            sql = node.value.strip().rstrip(";")
+            if "{" in sql:
+                continue
+            sql = sql.replace("%s", "1")
+            if sql in seen:
+                continue        # already listed under its outermost function
+            if re.match(r"(SELECT|WITH)\s", sql, re.I) and re.search(r"\bFROM\b", sql, re.I):
+                seen.add(sql)
+                name = f"{os.path.basename(path)}:{scope}" + (f" #{found + 1}" if found else "")
+                queries[name] = sql
+                found += 1
+    return queries
+
+
+def collect_queries():
+    queries = queries_from_sql_file(QUERIES_SQL)
+    for path in APP_SOURCES:
+        queries.update(queries_from_python(path))
+    queries.update(EXTRA_QUERIES)
+    return queries
+
+
+_KEYWORDS = r"(?:ON|USING|WHERE|JOIN|STRAIGHT_JOIN|LEFT|RIGHT|INNER|CROSS|NATURAL|GROUP|ORDER|HAVING|LIMIT|UNION|WINDOW|FOR)\b"
+_TABLE = rf"(?:`?\w+`?\.)?`?\w+`?(?:\s+(?:AS\s+)?(?!{_KEYWORDS})\w+)?"
+_TABLE_LIST = re.compile(rf"\b(?:FROM|JOIN|STRAIGHT_JOIN)\s+({_TABLE}(?:\s*,\s*{_TABLE})*)", re.I)
+
+
+def table_aliases(sql):
+    """{alias: table} for the `table [AS] alias` references after FROM / JOIN in `sql`"""
+    aliases = {}
+    for match in _TABLE_LIST.finditer(sql):
+        for ref in match.group(1).split(","):
+            words = ref.split()
+            if len(words) > 1:
+                aliases[words[-1].lower()] = words[0].split(".")[-1].strip("`")
+    return aliases
+
+
+def explain(cursor, query):
+    sql, params = query if isinstance(query, tuple) else (query, None)
+    cursor.execute("EXPLAIN " + sql, params)
+    return cursor.fetchall()
+
+
+def full_scans(plan, query):
+    """
+    Physical tables read with access type ALL, by table name rather than the
+    alias EXPLAIN shows (derived tables are skipped).
+    """
+    aliases = table_aliases(query[0] if isinstance(query, tuple) else query)
+    return sorted({aliases.get(row["table"].lower(), row["table"]) for row in plan
+                   if row["type"] == "ALL" and row["table"] and not row["table"].startswith("<")})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--record", action="store_true", help="write the current plans as the new baseline")
+    parser.add_argument("--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if os.path.exists(BASELINE) and not args.record:
+        with open(BASELINE, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    conn = mysql.connector.connect(**db_config())
+    cursor = conn.cursor(dictionary=True)
+    current = {}
+    failures = []
+    try:
+        for name, sql in collect_queries().items():
+            plan = explain(cursor, sql)
+            scans = full_scans(plan, sql)
+            current[name] = scans
+            if args.verbose:
+                print(f"== {name}")
+                for row in plan:
+                    print(f"   {row['table']}: type={row['type']} key={row['key']} rows={row['rows']} {row['Extra'] or ''}")
+            allowed = ALLOWED_FULL_SCANS | set(baseline.get(name, []))
+            regressed = [t for t in scans if t not in allowed]
+            if regressed:
+                failures.append((name, regressed))
+    finally:
+        cursor.close()
+        conn.close()
+
+    if args.record:
+        with open(BASELINE, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+        print(f"Recorded plans for {len(current)} queries in {BASELINE}")
+        return 0
+
+    for name, tables in failures:
+        print(f"FULL SCAN  {name}: {', '.join(tables)}")
+    print(f"{len(current)} queries checked, {len(failures)} regressed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+"""
+Synthetic CineBase data at a chosen scale, for benchmarks.
+
+Everything is sized from the number of reviews (1e3 to 1e7):
+one user per 20 reviews, one movie per 50, a show per four movies, with
+seasons, episodes, people, roles, awards and genre links to match. The
+distributions are skewed the way real catalogues are. A few power users
+write most reviews, blockbusters get most of them, popular genres and star
+actors dominate the links, and ratings cluster around 7-8.
+
+Rows are added to what is there (Genre and Award are only topped up), in
+batched multi-row INSERTs, so the triggers keep Review_Log and the rating
+summaries current. The same --seed gives the same data. Run it against a
+scratch database:
+
+    python bench/generate_data.py --reviews 1000000
+"""
+
+import argparse
+import bisect
+import datetime
+import itertools
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import mysql.connector  # noqa: E402
+from db import db_config  # noqa: E402
+
+BATCH = 5000
+
+GENRES = ["Drama", "Comedy", "Action", "Thriller", "Romance", "Crime", "Horror", "Sci-Fi",
+          "Fantasy", "Adventure", "Animation", "Documentary", "Mystery", "Family", "Biography",
+          "History", "War", "Musical", "Western", "Sport"]
+AWARDS = ["Academy Award", "Golden Globe", "Emmy Award", "BAFTA", "Palme d'Or",
+          "Screen Actors Guild Award", "Critics' Choice Award", "Venice Golden Lion",
+          "Berlin Golden Bear", "Independent Spirit Award"]
+ROLE_TYPES = ["Actor", "Actor", "Actor", "Director", "Writer", "Producer"]
+LANGUAGES = [("English", 60), ("Spanish", 8), ("French", 7), ("Hindi", 7), ("Japanese", 5),
+             ("Korean", 5), ("German", 4), ("Italian", 4)]
+COUNTRIES = [("USA", 45), ("UK", 10), ("India", 9), ("France", 7), ("Japan", 6), ("South Korea", 6),
+             ("Spain", 5), ("Germany", 5), ("Canada", 4), ("Italy", 3)]
+RATING_WEIGHTS = [2, 2, 3, 4, 6, 10, 16, 20, 14, 8]    # 1..10
+UNRATED = 0.05          # share of reviews without a rating
+
+WORDS = ["Silent", "River", "Night", "Last", "Golden", "Broken", "City", "Shadow", "Storm", "Empire",
+         "Secret", "Wild", "Dark", "Lost", "Star", "Ocean", "Fire", "Iron", "Midnight", "Garden",
+         "Echo", "Crown", "Winter", "Summer", "Road", "Ghost", "Heart", "Glass", "Stone", "Sky",
+         "Blood", "Paper", "Hidden", "Frozen", "Electric", "Velvet", "Burning", "Northern", "Red", "Blue"]
+FIRST_NAMES = ["James", "Mary", "Arjun", "Priya", "Chen", "Yuki", "Carlos", "Sofia", "Omar", "Amara",
+               "Liam", "Emma", "Noah", "Olivia", "Hiro", "Ananya", "Lucas", "Isabella", "Ivan", "Fatima"]
+LAST_NAMES = ["Smith", "Sharma", "Wang", "Tanaka", "Garcia", "Rossi", "Kim", "Müller", "Dubois", "Okafor",
+              "Johnson", "Patel", "Lopez", "Ivanova", "Khan", "Brown", "Silva", "Nguyen", "Cohen", "Larsen"]
+
+
+class Skewed:
+    """Draws from `items` with Zipf-like weights 1/rank^s; ranks are shuffled so popular ids are spread out."""
+
+    def __init__(self, items, s, rng):
+        self.items = list(items)
+        rng.shuffle(self.items)
+        self.cum = list(itertools.accumulate(1 / (rank + 1) ** s for rank in range(len(self.items))))
+
+    def draw(self, rng):
+        return self.items[bisect.bisect_left(self.cum, rng.random() * self.cum[-1])]
+
+    def draw_distinct(self, rng, k):
+        k = min(k, len(self.items))
+        picked = set()
+        while len(picked) < k:
+            picked.add(self.draw(rng))
+        return picked
+
+
+def weighted(rng, pairs):
+    return rng.choices([v for v, _ in pairs], [w for _, w in pairs])[0]
+
+
+def random_date(rng, first_year, last_year, recent_bias=1.0):
+    """A date between the years, skewed towards the later end when recent_bias > 1"""
+    span = (datetime.date(last_year, 12, 31) - datetime.date(first_year, 1, 1)).days
+    return datetime.date(first_year, 1, 1) + datetime.timedelta(days=int(span * rng.random() ** (1 / recent_bias)))
+
+
+def title(rng, n):
+    words = rng.sample(WORDS, rng.choice([1, 2, 2, 3]))
+    if rng.random() < 0.5:
+        words.insert(0, "The")
+    return " ".join(words) + (f" {n}" if rng.random() < 0.3 else "")
+
+
+def person_name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+class Generator:
+    def __init__(self, conn, rng, verbose=True):
+        self.conn = conn
+        self.rng = rng
+        self.verbose = verbose
+
+    def insert(self, table, columns, rows):
+        """Insert rows (any iterable) in BATCH-row transactions; returns the ids of the new rows"""
+        id_col = self.id_column(table)
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f"SELECT IFNULL(MAX({id_col}), 0) FROM {table}")
+            before = cursor.fetchone()[0]
+            sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+            started = time.perf_counter()
+            count = 0
+            rows = iter(rows)
+            while True:
+                batch = list(itertools.islice(rows, BATCH))
+                if not batch:
+                    break
+                cursor.executemany(sql, batch)
+                self.conn.commit()
+                count += len(batch)
+            cursor.execute(f"SELECT {id_col} FROM {table} WHERE {id_col} > %s ORDER BY {id_col}", (before,))
+            ids = [r[0] for r in cursor.fetchall()]
+        finally:
+            cursor.close()
+        if self.verbose:
+            elapsed = time.perf_counter() - started
+            print(f"  {table:<14} {count:>12,} rows in {elapsed:7.1f}s ({count / elapsed if elapsed else 0:,.0f} rows/s)",
+                  flush=True)
+        return ids
+
+    def id_column(self, table):
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT COLUMN_NAME FROM INFORMATION_SCHEMA.COLUMNS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND EXTRA LIKE '%%auto_increment%%'", (table,))
+            return cursor.fetchone()[0]
+        finally:
+            cursor.close()
+
+    def existing(self, table, column):
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f"SELECT {column} FROM {table}")
+            return [r[0] for r in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+    def top_up(self, table, id_col, names):
+        """Ids of every row of a small lookup table, adding the names it does not have yet"""
+        have = set(self.existing(table, "Name"))
+        missing = [(n,) for n in names if n not in have]
+        if missing:
+            self.insert(table, ["Name"], missing)
+        return self.existing(table, id_col)
+
+    def run(self, reviews):
+        rng = self.rng
+        users = max(reviews // 20, 10)
+        movies = max(reviews // 50, 10)
+        shows = max(movies // 4, 3)
+        people = 2 * (movies + shows)
+        run_tag = rng.randrange(16 ** 8)    # keeps e-mail addresses unique across runs
+
+        genre_ids = self.top_up("Genre", "GenreID", GENRES)
+        award_ids = self.top_up("Award", "AwardID", AWARDS)
+
+        user_ids = self.insert("Users", ["Username", "Email", "Password", "DateOfBirth", "Country", "JoinDate"], (
+            (f"user{n}", f"user{n}.{run_tag:08x}@example.com", "x" * 60,
+             None if rng.random() < 0.1 else random_date(rng, 1950, 2008, 2.0),
+             weighted(rng, COUNTRIES), random_date(rng, 2005, 2024, 2.5))
+            for n in range(users)))
+        person_ids = self.insert("Person", ["Name", "Birthdate"], (
+            (person_name(rng), None if rng.random() < 0.2 else random_date(rng, 1920, 2005))
+            for _ in range(people)))
+        movie_ids = self.insert("Movie", ["Title", "ReleaseDate", "Runtime", "Language", "Country"], (
+            (title(rng, n), random_date(rng, 1950, 2024, 3.0), max(int(rng.gauss(110, 20)), 60),
+             weighted(rng, LANGUAGES), weighted(rng, COUNTRIES))
+            for n in range(movies)))
+        show_starts = [random_date(rng, 1970, 2024, 3.0) for _ in range(shows)]
+        show_ids = self.insert("TV_Show", ["Title", "StartDate", "EndDate"], (
+            (title(rng, n), start, None if rng.random() < 0.3 else start + datetime.timedelta(days=rng.randint(60, 4000)))
+            for n, start in enumerate(show_starts)))
+
+        # Most shows end after a season or two; a few run for many
+        season_ids = self.insert("Season", ["ShowID", "SeasonNumber"], (
+            (show_id, number) for show_id in show_ids
+            for number in range(1, min(int(rng.paretovariate(1.5)), 15) + 1)))
+        self.insert("Episode", ["SeasonID", "Title"], (
+            (season_id, f"{rng.choice(WORDS)} {rng.choice(WORDS)}")
+            for season_id in season_ids for _ in range(rng.randint(6, 13))))
+
+        genres = Skewed(genre_ids, 1.0, rng)
+        self.insert("Movie_Genre", ["MovieID", "GenreID"], (
+            (movie_id, genre_id) for movie_id in movie_ids
+            for genre_id in genres.draw_distinct(rng, rng.choice([1, 2, 2, 3]))))
+        self.insert("Show_Genre", ["ShowID", "GenreID"], (
+            (show_id, genre_id) for show_id in show_ids
+            for genre_id in genres.draw_distinct(rng, rng.choice([1, 2, 2, 3]))))
+
+        stars = Skewed(person_ids, 0.9, rng)
+        titles = [(m, None) for m in movie_ids] + [(None, s) for s in show_ids]
+        self.insert("Role", ["RoleType", "PersonID", "MovieID", "ShowID"], (
+            (rng.choice(ROLE_TYPES), stars.draw(rng), movie_id, show_id)
+            for movie_id, show_id in titles for _ in range(rng.randint(2, 6))))
+        award_count = max(len(titles) // 20, 1)
+        self.insert("Award_Winner", ["AwardID", "PersonID", "MovieID", "ShowID"], (
+            (rng.choice(award_ids), stars.draw(rng) if rng.random() < 0.5 else None, movie_id, show_id)
+            for movie_id, show_id in rng.sample(titles, min(award_count, len(titles)))))
+
+        reviewers = Skewed(user_ids, 0.8, rng)
+        popular = Skewed(titles, 1.0, rng)
+        ratings = list(range(1, 11))
+
+        def review_rows():
+            for _ in range(reviews):
+                movie_id, show_id = popular.draw(rng)
+                rating = None if rng.random() < UNRATED else rng.choices(ratings, RATING_WEIGHTS)[0]
+                yield rating, reviewers.draw(rng), movie_id, show_id
+
+        self.insert("Review", ["Rating", "UserID", "MovieID", "ShowID"], review_rows())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fill CineBase with skewed synthetic data")
+    parser.add_argument("--reviews", type=float, default=1e5,
+                        help="scale factor: number of reviews (1e3 to 1e7); other tables are sized from it")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+    reviews = int(args.reviews)
+    if not 1e3 <= reviews <= 1e7:
+        parser.error("--reviews must be between 1e3 and 1e7")
+
+    conn = mysql.connector.connect(**db_config())
+    started = time.perf_counter()
+    print(f"Generating data for {reviews:,} reviews (seed {args.seed})")
+    try:
+        Generator(conn, random.Random(args.seed)).run(reviews)
+    finally:
+        conn.close()
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Schema metadata cache.
+
+The whole schema (tables, columns, primary keys, foreign keys and indexes)
+is read from information_schema in one batched query and kept in memory,
+so opening a dialog or loading a table does not need SHOW TABLES / DESCRIBE
+round-trips. The cache is reloaded after `ttl` seconds or on invalidate().
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+CATALOG_TTL = 300       # seconds
+
+Column = namedtuple("Column", "name data_type column_type nullable auto_increment")
+ForeignKey = namedtuple("ForeignKey", "name columns ref_table ref_columns")
+Index = namedtuple("Index", "name columns unique")
+
+
+def text(value):
+    """information_schema text can come back as bytes depending on server collation."""
+    return value.decode() if isinstance(value, (bytes, bytearray)) else value
+
+
+# One round-trip for everything: each branch tags its rows with a kind.
+SCHEMA_QUERY = """
+SELECT 'T' AS kind, TABLE_NAME, TABLE_TYPE, 0, CAST(IFNULL(TABLE_ROWS, 0) AS CHAR), NULL, NULL
+FROM information_schema.TABLES
+WHERE TABLE_SCHEMA = DATABASE()
+UNION ALL
+SELECT 'C', TABLE_NAME, COLUMN_NAME, ORDINAL_POSITION, DATA_TYPE, COLUMN_TYPE,
+       CONCAT(IS_NULLABLE, ':', EXTRA)
+FROM information_schema.COLUMNS
+WHERE TABLE_SCHEMA = DATABASE()
+UNION ALL
+SELECT 'I', TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX, COLUMN_NAME, CAST(NON_UNIQUE AS CHAR), NULL
+FROM information_schema.STATISTICS
+WHERE TABLE_SCHEMA = DATABASE()
+UNION ALL
+SELECT 'F', TABLE_NAME, CONSTRAINT_NAME, ORDINAL_POSITION, COLUMN_NAME,
+       REFERENCED_TABLE_NAME, REFERENCED_COLUMN_NAME
+FROM information_schema.KEY_COLUMN_USAGE
+WHERE TABLE_SCHEMA = DATABASE() AND REFERENCED_TABLE_NAME IS NOT NULL
+ORDER BY 1, 2, 4, 3
+"""
+
+
+class TableInfo:
+    def __init__(self, name, table_type="BASE TABLE", estimated_rows=0):
+        self.name = name
+        self.table_type = table_type
+        self.estimated_rows = estimated_rows
+        self.columns = []
+        self.indexes = {}           # index name -> Index
+        self.foreign_keys = {}      # constraint name -> ForeignKey
+
+    @property
+    def column_names(self):
+        return [c.name for c in self.columns]
+
+    @property
+    def primary_key(self):
+        """Primary key columns in index order ([] if the table has none)."""
+        index = self.indexes.get("PRIMARY")
+        return list(index.columns) if index else []
+
+    def column(self, name):
+        for c in self.columns:
+            if c.name == name:
+                return c
+        return None
+
+
+class SchemaCatalog:
+    """Thread-safe cache of TableInfo for the current database."""
+
+    def __init__(self, ttl=CATALOG_TTL):
+        self.ttl = ttl
+        self.tables = {}
+        self.loaded_at = None
+        self.lock = threading.Lock()
+
+    def is_fresh(self):
+        return self.loaded_at is not None and time.monotonic() - self.loaded_at < self.ttl
+
+    def invalidate(self):
+        with self.lock:
+            self.loaded_at = None
+
+    def load(self, conn):
+        """Read the whole schema in a single query and replace the cache."""
+        cursor = conn.cursor()
+        try:
+            cursor.execute(SCHEMA_QUERY)
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+
+        tables = {}
+        index_parts = {}
+        fk_parts = {}
+        for row in rows:
+            kind, table, name, pos, a, b, c = [text(v) for v in row]
+            info = tables.setdefault(table, TableInfo(table))
+            if kind == "T":
+                info.table_type = name
+                info.estimated_rows = int(a)
+            elif kind == "C":
+                nullable, extra = (c or ":").split(":", 1)
+                info.columns.append(Column(name, a, b, nullable == "YES", "auto_increment" in extra))
+            elif kind == "I":
+                cols, unique = index_parts.setdefault((table, name), ([], b == "0"))
+                cols.append(a)
+            elif kind == "F":
+                cols, ref_table, ref_cols = fk_parts.setdefault((table, name), ([], b, []))
+                cols.append(a)
+                ref_cols.append(c)
+
+        for (table, name), (cols, unique) in index_parts.items():
+            tables[table].indexes[name] = Index(name, tuple(cols), unique)
+        for (table, name), (cols, ref_table, ref_cols) in fk_parts.items():
+            tables[table].foreign_keys[name] = ForeignKey(name, tuple(cols), ref_table, tuple(ref_cols))
+
+        with self.lock:
+            self.tables = tables
+            self.loaded_at = time.monotonic()
+        return tables
+
+    def ensure(self, conn):
+        """Reload if the cache is empty or older than the TTL."""
+        if not self.is_fresh():
+            self.load(conn)
+        return self.tables
+
+    def table(self, name):
+        with self.lock:
+            return self.tables.get(name)
+
+    def table_names(self):
+        with self.lock:
+            return sorted(self.tables)
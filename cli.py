@@ -0,0 +1,177 @@
+"""
+Command-line entry point for CineBase jobs that do not need the GUI.
+
+    python cli.py import movies.csv --table Movie
+    python cli.py import reviews.jsonl --table Review --batch 2000
+    python cli.py export reviews.parquet --table Review
+    python cli.py export top.csv --query "SELECT * FROM Movie_Rating_Stats WHERE RatingCount > 100"
+    python cli.py serve --port 8080
+    python cli.py archive-log --keep-days 90
+    python cli.py purge-users --inactive-days 365 --dry-run
+    python cli.py refresh-title-detail
+
+Uses the same `.env` settings as the GUI.
+"""
+
+import argparse
+import sys
+
+from mysql.connector import Error
+
+from catalog import SchemaCatalog
+from db import DatabasePool
+from exporter import CHUNK_ROWS, Exporter
+from exporter import FORMATS as EXPORT_FORMATS
+from importer import BATCH_ROWS, COMMIT_ROWS, FORMATS, BulkImporter
+from server import HOST, PORT, CineBaseServer
+from service import LOG_ARCHIVE_BATCH, LOG_ARCHIVE_DAYS, PURGE_BATCH, PURGE_INACTIVE_DAYS, PURGE_PAUSE_MS, CineBaseService
+
+PROGRESS_EVERY = 2.0     # seconds between progress lines
+
+
+def progress_printer():
+    """on_progress callback printing a rows/s line at most every PROGRESS_EVERY seconds"""
+    last = [0.0]
+
+    def report(progress):
+        if progress.elapsed - last[0] >= PROGRESS_EVERY:
+            last[0] = progress.elapsed
+            print(f"  {progress}", file=sys.stderr, flush=True)
+    return report
+
+
+def cmd_import(db_pool, args):
+    catalog = SchemaCatalog()
+    with db_pool.connection() as conn:
+        info = catalog.load(conn).get(args.table)
+    if info is None:
+        raise ValueError(f"Unknown table {args.table}")
+
+    importer = BulkImporter(db_pool, info, args.file, fmt=args.format, batch_rows=args.batch,
+                            commit_rows=args.commit_every, load_data=not args.no_load_data,
+                            on_progress=progress_printer())
+    try:
+        # No retries: a retry would import the already committed part again
+        progress = db_pool.run(importer.run, retries=0)
+    except KeyboardInterrupt:
+        print(f"Interrupted after {importer.progress.committed:,} committed rows", file=sys.stderr)
+        return 130
+    verb = "Stopped after" if progress.stopped else "Imported"
+    print(f"{verb} {progress} into {args.table} using {progress.method}")
+    return 0
+
+
+def cmd_export(db_pool, args):
+    if args.table:
+        exporter = Exporter.for_table(db_pool, args.table, args.file, fmt=args.format,
+                                      chunk_rows=args.chunk, on_progress=progress_printer())
+    else:
+        exporter = Exporter(db_pool, args.query, args.file, fmt=args.format,
+                            chunk_rows=args.chunk, on_progress=progress_printer())
+    try:
+        progress = exporter.run()
+    except KeyboardInterrupt:
+        print("Interrupted; no file was written", file=sys.stderr)
+        return 130
+    print(f"Exported {progress} to {args.file}")
+    return 0
+
+
+def cmd_serve(db_pool, args):
+    server = CineBaseServer(DatabasePool(size=args.pool) if args.pool else None,
+                            host=args.host, port=args.port, allow_writes=args.allow_writes)
+    try:
+        server.run()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_archive_log(db_pool, args):
+    service = CineBaseService(db_pool, SchemaCatalog())
+    # No retries: each batch commits on its own, and a rerun simply continues
+    moved = db_pool.run(lambda conn: service.archive_log(conn, args.keep_days, args.batch), retries=0)
+    print(f"Archived {moved:,} Review_Log entries older than {args.keep_days} days")
+    return 0
+
+
+def cmd_refresh_title_detail(db_pool, args):
+    service = CineBaseService(db_pool, SchemaCatalog())
+    # No retries: like every write, a rebuild is not repeated after a lost connection
+    titles = db_pool.run(service.rebuild_titles, retries=0)
+    print(f"Rebuilt Title_Detail for {titles:,} movies and shows")
+    return 0
+
+
+def cmd_purge_users(db_pool, args):
+    service = CineBaseService(db_pool, SchemaCatalog())
+    # No retries: each batch commits on its own, and a rerun simply continues
+    eligible, deleted = db_pool.run(lambda conn: service.purge_users(
+        conn, args.inactive_days, args.batch, args.pause_ms, args.dry_run), retries=0)
+    if args.dry_run:
+        print(f"{eligible:,} users joined more than {args.inactive_days} days ago and have no reviews")
+    else:
+        print(f"Deleted {deleted:,} of {eligible:,} inactive users")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="CineBase command-line jobs")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("import", help="bulk-load a CSV or JSONL file into a table")
+    p.add_argument("file")
+    p.add_argument("--table", required=True, help="target table, e.g. Movie, TV_Show, Review")
+    p.add_argument("--format", choices=FORMATS, help="file format (default: from the extension)")
+    p.add_argument("--batch", type=int, default=BATCH_ROWS, help="rows per executemany batch")
+    p.add_argument("--commit-every", type=int, default=COMMIT_ROWS, help="rows per transaction")
+    p.add_argument("--no-load-data", action="store_true", help="never use LOAD DATA LOCAL INFILE")
+    p.set_defaults(run=cmd_import)
+
+    p = commands.add_parser("export", help="stream a table or query result to CSV, JSONL or Parquet")
+    p.add_argument("file")
+    source = p.add_mutually_exclusive_group(required=True)
+    source.add_argument("--table", help="table to export")
+    source.add_argument("--query", help="SELECT statement to export")
+    p.add_argument("--format", choices=EXPORT_FORMATS, help="file format (default: from the extension)")
+    p.add_argument("--chunk", type=int, default=CHUNK_ROWS, help="rows fetched and written at a time")
+    p.set_defaults(run=cmd_export)
+
+    p = commands.add_parser("serve", help="run the REST / JSON API server")
+    p.add_argument("--host", default=HOST, help=f"address to listen on (default: {HOST})")
+    p.add_argument("--port", type=int, default=PORT, help=f"port to listen on (default: {PORT})")
+    p.add_argument("--pool", type=int, help="database connections, i.e. requests served at once (default: DB_POOL_SIZE)")
+    p.add_argument("--allow-writes", action="store_true",
+                   help="accept POST / PATCH / DELETE with the CINEBASE_API_TOKEN bearer token (default: read-only)")
+    p.set_defaults(run=cmd_serve)
+
+    p = commands.add_parser("archive-log", help="move old Review_Log entries to Review_Log_Archive")
+    p.add_argument("--keep-days", type=int, default=LOG_ARCHIVE_DAYS, help="days of log kept in Review_Log")
+    p.add_argument("--batch", type=int, default=LOG_ARCHIVE_BATCH, help="entries moved per transaction")
+    p.set_defaults(run=cmd_archive_log)
+
+    p = commands.add_parser("refresh-title-detail", help="recompute the precomputed Title_Detail rows")
+    p.set_defaults(run=cmd_refresh_title_detail)
+
+    p = commands.add_parser("purge-users", help="delete old accounts that never wrote a review")
+    p.add_argument("--inactive-days", type=int, default=PURGE_INACTIVE_DAYS,
+                   help="only users who joined more than this many days ago")
+    p.add_argument("--batch", type=int, default=PURGE_BATCH, help="users deleted per transaction")
+    p.add_argument("--pause-ms", type=int, default=PURGE_PAUSE_MS, help="pause between batches, for replicas")
+    p.add_argument("--dry-run", action="store_true", help="only count the users that would be deleted")
+    p.set_defaults(run=cmd_purge_users)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    db_pool = DatabasePool(size=2)
+    try:
+        return args.run(db_pool, args)
+    except (Error, ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""
+Connection handling for CineBase.
+
+Settings come from the `.env` file (DB_HOST, DB_PORT, DB_USER, DB_PASS,
+DB_NAME, plus optional DB_POOL_SIZE / DB_POOL_TIMEOUT). DatabasePool hands
+out connections from a mysql.connector pool: every checkout is pinged (and
+reconnected if the server dropped it), work that fails on a dropped
+connection or a deadlock is retried with backoff, and checkout counts are
+kept for the utilisation readout in the GUI.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import mysql.connector
+from mysql.connector import errorcode, pooling
+from mysql.connector import Error
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+DB_HOST = os.getenv("DB_HOST", "localhost")
+DB_PORT = int(os.getenv("DB_PORT", "3306"))
+DB_USER = os.getenv("DB_USER", "root")
+DB_PASS = os.getenv("DB_PASS", "")
+DB_NAME = os.getenv("DB_NAME", "cinebase")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "6"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+RETRIES = 3
+BACKOFF = 0.2            # seconds, doubled after every failed attempt
+
+# Errors after which the same work may safely be tried again: the connection
+# was lost (so the transaction was rolled back) or InnoDB picked us as a victim.
+TRANSIENT_ERRORS = {
+    errorcode.CR_SERVER_GONE_ERROR,
+    errorcode.CR_SERVER_LOST,
+    errorcode.CR_CONN_HOST_ERROR,
+    errorcode.CR_SERVER_LOST_EXTENDED,
+    errorcode.ER_LOCK_DEADLOCK,
+    errorcode.ER_LOCK_WAIT_TIMEOUT,
+}
+
+
+def db_config():
+    return dict(host=DB_HOST, port=DB_PORT, user=DB_USER, password=DB_PASS, database=DB_NAME)
+
+
+def is_transient(e):
+    return isinstance(e, Error) and e.errno in TRANSIENT_ERRORS
+
+
+class DatabasePool:
+    """
+    Thread-safe pool of MySQL connections. The underlying pool is created on
+    first use, so constructing a DatabasePool never touches the network.
+    """
+
+    def __init__(self, size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT, profiler=None, **config):
+        self.size = size
+        self.timeout = timeout
+        self.config = config or db_config()
+        self.profiler = profiler    # a profiler.Profiler timing every statement, if set
+        self._pool = None
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        # metrics
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.checkouts = 0
+        self.wait_time = 0.0
+        self.reconnects = 0
+        self.retries = 0
+        self.failures = 0
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = pooling.MySQLConnectionPool(
+                    pool_name=f"cinebase-{id(self)}", pool_size=self.size, **self.config)
+            return self._pool
+
+    def checkout(self):
+        """Take a live connection out of the pool; blocks while all are in use."""
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            raise pooling.PoolError(f"No free database connection after {self.timeout:.0f}s")
+        try:
+            conn = self._get_pool().get_connection()
+            try:
+                conn.ping(reconnect=False)
+            except Error:
+                conn.ping(reconnect=True, attempts=RETRIES, delay=1)
+                with self._lock:
+                    self.reconnects += 1
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            self.wait_time += time.perf_counter() - started
+        return conn
+
+    def release(self, conn):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.close()        # returns it to the pool
+        except Error:
+            pass
+        finally:
+            with self._lock:
+                self.in_use -= 1
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        conn = self.checkout()
+        try:
+            yield self.profiler.wrap(conn) if self.profiler is not None else conn
+        finally:
+            self.release(conn)
+
+    @contextmanager
+    def cursor(self, **kwargs):
+        """A fresh cursor on a pooled connection, for a single operation."""
+        with self.connection() as conn:
+            cursor = conn.cursor(**kwargs)
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+
+    def run(self, work, retries=RETRIES, on_checkout=None):
+        """
+        Call `work(conn)` on a pooled connection and return its result.
+        Transient failures (lost connection, deadlock) are retried with backoff.
+        """
+        delay = BACKOFF
+        for attempt in range(retries + 1):
+            try:
+                with self.connection() as conn:
+                    if on_checkout is not None:
+                        on_checkout(conn)
+                    return work(conn)
+            except Error as e:
+                if not is_transient(e) or attempt == retries:
+                    with self._lock:
+                        self.failures += 1
+                    raise
+                with self._lock:
+                    self.retries += 1
+                time.sleep(delay)
+                delay *= 2
+
+    def dedicated_connection(self, profile=True, **options):
+        """
+        A connection outside the pool, for long-lived result streams and
+        KILL QUERY, which must not hold a pooled slot. Close it when done.
+        `options` override the connection settings (e.g. allow_local_infile).
+        """
+        conn = mysql.connector.connect(**{**self.config, **options})
+        if profile and self.profiler is not None:
+            return self.profiler.wrap(conn)
+        return conn
+
+    def kill_query(self, connection_id):
+        """Abort the statement running on another connection; errors are ignored."""
+        try:
+            conn = self.dedicated_connection(profile=False)
+            try:
+                cursor = conn.cursor()
+                cursor.execute(f"KILL QUERY {int(connection_id)}")
+                cursor.close()
+            finally:
+                conn.close()
+        except Exception:
+            pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": self.size,
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "utilisation": self.in_use / self.size,
+                "checkouts": self.checkouts,
+                "avg_wait_ms": 1000 * self.wait_time / self.checkouts if self.checkouts else 0.0,
+                "reconnects": self.reconnects,
+                "retries": self.retries,
+                "failures": self.failures,
+            }
@@ -0,0 +1,163 @@
+"""
+Background query execution for the CineBase GUI.
+
+Database work is submitted as a function `work(conn)` and runs on a small
+thread pool; each job checks a connection out of the DatabasePool for as long
+as it runs (and is retried there on transient errors). Long streams that
+open a connection of their own go through submit_stream(). Results are
+put on a queue that the Tk mainloop drains with `root.after`, so callbacks
+always run on the Tk thread and may touch widgets freely.
+"""
+
+import queue
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+POLL_MS = 30
+WORKERS = 4
+
+
+class QueryTask:
+    """Handle for submitted work. `cancel()` stops it before or while it runs."""
+
+    def __init__(self, executor, stop=None):
+        self.executor = executor
+        self.future = None
+        self.connection_id = None   # set while the task is running on a worker
+        self.stop = stop            # stops work that runs on its own connection
+        self.cancelled = False
+
+    def running(self):
+        return self.future is not None and self.future.running()
+
+    def done(self):
+        return self.future is not None and self.future.done()
+
+    def cancel(self):
+        """Drop the task; if the query is already on the server, KILL it."""
+        self.cancelled = True
+        if self.future is None or self.future.cancel():
+            return
+        if self.stop is not None:
+            if not self.future.done():
+                threading.Thread(target=self.stop, daemon=True).start()
+            return
+        conn_id = self.connection_id
+        if conn_id is not None and not self.future.done():
+            self.executor.kill_query(conn_id)
+
+
+class QueryExecutor:
+    def __init__(self, root, db_pool, workers=WORKERS, poll_ms=POLL_MS):
+        self.root = root
+        self.db_pool = db_pool
+        self.poll_ms = poll_ms
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cinebase-db")
+        self.completed = queue.Queue()
+        self.tasks = {}             # key -> latest QueryTask submitted under that key
+        self.active = set()
+        self.listeners = []         # called with the number of active tasks
+        self.closed = False
+        self._after_id = self.root.after(self.poll_ms, self._poll)
+
+    # ---------------- Worker side ----------------
+    def _run(self, task, work, retries):
+        if task.cancelled:
+            raise CancelledError()
+
+        def checked_out(conn):
+            task.connection_id = conn.connection_id
+
+        try:
+            if retries is None:
+                return self.db_pool.run(work, on_checkout=checked_out)
+            return self.db_pool.run(work, retries=retries, on_checkout=checked_out)
+        finally:
+            task.connection_id = None
+
+    @staticmethod
+    def _run_stream(task, work):
+        if task.cancelled:
+            raise CancelledError()
+        return work()
+
+    def kill_query(self, connection_id):
+        """Abort the statement running on another connection (used to cancel a task)."""
+        threading.Thread(target=self.db_pool.kill_query, args=(connection_id,), daemon=True).start()
+
+    # ---------------- Tk side ----------------
+    def submit(self, work, on_done=None, on_error=None, key=None, retries=None):
+        """
+        Run `work(conn)` on a worker. `on_done(result)` or `on_error(exc)` is
+        called on the Tk thread. Submitting again under the same `key`
+        cancels the previous task, so e.g. reloading a tab drops a stale load.
+        Writes go through submit_write() instead.
+        """
+        task = QueryTask(self)
+        return self._start(task, key, on_done, on_error, self._run, task, work, retries)
+
+    def submit_write(self, work, on_done=None, on_error=None, key=None):
+        """
+        submit() for work that writes: it is never retried, since a connection
+        lost after the COMMIT would otherwise run it a second time.
+        """
+        return self.submit(work, on_done, on_error, key=key, retries=0)
+
+    def submit_stream(self, work, stop, on_done=None, on_error=None, key=None):
+        """
+        Run `work()` on a worker without a pooled connection, for streams that
+        open their own (e.g. Exporter.run); cancelling the task calls `stop()`.
+        """
+        task = QueryTask(self, stop=stop)
+        return self._start(task, key, on_done, on_error, self._run_stream, task, work)
+
+    def _start(self, task, key, on_done, on_error, fn, *args):
+        if key is not None:
+            previous = self.tasks.get(key)
+            if previous is not None and not previous.done():
+                previous.cancel()
+            self.tasks[key] = task
+        task.future = self.pool.submit(fn, *args)
+        self.active.add(task)
+        self._notify()
+        task.future.add_done_callback(lambda f: self.completed.put((task, on_done, on_error)))
+        return task
+
+    def cancel_all(self):
+        for task in list(self.active):
+            task.cancel()
+
+    def _poll(self):
+        try:
+            while True:
+                task, on_done, on_error = self.completed.get_nowait()
+                self.active.discard(task)
+                self._deliver(task, on_done, on_error)
+                self._notify()
+        except queue.Empty:
+            pass
+        if not self.closed:
+            self._after_id = self.root.after(self.poll_ms, self._poll)
+
+    def _deliver(self, task, on_done, on_error):
+        if task.cancelled or task.future.cancelled():
+            return
+        exc = task.future.exception()
+        if exc is not None:
+            if on_error is not None:
+                on_error(exc)
+            else:
+                self.root.report_callback_exception(type(exc), exc, exc.__traceback__)
+        elif on_done is not None:
+            on_done(task.future.result())
+
+    def _notify(self):
+        for listener in self.listeners:
+            listener(len(self.active))
+
+    def shutdown(self):
+        self.closed = True
+        self.cancel_all()
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+        self.pool.shutdown(wait=False, cancel_futures=True)
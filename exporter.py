@@ -0,0 +1,253 @@
+"""
+Streaming export of a table or query result to CSV, JSONL or Parquet.
+
+The result is read through a StreamPager (an unbuffered cursor) on a
+connection of its own, outside the pool, and written chunk by chunk, so memory use depends on the chunk size, not on the size of
+the result. Output goes to `<path>.part` and is renamed into place once
+complete; a failed or stopped export leaves no partial file behind.
+
+Parquet needs pyarrow, which is only imported when a Parquet export is made.
+"""
+
+import csv
+import datetime
+import decimal
+import json
+import os
+import threading
+import time
+
+from mysql.connector import Error
+from mysql.connector.constants import FieldType
+
+from paging import StreamPager
+
+CHUNK_ROWS = 10000       # rows fetched and written at a time (one Parquet row group)
+FORMATS = ("csv", "jsonl", "parquet")
+
+
+def detect_format(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if ext in (".parquet", ".pq"):
+        return "parquet"
+    raise ValueError(f"Cannot tell the format of {os.path.basename(path)}; use csv, jsonl or parquet")
+
+
+def text_value(value):
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode("utf-8", "replace")
+    if isinstance(value, (set, frozenset)):     # SET columns
+        return ",".join(sorted(value))
+    return value
+
+
+# ---------------- Writers ----------------
+class CsvWriter:
+    """NULL is written as an empty cell, which the importer reads back as NULL."""
+
+    def __init__(self, path, columns, description):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(columns)
+
+    def write(self, rows):
+        self.writer.writerows(["" if v is None else text_value(v) for v in row] for row in rows)
+
+    def close(self):
+        self.file.close()
+
+
+def json_value(value):
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (datetime.date, datetime.datetime, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return str(value)
+    value = text_value(value)
+    if isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+class JsonlWriter:
+    def __init__(self, path, columns, description):
+        self.file = open(path, "w", encoding="utf-8")
+        self.columns = columns
+
+    def write(self, rows):
+        self.file.writelines(
+            json.dumps(dict(zip(self.columns, row)), default=json_value, ensure_ascii=False) + "\n"
+            for row in rows)
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    """One row group per chunk; column types come from the cursor description."""
+
+    INTEGER = {FieldType.TINY, FieldType.SHORT, FieldType.LONG, FieldType.LONGLONG,
+               FieldType.INT24, FieldType.YEAR, FieldType.BIT}
+    FLOAT = {FieldType.FLOAT, FieldType.DOUBLE, FieldType.DECIMAL, FieldType.NEWDECIMAL}
+
+    def __init__(self, path, columns, description):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ValueError("Parquet export needs pyarrow (pip install pyarrow)") from None
+        self.pa = pyarrow
+        self.types = [self.arrow_type(d[1]) for d in description]
+        self.schema = pyarrow.schema(list(zip(columns, self.types)))
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+
+    def arrow_type(self, type_code):
+        pa = self.pa
+        if type_code in self.INTEGER:
+            return pa.int64()
+        if type_code in self.FLOAT:
+            return pa.float64()     # DECIMAL is written as double
+        if type_code in (FieldType.DATE, FieldType.NEWDATE):
+            return pa.date32()
+        if type_code in (FieldType.DATETIME, FieldType.TIMESTAMP):
+            return pa.timestamp("us")
+        if type_code == FieldType.TIME:
+            return pa.duration("us")
+        return pa.string()
+
+    def convert(self, values, arrow_type):
+        if arrow_type == self.pa.float64():
+            return [None if v is None else float(v) for v in values]
+        if arrow_type == self.pa.string():
+            return [None if v is None else str(text_value(v)) for v in values]
+        return values
+
+    def write(self, rows):
+        columns = list(zip(*rows))
+        arrays = [self.pa.array(self.convert(values, t), type=t) for values, t in zip(columns, self.types)]
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+WRITERS = {"csv": CsvWriter, "jsonl": JsonlWriter, "parquet": ParquetWriter}
+
+
+# ---------------- Exporter ----------------
+class ExportProgress:
+    def __init__(self):
+        self.rows = 0
+        self.bytes = 0
+        self.started = time.perf_counter()
+        self.finished = None
+        self.stopped = False
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def rows_per_sec(self):
+        elapsed = self.elapsed
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+    def __str__(self):
+        return (f"{self.rows:,} rows, {self.bytes / 1e6:,.1f} MB in {self.elapsed:.1f}s "
+                f"({self.rows_per_sec:,.0f} rows/s)")
+
+
+class Exporter:
+    """
+    Stream `query` into `path`. `run()` streams on a dedicated connection,
+    so a long export does not hold one of the pool's; `stop()` may be
+    called from any thread and KILLs the statement.
+    """
+
+    def __init__(self, db_pool, query, path, params=None, fmt=None, chunk_rows=CHUNK_ROWS, on_progress=None):
+        self.db_pool = db_pool
+        self.query = query
+        self.params = params
+        self.path = path
+        self.fmt = fmt or detect_format(path)
+        if self.fmt not in FORMATS:
+            raise ValueError(f"Unknown export format {self.fmt!r}")
+        self.chunk_rows = chunk_rows
+        self.on_progress = on_progress      # called on the exporting thread after every chunk
+        self.progress = ExportProgress()
+        self._stopping = threading.Event()
+        self._connection_id = None
+
+    @classmethod
+    def for_table(cls, db_pool, table, path, **kwargs):
+        return cls(db_pool, f"SELECT * FROM {table}", path, **kwargs)
+
+    def stop(self):
+        self._stopping.set()
+        conn_id = self._connection_id
+        if conn_id is not None:
+            self.db_pool.kill_query(conn_id)
+
+    def run(self):
+        self.progress = progress = ExportProgress()
+        partial = self.path + ".part"
+        conn = self.db_pool.dedicated_connection()
+        self._connection_id = conn.connection_id
+        stream = writer = None
+        try:
+            # On an early exit (stop, error, Ctrl-C) close() kills the statement instead of
+            # draining the rest of the result into memory
+            stream = StreamPager(conn, self.query, self.params, page_size=self.chunk_rows,
+                                 owns_connection=False, kill_query=self.db_pool.kill_query)
+            writer = WRITERS[self.fmt](partial, stream.columns, stream.cursor.description)
+            while not stream.at_end:
+                rows = stream.next_page()
+                if rows:
+                    writer.write(rows)
+                progress.rows = stream.row_count
+                progress.bytes = os.path.getsize(partial)
+                if self.on_progress is not None:
+                    self.on_progress(progress)
+                if self._stopping.is_set():
+                    progress.stopped = True
+                    break
+            writer.close()
+            writer = None
+            if progress.stopped:
+                os.remove(partial)
+            else:
+                os.replace(partial, self.path)
+        except Error:
+            if not self._stopping.is_set():
+                self._discard(writer, partial)
+                raise
+            progress.stopped = True     # the stream was killed by stop()
+            self._discard(writer, partial)
+        except BaseException:
+            self._discard(writer, partial)
+            raise
+        finally:
+            self._connection_id = None
+            if stream is not None:
+                stream.close()
+            try:
+                conn.close()
+            except Exception:
+                pass
+            progress.finished = time.perf_counter()
+        return progress
+
+    @staticmethod
+    def _discard(writer, partial):
+        try:
+            if writer is not None:
+                writer.close()
+            if os.path.exists(partial):
+                os.remove(partial)
+        except OSError:
+            pass
@@ -0,0 +1,365 @@
+"""
+Bulk import of CSV and JSONL files.
+
+Records are read in chunks and written with `executemany` batches (which the
+connector sends as multi-row INSERTs) inside large transactions, one commit
+per `commit_rows` rows. Movie and TV_Show files may carry a `Genre` field
+(several names separated by "|", or a JSON list); names are resolved through
+an in-memory map of the Genre table loaded once per import, instead of the
+per-row `SELECT GenreID` done by AddMovieWithGenre, and the link rows are
+batched too.
+
+Plain CSV files go through `LOAD DATA LOCAL INFILE` when the server allows
+it, which is several times faster again; otherwise, or if the server refuses,
+the batched INSERT path is used.
+
+Progress (rows, elapsed time, rows/s) is kept on an ImportProgress object
+that the caller may read from another thread.
+"""
+
+import csv
+import json
+import os
+import threading
+import time
+from itertools import islice
+
+from mysql.connector import Error, errorcode
+
+BATCH_ROWS = 1000        # rows per executemany call
+COMMIT_ROWS = 50000      # rows per transaction
+GENRE_FIELDS = ("genre", "genres")
+GENRE_SEPARATOR = "|"
+GENRE_LINKS = {          # title table -> (link table, link column)
+    "Movie": ("Movie_Genre", "MovieID"),
+    "TV_Show": ("Show_Genre", "ShowID"),
+}
+FORMATS = ("csv", "jsonl")
+
+# The server or the client refused LOCAL INFILE: fall back to INSERT batches
+LOCAL_INFILE_REFUSED = {
+    errorcode.ER_NOT_ALLOWED_COMMAND,
+    getattr(errorcode, "ER_CLIENT_LOCAL_FILES_DISABLED", 3948),
+}
+
+
+# ---------------- Readers ----------------
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        yield from csv.DictReader(f)
+
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        for n, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{os.path.basename(path)} line {n}: {e}") from None
+            if not isinstance(record, dict):
+                raise ValueError(f"{os.path.basename(path)} line {n}: expected a JSON object")
+            yield record
+
+
+READERS = {"csv": read_csv, "jsonl": read_jsonl}
+
+
+def detect_format(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    raise ValueError(f"Cannot tell the format of {os.path.basename(path)}; use csv or jsonl")
+
+
+def chunks(iterable, size):
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def cell(value):
+    """Empty CSV cells are NULL, as in the Add Row dialog."""
+    return None if value == "" else value
+
+
+def genre_names(value):
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        names = value
+    else:
+        names = str(value).split(GENRE_SEPARATOR)
+    return [n.strip() for n in names if n and n.strip()]
+
+
+# ---------------- Genres ----------------
+class GenreMap:
+    """Genre name -> GenreID, read once; names not in the table are created on first use."""
+
+    def __init__(self, conn):
+        self.ids = {}
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT GenreID, Name FROM Genre ORDER BY GenreID")
+            for genre_id, name in cursor.fetchall():
+                self.ids.setdefault(self.key(name), genre_id)
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def key(name):
+        # Genre.Name compares case-insensitively under the default collation
+        return name.strip().casefold()
+
+    def resolve(self, cursor, name):
+        key = self.key(name)
+        if key not in self.ids:
+            cursor.execute("INSERT INTO Genre (Name) VALUES (%s)", (name.strip(),))
+            self.ids[key] = cursor.lastrowid
+        return self.ids[key]
+
+
+# ---------------- Progress ----------------
+class ImportProgress:
+    def __init__(self):
+        self.rows = 0               # rows written, committed or not
+        self.committed = 0
+        self.links = 0              # genre link rows written
+        self.warnings = 0
+        self.method = None          # "LOAD DATA" or "INSERT batches"
+        self.started = time.perf_counter()
+        self.finished = None
+        self.stopped = False
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def rows_per_sec(self):
+        elapsed = self.elapsed
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+    def __str__(self):
+        text = f"{self.rows:,} rows in {self.elapsed:.1f}s ({self.rows_per_sec:,.0f} rows/s)"
+        if self.links:
+            text += f", {self.links:,} genre links"
+        if self.warnings:
+            text += f", {self.warnings:,} warnings"
+        return text
+
+
+# ---------------- Importer ----------------
+class BulkImporter:
+    """
+    Import `path` into the table described by `table_info` (a catalog TableInfo).
+    `run(conn)` does the work on the caller's thread; `stop()` may be called
+    from any thread and takes effect after the current batch, rolling back
+    the uncommitted part.
+    """
+
+    def __init__(self, db_pool, table_info, path, fmt=None, batch_rows=BATCH_ROWS,
+                 commit_rows=COMMIT_ROWS, load_data=True, on_progress=None):
+        self.db_pool = db_pool
+        self.info = table_info
+        self.table = table_info.name
+        self.path = path
+        self.fmt = fmt or detect_format(path)
+        if self.fmt not in FORMATS:
+            raise ValueError(f"Unknown import format {self.fmt!r}")
+        self.batch_rows = batch_rows
+        self.commit_rows = max(commit_rows, batch_rows)
+        self.load_data = load_data
+        self.on_progress = on_progress      # called on the importing thread after every batch
+        self.progress = ImportProgress()
+        self._stopping = threading.Event()
+        self._load_connection_id = None
+
+    def stop(self):
+        self._stopping.set()
+        conn_id = self._load_connection_id
+        if conn_id is not None:
+            self.db_pool.kill_query(conn_id)
+
+    def map_fields(self, fields):
+        """Pair record fields with table columns; returns ([(field, column)], genre field or None)."""
+        by_name = {c.casefold(): c for c in self.info.column_names}
+        columns, genre_field, unknown = [], None, []
+        for field in fields:
+            key = field.strip().casefold()
+            if key in by_name:
+                columns.append((field, by_name[key]))
+            elif key in GENRE_FIELDS and self.table in GENRE_LINKS:
+                genre_field = field
+            else:
+                unknown.append(field)
+        if unknown:
+            raise ValueError(f"{self.table} has no column(s): {', '.join(unknown)}")
+        if not columns:
+            raise ValueError(f"No columns of {self.table} found in {os.path.basename(self.path)}")
+        return columns, genre_field
+
+    def run(self, conn):
+        progress = self.progress
+        records = READERS[self.fmt](self.path)
+        first = next(records, None)
+        if first is None:
+            progress.finished = time.perf_counter()
+            return progress
+        columns, genre_field = self.map_fields(list(first))
+
+        if self.fmt == "csv" and genre_field is None and self.load_data and self.local_infile_enabled(conn):
+            try:
+                return self.run_load_data(columns)
+            except Error as e:
+                if e.errno not in LOCAL_INFILE_REFUSED:
+                    raise
+
+        records = _prepend(first, records)
+        return self.run_batches(conn, records, columns, genre_field)
+
+    # -------- LOAD DATA LOCAL INFILE --------
+    @staticmethod
+    def local_infile_enabled(conn):
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT @@GLOBAL.local_infile")
+            return bool(int(cursor.fetchone()[0]))
+        finally:
+            cursor.close()
+
+    def load_data_statement(self, columns):
+        with open(self.path, "rb") as f:
+            line_end = "\\r\\n" if f.readline().endswith(b"\r\n") else "\\n"
+        variables = [f"@v{i}" for i in range(len(columns))]
+        assignments = [f"{col} = NULLIF(@v{i}, '')" for i, (_, col) in enumerate(columns)]
+        return (f"LOAD DATA LOCAL INFILE %s INTO TABLE {self.table} CHARACTER SET utf8mb4 "
+                "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+                f"LINES TERMINATED BY '{line_end}' IGNORE 1 LINES "
+                f"({', '.join(variables)}) SET {', '.join(assignments)}")
+
+    def run_load_data(self, columns):
+        progress = self.progress
+        progress.method = "LOAD DATA"
+        conn = self.db_pool.dedicated_connection(allow_local_infile=True)
+        try:
+            self._load_connection_id = conn.connection_id
+            cursor = conn.cursor()
+            try:
+                try:
+                    cursor.execute(self.load_data_statement(columns), (os.path.abspath(self.path),))
+                except Error:
+                    if not self._stopping.is_set():
+                        raise
+                    progress.stopped = True     # killed by stop(); nothing was committed
+                    progress.finished = time.perf_counter()
+                    return progress
+                progress.rows = cursor.rowcount
+                cursor.execute("SHOW COUNT(*) WARNINGS")
+                progress.warnings = cursor.fetchone()[0]
+                conn.commit()
+                progress.committed = progress.rows
+            finally:
+                cursor.close()
+        finally:
+            self._load_connection_id = None
+            conn.close()
+        progress.finished = time.perf_counter()
+        if self.on_progress is not None:
+            self.on_progress(progress)
+        return progress
+
+    # -------- executemany batches --------
+    def run_batches(self, conn, records, columns, genre_field):
+        progress = self.progress
+        progress.method = "INSERT batches"
+        col_names = [col for _, col in columns]
+        insert = (f"INSERT INTO {self.table} ({', '.join(col_names)}) "
+                  f"VALUES ({', '.join(['%s'] * len(col_names))})")
+
+        link = None
+        if genre_field is not None:
+            link_table, link_col = GENRE_LINKS[self.table]
+            link = f"INSERT INTO {link_table} ({link_col}, GenreID) VALUES (%s, %s)"
+            genres = GenreMap(conn)
+            pk_col = self.info.primary_key[0]
+            # Records without an id of their own (no such field, or a blank one) get AUTO_INCREMENT ids
+            pk_field = next((f for f, c in columns if c == pk_col), None)
+
+        cursor = conn.cursor()
+        uncommitted = 0
+        try:
+            for batch in chunks(records, self.batch_rows):
+                if self._stopping.is_set():
+                    conn.rollback()
+                    progress.rows = progress.committed
+                    progress.stopped = True
+                    break
+
+                if link is not None:
+                    before = self._max_id(cursor, pk_col)
+                cursor.executemany(insert, [[cell(r.get(f)) for f, _ in columns] for r in batch])
+                if link is not None:
+                    links = set()
+                    for title_id, record in zip(self._batch_ids(cursor, pk_col, before, batch, pk_field), batch):
+                        for name in genre_names(record.get(genre_field)):
+                            links.add((title_id, genres.resolve(cursor, name)))
+                    if links:
+                        cursor.executemany(link, sorted(links))
+                        progress.links += len(links)
+
+                progress.rows += len(batch)
+                uncommitted += len(batch)
+                if uncommitted >= self.commit_rows:
+                    conn.commit()
+                    progress.committed = progress.rows
+                    uncommitted = 0
+                if self.on_progress is not None:
+                    self.on_progress(progress)
+            else:
+                conn.commit()
+                progress.committed = progress.rows
+        except BaseException:
+            progress.rows = progress.committed
+            try:
+                conn.rollback()
+            except Error:
+                pass        # connection lost; the server has rolled back already
+            raise
+        finally:
+            cursor.close()
+            progress.finished = time.perf_counter()
+        return progress
+
+    def _max_id(self, cursor, pk_col):
+        cursor.execute(f"SELECT IFNULL(MAX({pk_col}), 0) FROM {self.table}")
+        return cursor.fetchall()[0][0]
+
+    def _batch_ids(self, cursor, pk_col, before, batch, pk_field):
+        """
+        The id of each record of a batch just inserted: its own, or the one
+        AUTO_INCREMENT gave it. Generated ids are read back, as in
+        bench/generate_data.py, since a multi-row INSERT may leave gaps.
+        """
+        given = [cell(r.get(pk_field)) if pk_field else None for r in batch]
+        given = [None if v is None else int(v) for v in given]
+        cursor.execute(f"SELECT {pk_col} FROM {self.table} WHERE {pk_col} > %s ORDER BY {pk_col}", (before,))
+        own = {v for v in given if v is not None}
+        generated = [row[0] for row in cursor.fetchall() if row[0] not in own]
+        if len(generated) != given.count(None):
+            raise ValueError(f"Could not read back the ids of the new {self.table} rows")
+        generated = iter(generated)
+        return [next(generated) if v is None else v for v in given]
+
+
+def _prepend(first, rest):
+    yield first
+    yield from rest
@@ -0,0 +1,405 @@
+"""
+Paged loading of table and query results for the CineBase GUI.
+
+Instead of `SELECT * ... fetchall()`, results are pulled one page at a time
+and only a bounded window of rows is kept in memory.
+
+- KeysetPager walks a table by its primary key
+  (`WHERE pk > last ORDER BY pk LIMIT n`) and can page in both directions.
+- StreamPager streams an arbitrary query through an unbuffered cursor on a
+  dedicated connection and pages forward only.
+- LogTail follows an append-only table by its AUTO_INCREMENT key, fetching
+  only the rows added since the last poll into a bounded ring buffer.
+- GridPager binds a pager to a VirtualGrid and fetches more pages on the
+  background QueryExecutor as the view is scrolled.
+
+Pagers are driven with the connection to run on (`next_page(conn)`), so a
+page can be fetched by whichever worker picks the job up.
+"""
+
+import time
+from collections import deque
+
+PAGE_SIZE = 1000         # rows fetched per round-trip
+WINDOW_PAGES = 200       # pages kept in the grid's buffer at any time
+PREFETCH_PAGES = 1       # fetch the next page once the view is this close to the end of the buffer
+TAIL_ROWS = 5000         # rows a LogTail keeps
+
+
+def keyset_condition(key_cols, op, key):
+    """
+    Build `(a, b) > (%s, %s)` in its expanded form
+    `a > %s OR (a = %s AND b > %s)`, which MySQL can turn into an index range scan.
+    `op` is ">" for the rows after `key` in ascending order and "<" for those
+    after it in descending order. NULL key values follow MySQL's ordering
+    (NULL before any value), which a plain comparison with NULL would not.
+    Returns the SQL fragment and its parameters.
+    """
+    parts = []
+    params = []
+    for i, (col, value) in enumerate(zip(key_cols, key)):
+        if value is None:
+            after = f"{col} IS NOT NULL" if op == ">" else None   # nothing follows NULL when descending
+            after_params = []
+        else:
+            after = f"{col} {op} %s" if op == ">" else f"({col} < %s OR {col} IS NULL)"
+            after_params = [value]
+        if after is not None:
+            eq = [f"{c} IS NULL" if v is None else f"{c} = %s" for c, v in zip(key_cols[:i], key)]
+            parts.append("(" + " AND ".join(eq + [after]) + ")")
+            params += [v for v in key[:i] if v is not None] + after_params
+    if not parts:
+        return "FALSE", []
+    return " OR ".join(parts), params
+
+
+class KeysetPager:
+    """
+    Pages through `table` in primary-key order using keyset pagination.
+    `where` (with its `params`) restricts the rows, e.g. to a time range.
+    """
+
+    def __init__(self, table, key_cols, page_size=PAGE_SIZE, descending=False, columns="*", where=None, params=()):
+        self.table = table
+        self.key_cols = list(key_cols)
+        self.page_size = page_size
+        self.descending = descending
+        self.select = columns
+        self.where = where
+        self.where_params = list(params)
+        self.columns = []
+        self.key_index = []
+        self.first_key = None   # key of the first row currently held by the caller
+        self.last_key = None    # key of the last row currently held by the caller
+        self.at_start = True
+        self.at_end = False
+
+    def key_of(self, row):
+        return tuple(row[i] for i in self.key_index)
+
+    def _fetch(self, conn, key, forward):
+        ascending = forward != self.descending
+        order = ", ".join(f"{c} {'ASC' if ascending else 'DESC'}" for c in self.key_cols)
+        sql = f"SELECT {self.select} FROM {self.table}"
+        conditions = []
+        params = []
+        if self.where:
+            conditions.append(f"({self.where})")
+            params += self.where_params
+        if key is not None:
+            cond, key_params = keyset_condition(self.key_cols, ">" if ascending else "<", key)
+            conditions.append(f"({cond})")
+            params += key_params
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY {order} LIMIT {int(self.page_size)}"
+
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+            if not self.columns:
+                self.columns = [d[0] for d in cursor.description]
+                self.key_index = [self.columns.index(c) for c in self.key_cols]
+        finally:
+            cursor.close()
+        return rows
+
+    def next_page(self, conn):
+        """Rows following the last held row, in display order."""
+        if self.at_end:
+            return []
+        rows = self._fetch(conn, self.last_key, forward=True)
+        if len(rows) < self.page_size:
+            self.at_end = True
+        if rows:
+            if self.first_key is None:
+                self.first_key = self.key_of(rows[0])
+            self.last_key = self.key_of(rows[-1])
+        return rows
+
+    def prev_page(self, conn):
+        """Rows preceding the first held row, in display order."""
+        if self.at_start or self.first_key is None:
+            return []
+        rows = self._fetch(conn, self.first_key, forward=False)
+        rows.reverse()
+        if len(rows) < self.page_size:
+            self.at_start = True
+        if rows:
+            self.first_key = self.key_of(rows[0])
+        return rows
+
+    def dropped_front(self, new_first_row):
+        """The caller discarded rows from the top of its window."""
+        self.first_key = self.key_of(new_first_row)
+        self.at_start = False
+
+    def dropped_back(self, new_last_row):
+        """The caller discarded rows from the bottom of its window."""
+        self.last_key = self.key_of(new_last_row)
+        self.at_end = False
+
+    def close(self):
+        pass
+
+
+class StreamPager:
+    """
+    Streams an arbitrary query with an unbuffered cursor on its own connection.
+    Forward-only: rows dropped from the window are gone until the query is rerun.
+    The `conn` passed to next_page() is ignored; the stream stays on its own.
+    With owns_connection=False the connection goes back to its owner on close,
+    so `kill_query(connection_id)` (e.g. DatabasePool.kill_query) is needed to
+    abort a stream that is closed before its end.
+    """
+
+    def __init__(self, conn, query, params=None, page_size=PAGE_SIZE, owns_connection=True, kill_query=None):
+        self.conn = conn
+        self.page_size = page_size
+        self.owns_connection = owns_connection
+        self.kill_query = kill_query
+        self.cursor = conn.cursor()
+        self.cursor.execute(query, params or ())
+        self.columns = [d[0] for d in self.cursor.description] if self.cursor.description else []
+        self.at_start = True
+        self.at_end = not self.columns
+        self.row_count = 0
+
+    def next_page(self, conn=None):
+        if self.at_end:
+            return []
+        rows = self.cursor.fetchmany(self.page_size)
+        self.row_count += len(rows)
+        if len(rows) < self.page_size:
+            self.at_end = True
+        return rows
+
+    def prev_page(self, conn=None):
+        return []
+
+    def dropped_front(self, new_first_row):
+        pass
+
+    def dropped_back(self, new_last_row):
+        # Rows are only ever dropped from the back when paging backwards,
+        # which a forward-only stream never does.
+        pass
+
+    def close(self):
+        """
+        Abandon the stream without draining the unread rows: an owned
+        connection is closed; a borrowed one has its statement killed first,
+        so only the rows already in flight are read off it.
+        """
+        if self.owns_connection:
+            try:
+                self.conn.close()
+            except Exception:
+                pass
+            return
+        if not self.at_end:
+            if self.kill_query is None:
+                raise ValueError("A borrowed connection cannot be freed mid-stream without kill_query")
+            self.kill_query(self.conn.connection_id)
+        try:
+            while self.cursor.fetchmany(self.page_size):
+                pass
+        except Exception:
+            pass        # the statement was killed
+        try:
+            self.cursor.close()
+        except Exception:
+            pass
+        self.at_end = True
+
+
+class LogTail:
+    """
+    Follows an append-only table such as Review_Log. start() reads the newest
+    `max_rows` rows through the (time, id) index; every poll() then fetches
+    only rows whose `id_col` is above the highest one seen, at most
+    `batch_rows` at a time. The newest `max_rows` rows are kept in `rows`,
+    oldest first; older ones fall off the front.
+
+    `keep(row)`, if given, filters new rows (e.g. to a time range). It is
+    applied here rather than in SQL so the key always advances past rows
+    it rejects. Rows committed late with a lower key than one already seen
+    (a long transaction) are only picked up by the next start().
+    """
+
+    def __init__(self, table, id_col, time_col, max_rows=TAIL_ROWS, batch_rows=PAGE_SIZE,
+                 where=None, params=(), keep=None):
+        self.table = table
+        self.id_col = id_col
+        self.time_col = time_col
+        self.batch_rows = batch_rows
+        self.where = where
+        self.where_params = list(params)
+        self.keep = keep
+        self.rows = deque(maxlen=max_rows)
+        self.columns = []
+        self.last_id = None
+        self.behind = False     # the last poll was cut off at batch_rows
+
+    @property
+    def max_rows(self):
+        return self.rows.maxlen
+
+    def _query(self, conn, sql, params):
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+            if not self.columns:
+                self.columns = [d[0] for d in cursor.description]
+        finally:
+            cursor.close()
+        return rows
+
+    def start(self, conn):
+        """Refill the buffer with the newest rows (matching `where`) and return them"""
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"SELECT MAX({self.id_col}) FROM {self.table}")
+            self.last_id = cursor.fetchone()[0] or 0
+        finally:
+            cursor.close()
+        conditions = [f"{self.id_col} <= %s"]
+        params = [self.last_id]
+        if self.where:
+            conditions.append(f"({self.where})")
+            params += self.where_params
+        rows = self._query(
+            conn,
+            f"SELECT * FROM {self.table} WHERE {' AND '.join(conditions)} "
+            f"ORDER BY {self.time_col} DESC, {self.id_col} DESC LIMIT {int(self.max_rows)}",
+            params)
+        rows.reverse()
+        self.rows.clear()
+        self.rows.extend(rows)
+        return rows
+
+    def poll(self, conn):
+        """
+        Rows added since the last poll, oldest first, and how many rows fell
+        off the front of the buffer to make room for them
+        """
+        if self.last_id is None:
+            return self.start(conn), 0
+        rows = self._query(
+            conn,
+            f"SELECT * FROM {self.table} WHERE {self.id_col} > %s ORDER BY {self.id_col} LIMIT {int(self.batch_rows)}",
+            [self.last_id])
+        self.behind = len(rows) == self.batch_rows
+        if rows:
+            self.last_id = rows[-1][self.columns.index(self.id_col)]
+        if self.keep is not None:
+            rows = [row for row in rows if self.keep(row)]
+        dropped = max(len(self.rows) + len(rows) - self.max_rows, 0)
+        self.rows.extend(rows)
+        return rows, dropped
+
+
+class GridPager:
+    """
+    Displays a pager in a VirtualGrid, keeping at most `window_pages` pages of
+    rows in its buffer and fetching more on `executor` as the user scrolls
+    towards either end. With a `profiler`, the time taken to put rows into
+    the grid is recorded under `name`.
+    """
+
+    def __init__(self, grid, executor, window_pages=WINDOW_PAGES, on_error=None, profiler=None, name="grid"):
+        self.grid = grid
+        self.executor = executor
+        self.window_pages = window_pages
+        self.on_error = on_error
+        self.profiler = profiler
+        self.name = name
+        self.pager = None
+        self._busy = False
+        self._task = None       # page fetch in flight, if any
+        self.grid.view_command = self._on_view
+
+    @property
+    def max_rows(self):
+        page = self.pager.page_size if self.pager else PAGE_SIZE
+        return page * self.window_pages
+
+    def show(self, pager, rows):
+        """Replace the current contents with `pager`, whose first page `rows` was fetched already."""
+        self.close()
+        self.pager = pager
+        started = time.perf_counter()
+        # The column list of a KeysetPager is only known after the first fetch.
+        self.grid.set_columns(pager.columns)
+        self._append(rows)
+        self._rendered(started, rows)
+
+    def show_rows(self, columns, rows):
+        """Show a small, fully fetched result (e.g. from a stored procedure) without a pager."""
+        self.close()
+        started = time.perf_counter()
+        self.grid.set_columns(columns)
+        self.grid.append_rows(rows)
+        self._rendered(started, rows)
+
+    def _rendered(self, started, rows):
+        if self.profiler is not None:
+            # update_idletasks() draws now, so the time includes the redraw
+            self.grid.update_idletasks()
+            self.profiler.record_render(self.name, time.perf_counter() - started, len(rows))
+
+    def close(self):
+        if self.pager is not None:
+            if self._task is not None:
+                self._task.cancel()
+            # Closing a stream talks to the server, so do it off the Tk thread
+            pager = self.pager
+            self.executor.submit(lambda conn: pager.close())
+        self.pager = None
+        self._busy = False
+        self._task = None
+
+    def _append(self, rows):
+        self.grid.append_rows(rows)
+        excess = len(self.grid) - self.max_rows
+        if excess > 0:
+            self.grid.drop_front(excess)
+            self.pager.dropped_front(self.grid.row(0))
+
+    def _prepend(self, rows):
+        self.grid.prepend_rows(rows)
+        excess = len(self.grid) - self.max_rows
+        if excess > 0:
+            self.grid.drop_back(excess)
+            self.pager.dropped_back(self.grid.row(len(self.grid) - 1))
+
+    def _on_view(self, top, bottom, total):
+        if self.pager is None or self._busy:
+            return
+        margin = self.pager.page_size * PREFETCH_PAGES
+        if bottom >= total - margin and not self.pager.at_end:
+            self._fetch(self.pager.next_page, self._append)
+        elif top <= margin and not self.pager.at_start:
+            self._fetch(self.pager.prev_page, self._prepend)
+
+    def _fetch(self, fetch, place):
+        pager = self.pager
+        self._busy = True
+
+        def done(rows):
+            if pager is not self.pager:
+                return      # another result replaced this one while the page was loading
+            self._busy = False
+            started = time.perf_counter()
+            place(rows)
+            self._rendered(started, rows)
+
+        def failed(e):
+            if pager is self.pager:
+                self._busy = False
+            if self.on_error:
+                self.on_error(e)
+
+        self._task = self.executor.submit(fetch, done, failed)
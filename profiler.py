@@ -0,0 +1,394 @@
+"""
+Profiling of every database call the app makes.
+
+DatabasePool hands out connections wrapped in ProfiledConnection when it has
+a Profiler, so each execute / executemany / callproc is timed without the
+calling code changing. A statement is recorded when its cursor runs the next
+statement or is closed: the SQL fingerprint (literals and IN lists folded,
+so `WHERE MovieID = 5` and `= 7` aggregate together), the time spent in the
+execute and fetch calls, the rows returned (or affected) and the bytes
+fetched. GridPager reports how long the grids took to show each result.
+
+Statements slower than `slow_ms` are kept by fingerprint, and a background
+thread attaches their EXPLAIN plan on a connection of its own. Their
+parameters (passwords among them) are only held until EXPLAIN has run and
+are never reported.
+"""
+
+import json
+import math
+import os
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+
+from result_cache import normalize_sql
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+SAMPLES = 1000              # most recent timings kept per fingerprint for percentiles
+SLOW_QUERIES = 50           # slow statements kept, newest first
+FINGERPRINT_CACHE = 2000    # distinct SQL texts whose fingerprint is remembered
+PERCENTILES = (50, 90, 99)
+
+_LITERALS = re.compile(r"""'(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.|"")*"|\b\d+(?:\.\d+)?\b|%s|%\(\w+\)s""")
+_LISTS = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+_ROW_LISTS = re.compile(r"\((?:\s*\(\.\.\.\)\s*,)+\s*\(\.\.\.\)\s*\)")
+_EXPLAINABLE = re.compile(r"\s*(SELECT|WITH|UPDATE|DELETE|INSERT|REPLACE)\b", re.I)
+
+
+def fingerprint(sql):
+    """SQL with literals and placeholders as ?, and IN / VALUES lists of any length as (...)"""
+    sql = _LITERALS.sub("?", normalize_sql(sql))
+    sql = _LISTS.sub("(...)", sql)
+    return _ROW_LISTS.sub("(...)", sql)
+
+
+def value_bytes(value):
+    if value is None:
+        return 0
+    if isinstance(value, (str, bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (int, float)):
+        return 8
+    return len(str(value))
+
+
+def rows_bytes(rows):
+    """Approximate size of fetched rows: text and binary lengths, 8 bytes per number"""
+    return sum(value_bytes(v) for row in rows for v in row)
+
+
+def percentile(ordered, p):
+    """Nearest-rank percentile of a sorted list"""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered), max(1, math.ceil(p / 100 * len(ordered)))) - 1]
+
+
+class QueryStats:
+    __slots__ = ("fingerprint", "calls", "errors", "total", "max", "rows", "bytes", "samples")
+
+    def __init__(self, fingerprint):
+        self.fingerprint = fingerprint
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.bytes = 0
+        self.samples = deque(maxlen=SAMPLES)
+
+    def add(self, seconds, rows, nbytes, failed):
+        self.calls += 1
+        self.errors += failed
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.rows += rows
+        self.bytes += nbytes
+        self.samples.append(seconds)
+
+    def summary(self):
+        ordered = sorted(self.samples)
+        result = {"fingerprint": self.fingerprint, "calls": self.calls, "errors": self.errors,
+                  "total_ms": self.total * 1000, "mean_ms": self.total * 1000 / self.calls if self.calls else 0.0}
+        for p in PERCENTILES:
+            result[f"p{p}_ms"] = percentile(ordered, p) * 1000
+        result.update({"max_ms": self.max * 1000, "rows": self.rows, "bytes": self.bytes})
+        return result
+
+
+class SlowQuery:
+    def __init__(self, fingerprint, sql, params, seconds, rows):
+        self.fingerprint = fingerprint
+        self._sql = sql             # the raw statement, for EXPLAIN only
+        self._params = params
+        self.seconds = seconds
+        self.rows = rows
+        self.at = time.time()
+        self.plan = None        # (columns, rows) of EXPLAIN once explained
+        self.plan_error = None
+
+    def to_dict(self):
+        return {
+            "sql": self.fingerprint,
+            "ms": self.seconds * 1000,
+            "rows": self.rows,
+            "at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.at)),
+            "plan": [dict(zip(self.plan[0], row)) for row in self.plan[1]] if self.plan else None,
+            "plan_error": self.plan_error,
+        }
+
+
+class Profiler:
+    """
+    Thread-safe collector of statement and render timings. `connect()`
+    returns an unprofiled connection for EXPLAIN; without it slow queries
+    are kept unexplained.
+    """
+
+    def __init__(self, slow_ms=SLOW_QUERY_MS, connect=None):
+        self.slow_seconds = slow_ms / 1000
+        self.connect = connect
+        self.enabled = True
+        self.lock = threading.Lock()
+        self.queries = {}                       # fingerprint -> QueryStats
+        self.renders = {}                       # grid name -> QueryStats
+        self.slow = deque(maxlen=SLOW_QUERIES)  # newest last
+        self.started = time.time()
+        self._fingerprints = OrderedDict()
+        self._explain_queue = None
+
+    def wrap(self, conn):
+        return ProfiledConnection(conn, self) if self.enabled else conn
+
+    def fingerprint(self, sql):
+        with self.lock:
+            fp = self._fingerprints.get(sql)
+            if fp is not None:
+                self._fingerprints.move_to_end(sql)
+                return fp
+        fp = fingerprint(sql)
+        with self.lock:
+            self._fingerprints[sql] = fp
+            if len(self._fingerprints) > FINGERPRINT_CACHE:
+                self._fingerprints.popitem(last=False)
+        return fp
+
+    def record(self, sql, params, seconds, rows=0, nbytes=0, failed=False):
+        fp = self.fingerprint(sql)
+        with self.lock:
+            stats = self.queries.get(fp)
+            if stats is None:
+                stats = self.queries[fp] = QueryStats(fp)
+            stats.add(seconds, rows, nbytes, failed)
+            slow = seconds >= self.slow_seconds and not failed
+            explain = slow and self.connect is not None and _EXPLAINABLE.match(sql)
+            if slow:
+                entry = SlowQuery(fp, sql if explain else None, params if explain else None, seconds, rows)
+                self.slow.append(entry)
+        if explain:
+            self._explain_later(entry)
+
+    def record_render(self, name, seconds, rows):
+        with self.lock:
+            stats = self.renders.get(name)
+            if stats is None:
+                stats = self.renders[name] = QueryStats(name)
+            stats.add(seconds, rows, 0, False)
+
+    def reset(self):
+        with self.lock:
+            self.queries.clear()
+            self.renders.clear()
+            self.slow.clear()
+            self.started = time.time()
+
+    # ---------------- Reports ----------------
+    def query_summary(self):
+        """Per-fingerprint summaries, most total time first"""
+        with self.lock:
+            summaries = [s.summary() for s in self.queries.values()]
+        return sorted(summaries, key=lambda s: -s["total_ms"])
+
+    def render_summary(self):
+        with self.lock:
+            return sorted((s.summary() for s in self.renders.values()), key=lambda s: -s["total_ms"])
+
+    def slow_queries(self):
+        """Slow statements, newest first"""
+        with self.lock:
+            return list(reversed(self.slow))
+
+    def snapshot(self):
+        return {
+            "since": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.started)),
+            "slow_query_ms": self.slow_seconds * 1000,
+            "queries": self.query_summary(),
+            "renders": self.render_summary(),
+            "slow_queries": [q.to_dict() for q in self.slow_queries()],
+        }
+
+    def export_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2, default=str)
+
+    # ---------------- EXPLAIN ----------------
+    def _explain_later(self, entry):
+        with self.lock:
+            if self._explain_queue is None:
+                self._explain_queue = queue.Queue()
+                threading.Thread(target=self._explain_worker, name="cinebase-explain", daemon=True).start()
+        self._explain_queue.put(entry)
+
+    def _explain_worker(self):
+        conn = None
+        while True:
+            entry = self._explain_queue.get()
+            try:
+                if conn is None or not conn.is_connected():
+                    conn = self.connect()
+                cursor = conn.cursor()
+                try:
+                    cursor.execute("EXPLAIN " + entry._sql, entry._params or ())
+                    entry.plan = ([d[0] for d in cursor.description], cursor.fetchall())
+                finally:
+                    cursor.close()
+                    conn.rollback()     # EXPLAIN of a write must not leave a transaction open
+            except Exception as e:
+                entry.plan_error = str(e)
+            finally:
+                entry._sql = entry._params = None
+
+
+# ---------------- Wrappers ----------------
+class ProfiledConnection:
+    """Delegates to a MySQL connection; its cursors are ProfiledCursors."""
+
+    def __init__(self, conn, profiler):
+        self._conn = conn
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, *args, **kwargs):
+        return ProfiledCursor(self._conn.cursor(*args, **kwargs), self._profiler)
+
+
+class _Statement:
+    __slots__ = ("sql", "params", "seconds", "rows", "bytes", "fetched", "failed")
+
+    def __init__(self, sql, params):
+        self.sql = sql
+        self.params = params
+        self.seconds = 0.0
+        self.rows = 0
+        self.bytes = 0
+        self.fetched = False
+        self.failed = False
+
+
+class ProfiledCursor:
+    """
+    Delegates to a MySQL cursor, timing execute / fetch calls per statement.
+    A statement is recorded on the next execute or on close().
+    """
+
+    def __init__(self, cursor, profiler):
+        self._cursor = cursor
+        self._profiler = profiler
+        self._statement = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def _start(self, sql, params):
+        self._finish()
+        self._statement = _Statement(sql, params)
+        return self._statement
+
+    def _finish(self):
+        statement, self._statement = self._statement, None
+        if statement is None:
+            return
+        if not statement.fetched and not statement.failed:
+            rowcount = getattr(self._cursor, "rowcount", -1)
+            statement.rows = rowcount if rowcount and rowcount > 0 else 0
+        self._profiler.record(statement.sql, statement.params, statement.seconds,
+                              statement.rows, statement.bytes, statement.failed)
+
+    def _timed(self, statement, call, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return call(*args, **kwargs)
+        except Exception:
+            statement.failed = True
+            raise
+        finally:
+            statement.seconds += time.perf_counter() - started
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        statement = self._start(operation, params)
+        try:
+            return self._timed(statement, self._cursor.execute, operation, params, *args, **kwargs)
+        except Exception:
+            self._finish()
+            raise
+
+    def executemany(self, operation, seq_params):
+        seq_params = list(seq_params)
+        statement = self._start(operation, seq_params[0] if seq_params else None)
+        try:
+            return self._timed(statement, self._cursor.executemany, operation, seq_params)
+        finally:
+            self._finish()
+
+    def callproc(self, procname, args=()):
+        statement = self._start(f"CALL {procname}", args)
+        try:
+            return self._timed(statement, self._cursor.callproc, procname, args)
+        except Exception:
+            self._finish()
+            raise
+
+    def stored_results(self):
+        for result in self._cursor.stored_results():
+            yield _ProfiledResult(result, self)
+
+    def _fetched(self, statement, rows):
+        statement.fetched = True
+        statement.rows += len(rows)
+        statement.bytes += rows_bytes(rows)
+
+    def fetchone(self):
+        statement = self._statement
+        if statement is None:
+            return self._cursor.fetchone()
+        row = self._timed(statement, self._cursor.fetchone)
+        if row is not None:
+            self._fetched(statement, [row])
+        return row
+
+    def fetchmany(self, size=1):
+        statement = self._statement
+        if statement is None:
+            return self._cursor.fetchmany(size)
+        rows = self._timed(statement, self._cursor.fetchmany, size)
+        self._fetched(statement, rows)
+        return rows
+
+    def fetchall(self):
+        statement = self._statement
+        if statement is None:
+            return self._cursor.fetchall()
+        rows = self._timed(statement, self._cursor.fetchall)
+        self._fetched(statement, rows)
+        return rows
+
+    def close(self):
+        self._finish()
+        return self._cursor.close()
+
+
+class _ProfiledResult:
+    """A result set of callproc; its rows count towards the CALL statement."""
+
+    def __init__(self, result, cursor):
+        self._result = result
+        self._owner = cursor
+
+    def __getattr__(self, name):
+        return getattr(self._result, name)
+
+    def fetchall(self):
+        statement = self._owner._statement
+        if statement is None:
+            return self._result.fetchall()
+        rows = self._owner._timed(statement, self._result.fetchall)
+        self._owner._fetched(statement, rows)
+        return rows
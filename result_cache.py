@@ -0,0 +1,200 @@
+"""
+In-process cache of query and procedure results.
+
+Entries are keyed by the normalized SQL text (or procedure name) plus its
+parameters and evicted least-recently-used first once the estimated size of
+all cached rows exceeds the memory budget. Each entry remembers the tables it
+read; a write made through the app invalidates every entry that read a
+table the write can change, directly, through a trigger or through a
+cascading foreign key. Writes made outside the app are only noticed after
+CACHE_TTL seconds.
+"""
+
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+CACHE_MAX_ENTRY_FRACTION = 0.25     # larger results are not cached at all
+CACHE_TTL = 300                     # seconds
+
+# Tables written by the triggers in cinebase_triggers.sql when a table changes
+TRIGGER_WRITES = {
+    "review": {"review_log", "movie_rating_stats", "show_rating_stats", "genre_rating_stats", "title_detail"},
+    "movie": {"movie_genre", "movie_rating_stats", "title_detail"},
+    "tv_show": {"show_genre", "show_rating_stats", "title_detail"},
+    "movie_genre": {"genre_rating_stats", "title_detail"},
+    "show_genre": {"genre_rating_stats", "title_detail"},
+    "role": {"title_detail"},
+    "award_winner": {"title_detail"},
+    "season": {"title_detail"},
+    "episode": {"title_detail"},
+}
+
+# Tables read by the stored procedures and functions the GUI calls
+ROUTINE_TABLES = {
+    "GetAverageRating": {"movie_rating_stats", "show_rating_stats"},
+    "GetGenreStatistics": {"genre", "movie_genre", "show_genre", "review"},
+    "GetUserReviewCount": {"review"},
+}
+
+_LITERAL_OR_SPACE = re.compile(r"""('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")|\s+""")
+_LITERAL = re.compile(r""""(?:[^"\\]|\\.|"")*"|'(?:[^'\\]|\\.|'')*'""")
+# [schema.]table [[AS] alias], where the alias is not the JOIN that follows an unaliased table
+_TABLE = r"(?:`?\w+`?\.)?`?\w+`?(?:\s+(?:AS\s+)?(?!(?:STRAIGHT_)?JOIN\b)\w+)?"
+_TABLE_REF = re.compile(rf"\b(?:FROM|JOIN|STRAIGHT_JOIN)\s+({_TABLE}(?:\s*,\s*{_TABLE})*)", re.I)
+
+
+def normalize_sql(sql):
+    """Collapse whitespace outside string literals and drop a trailing semicolon."""
+    sql = _LITERAL_OR_SPACE.sub(lambda m: m.group(1) or " ", sql).strip()
+    return sql.rstrip(";").rstrip()
+
+
+def tables_read(sql):
+    """
+    Names after FROM / JOIN, without schema, lower-cased. CTE names are
+    included, which is harmless; string literals are skipped.
+    """
+    tables = set()
+    for match in _TABLE_REF.finditer(_LITERAL.sub("''", sql)):
+        for ref in match.group(1).split(","):
+            tables.add(ref.split()[0].split(".")[-1].strip("`").lower())
+    return tables
+
+
+def affected_tables(tables, catalog=None):
+    """
+    Tables whose contents can change when `tables` are written: the tables
+    themselves, what their triggers write and, from the schema catalog,
+    tables holding a foreign key to them (ON DELETE CASCADE / SET NULL).
+    """
+    referencing = {}
+    if catalog is not None:
+        for name in catalog.table_names():
+            info = catalog.table(name)
+            for fk in info.foreign_keys.values() if info else ():
+                referencing.setdefault(fk.ref_table.lower(), set()).add(name.lower())
+
+    affected = set()
+    pending = [t.lower() for t in tables]
+    while pending:
+        table = pending.pop()
+        if table in affected:
+            continue
+        affected.add(table)
+        pending.extend(TRIGGER_WRITES.get(table, ()))
+        pending.extend(referencing.get(table, ()))
+    return affected
+
+
+def estimate_size(columns, rows):
+    size = sys.getsizeof(rows) + sum(sys.getsizeof(c) for c in columns)
+    for row in rows:
+        size += sys.getsizeof(row) + sum(sys.getsizeof(v) for v in row)
+    return size
+
+
+class CacheEntry:
+    __slots__ = ("columns", "rows", "tables", "size", "stored_at")
+
+    def __init__(self, columns, rows, tables, size):
+        self.columns = columns
+        self.rows = rows
+        self.tables = tables
+        self.size = size
+        self.stored_at = time.monotonic()
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache of (columns, rows) results. Cached row lists are
+    shared between callers and must not be modified.
+    """
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES, ttl=CACHE_TTL):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = int(max_bytes * CACHE_MAX_ENTRY_FRACTION)
+        self.ttl = ttl
+        self.entries = OrderedDict()        # key -> CacheEntry, least recently used first
+        self.bytes = 0
+        self.lock = threading.Lock()
+        # metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(sql, params=()):
+        return normalize_sql(sql), tuple(params or ())
+
+    def get(self, sql, params=()):
+        """(columns, rows) if cached and still valid, else None."""
+        key = self.key(sql, params)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and time.monotonic() - entry.stored_at >= self.ttl:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry.columns, entry.rows
+
+    def put(self, sql, params, columns, rows, tables=None):
+        """
+        Cache a complete result. `tables` defaults to those named in the SQL;
+        results whose tables are unknown (e.g. a function call) are not cached.
+        """
+        tables = {t.lower() for t in tables} if tables is not None else tables_read(sql)
+        if not tables:
+            return
+        size = estimate_size(columns, rows)
+        if size > self.max_entry_bytes:
+            return
+        key = self.key(sql, params)
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = CacheEntry(list(columns), rows, frozenset(tables), size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def invalidate(self, tables):
+        """Drop every entry that read one of `tables` (already expanded by affected_tables)."""
+        tables = {t.lower() for t in tables}
+        with self.lock:
+            stale = [k for k, e in self.entries.items() if e.tables & tables]
+            for key in stale:
+                self._remove(key)
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def _remove(self, key):
+        self.bytes -= self.entries.pop(key).size
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,209 @@
+"""
+Title and name search across Movie, TV_Show, Episode and Person.
+
+Two complementary paths:
+
+- search_fulltext() asks MySQL, using the FULLTEXT indexes from
+  cinebase_indexes.sql in boolean mode (every word must match, the last one
+  as a prefix), and returns the top hits ranked by relevance.
+- TrigramIndex is an in-memory index of every title and name, built once in
+  the background. It matches on shared character trigrams, so typos and
+  unfinished words still find their target, and answers in milliseconds
+  without a round-trip, which suits as-you-type search.
+"""
+
+import heapq
+import re
+import threading
+import time
+import unicodedata
+from array import array
+
+SEARCH_LIMIT = 50
+LOAD_CHUNK_ROWS = 10000
+CANDIDATE_TRIGRAMS = 4      # rarest query trigrams used to collect candidates
+MAX_CANDIDATES = 20000      # candidates scored per search
+
+# kind, table, id column, text column
+SEARCH_SOURCES = [
+    ("Movie", "Movie", "MovieID", "Title"),
+    ("TV Show", "TV_Show", "ShowID", "Title"),
+    ("Episode", "Episode", "EpisodeID", "Title"),
+    ("Person", "Person", "PersonID", "Name"),
+]
+SEARCH_TABLES = {table for _, table, _, _ in SEARCH_SOURCES}
+RESULT_COLUMNS = ["Kind", "ID", "Name", "Score"]
+
+_BOOLEAN_OPERATORS = re.compile(r'[+\-<>()~*"@]+')
+
+
+# ---------------- FULLTEXT ----------------
+def boolean_query(text):
+    """'star wa' -> '+star* +wa*': all words required, each matched as a prefix."""
+    words = _BOOLEAN_OPERATORS.sub(" ", text).split()
+    return " ".join(f"+{w}*" for w in words)
+
+
+def search_fulltext(conn, text, limit=SEARCH_LIMIT):
+    """Top `limit` rows of (kind, id, name, relevance) from the FULLTEXT indexes."""
+    expr = boolean_query(text)
+    if not expr:
+        return []
+    branches = []
+    params = []
+    for kind, table, id_col, text_col in SEARCH_SOURCES:
+        branches.append(
+            f"(SELECT '{kind}' AS Kind, {id_col} AS ID, {text_col} AS Name, "
+            f"MATCH({text_col}) AGAINST (%s IN BOOLEAN MODE) AS Score FROM {table} "
+            f"WHERE MATCH({text_col}) AGAINST (%s IN BOOLEAN MODE) ORDER BY Score DESC LIMIT %s)")
+        params += [expr, expr, limit]
+    sql = " UNION ALL ".join(branches) + " ORDER BY Score DESC LIMIT %s"
+    cursor = conn.cursor()
+    try:
+        cursor.execute(sql, params + [limit])
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+# ---------------- Trigrams ----------------
+def normalize(text):
+    """Lower-case, strip accents and punctuation."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^\w]+", " ", text.casefold()).split())
+
+
+def trigrams(text, prefix=False):
+    """
+    Trigrams of each word padded as "  word ", so word starts weigh more.
+    With prefix=True the last word is left open (no trailing pad), since
+    it may still be being typed.
+    """
+    return word_trigrams(normalize(text).split(), prefix)
+
+
+def word_trigrams(words, prefix=False):
+    grams = set()
+    for i, word in enumerate(words):
+        text = "  " + word + ("" if prefix and i == len(words) - 1 else " ")
+        grams.update(text[j:j + 3] for j in range(len(text) - 2))
+    return grams
+
+
+def padded(words):
+    """
+    "  w1   w2 ": each word in its trigram padding. Every word trigram is a
+    substring of it, so a name's score needs no set of its own trigrams.
+    """
+    return "  " + "   ".join(words) + " "
+
+
+class TrigramIndex:
+    """
+    In-memory trigram index over SEARCH_SOURCES. Names and ids are kept in
+    flat arrays and each trigram maps to an array of row numbers, so a few
+    million names fit in a few hundred MB. Thread-safe: build() swaps the
+    finished index in, and searches keep using the old one meanwhile.
+    """
+
+    def __init__(self):
+        self.kinds = []
+        self.ids = array("q")
+        self.names = []
+        self.keys = []          # padded(normalized words) of each name
+        self.postings = {}      # trigram -> array of row numbers
+        self.built_at = None
+        self.stale = True       # set by the owner when the tables change
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def ready(self):
+        return self.built_at is not None
+
+    def build(self, conn, chunk_rows=LOAD_CHUNK_ROWS):
+        """Read every title and name (streamed in chunks) and replace the index."""
+        kinds, ids, names, keys, postings = [], array("q"), [], [], {}
+        for kind, table, id_col, text_col in SEARCH_SOURCES:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(f"SELECT {id_col}, {text_col} FROM {table} WHERE {text_col} IS NOT NULL")
+                while True:
+                    rows = cursor.fetchmany(chunk_rows)
+                    if not rows:
+                        break
+                    for row_id, name in rows:
+                        n = len(names)
+                        words = normalize(name).split()
+                        kinds.append(kind)
+                        ids.append(row_id)
+                        names.append(name)
+                        keys.append(padded(words))
+                        for gram in word_trigrams(words):
+                            posting = postings.get(gram)
+                            if posting is None:
+                                posting = postings[gram] = array("I")
+                            posting.append(n)
+            finally:
+                cursor.close()
+        with self.lock:
+            self.kinds, self.ids, self.names, self.keys, self.postings = kinds, ids, names, keys, postings
+            self.built_at = time.monotonic()
+        return len(names)
+
+    def search(self, text, limit=SEARCH_LIMIT):
+        """
+        Top `limit` rows of (kind, id, name, score). The score is the share
+        of the query's trigrams found in the name (so typos lose a little,
+        not everything), plus a bonus when the name or one of its words
+        starts with the query.
+        """
+        words = normalize(text).split()
+        grams = word_trigrams(words, prefix=True)
+        if not grams:
+            return []
+        start = padded(words)[:-1]      # the last word may be unfinished
+        with self.lock:
+            kinds, ids, names, keys, postings = self.kinds, self.ids, self.names, self.keys, self.postings
+
+        # Candidates come from the rarest trigrams only; a typo spoils at
+        # most three trigrams, so one of them usually survives.
+        lists = sorted((postings[g] for g in grams if g in postings), key=len)
+        candidates = set()
+        for posting in lists[:CANDIDATE_TRIGRAMS]:
+            candidates.update(posting[:MAX_CANDIDATES - len(candidates)])
+            if len(candidates) >= MAX_CANDIDATES:
+                break
+
+        def score(n):
+            key = keys[n]
+            value = sum(g in key for g in grams) / len(grams)
+            if key.startswith(start):
+                value += 0.5
+            elif start in key:
+                value += 0.25
+            return value
+
+        best = heapq.nlargest(limit, ((score(n), -len(names[n]), n) for n in candidates))
+        return [(kinds[n], ids[n], names[n], round(s, 3)) for s, _, n in best]
+
+
+def merge_results(fuzzy, fulltext, limit=SEARCH_LIMIT):
+    """
+    Combine trigram and FULLTEXT hits: a FULLTEXT match adds 1.0 to the
+    trigram score, so exact word matches rank above purely fuzzy ones.
+    """
+    scores = {}
+    names = {}
+    for kind, row_id, name, score in fuzzy:
+        scores[(kind, row_id)] = float(score)
+        names[(kind, row_id)] = name
+    for kind, row_id, name, _ in fulltext:
+        key = (kind, row_id)
+        scores[key] = scores.get(key, 0.0) + 1.0
+        names[key] = name
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], len(names[item[0]])))[:limit]
+    return [(kind, row_id, names[(kind, row_id)], round(score, 3)) for (kind, row_id), score in ranked]
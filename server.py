@@ -0,0 +1,367 @@
+"""
+Headless REST / JSON interface to CineBase, for scripts and other front ends.
+
+    python cli.py serve --port 8080
+    CINEBASE_API_TOKEN=... python cli.py serve --allow-writes
+
+An HTTP/1.1 server on asyncio (standard library only). Requests are parsed
+on the event loop and their database work runs on a thread pool as large as
+the connection pool, each call on a pooled connection through db_pool.run(),
+so slow queries do not hold up other clients. Everything is delegated to
+CineBaseService, the layer the Tk GUI uses as well.
+
+The server is read-only unless started with allow_writes; the POST, PATCH
+and DELETE routes then need an `Authorization: Bearer <CINEBASE_API_TOKEN>`
+header, the API's equivalent of the GUI's Admin role.
+
+    GET    /health                              pool and cache statistics
+    GET    /profile                             statement timings and slow queries with their plans
+    GET    /tables                              table names
+    GET    /tables/{table}?after=&limit=        one page in primary-key order
+    POST   /tables/{table}                      {"column": value, ...}
+    PATCH  /tables/{table}                      {"keys": [[pk...], ...], "values": {...}}
+    DELETE /tables/{table}                      {"keys": [[pk...], ...]}
+    GET    /queries                             canned query names
+    GET    /queries/{name}?limit=&offset=
+    POST   /procedures/add-movie                AddMovieWithGenre fields
+    GET    /procedures/average-rating?movie_id=&show_id=
+    GET    /procedures/genre-statistics
+    GET    /functions/user-review-count?user_id=
+    GET    /functions/age?user_id=
+    GET    /functions/user-stats?users=1,5,10-20
+    GET    /log?before=&limit=&since=&until=    Review_Log, newest first
+    GET    /log/tail?after=                     entries with a LogID above `after`
+    POST   /log/archive?keep_days=              run ArchiveReviewLog
+    POST   /users/purge?inactive_days=&dry_run= run PurgeInactiveUsers
+    GET    /titles?before=&limit=&type=         Title_Detail, best rated first (type: movie or show)
+    GET    /titles/{movie|show}/{id}            one title's genres, credits, counts and ratings
+    POST   /titles/rebuild                      run RebuildTitleDetail
+
+Pages answer {"columns", "rows", "next"}; pass `next` back as `after`,
+`before`, `offset` or (tail) `after` to get the following page. Key cursors are opaque
+strings. Errors answer {"error": message} with 400 (bad input), 401 (missing or
+wrong token), 403 (read-only), 404 (unknown table or query), 409 (a
+constraint or trigger refused the write), 503 (database unreachable) or
+500. Server-side failures are printed to stderr, not sent to the client.
+"""
+
+import asyncio
+import base64
+import binascii
+import hmac
+import json
+import os
+import sys
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from mysql.connector import Error
+
+from catalog import SchemaCatalog
+from db import RETRIES, DatabasePool, is_transient
+from exporter import json_value
+from profiler import Profiler
+from service import CANNED_QUERIES, LOG_ARCHIVE_DAYS, PURGE_INACTIVE_DAYS, CineBaseService
+
+HOST = "127.0.0.1"
+PORT = 8080
+MAX_BODY_BYTES = 16 * 1024 * 1024
+KEEP_ALIVE_TIMEOUT = 30         # seconds an idle connection is kept open
+API_TOKEN = os.getenv("CINEBASE_API_TOKEN", "")
+
+# MySQL errors caused by the request rather than the server
+CONFLICT_ERRORS = {1062, 1451, 1452, 1644}         # duplicate key, foreign key, SIGNAL in a trigger
+BAD_VALUE_ERRORS = {1048, 1264, 1292, 1364, 1366, 1406}  # NULL, out of range, bad date / number, too long
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def encode_key(key):
+    """Opaque page cursor for a key tuple (or offset)"""
+    if key is None:
+        return None
+    text = json.dumps(key, default=json_value, separators=(",", ":"))
+    return base64.urlsafe_b64encode(text.encode()).decode().rstrip("=")
+
+
+def decode_key(cursor):
+    if cursor is None:
+        return None
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        raise ValueError("Invalid page cursor") from None
+
+
+def page(result):
+    return {**result, "next": encode_key(result["next"])}
+
+
+def rows_result(result):
+    columns, rows = result
+    return {"columns": columns, "rows": rows}
+
+
+def error_status(e):
+    if isinstance(e, HttpError):
+        return e.status
+    if isinstance(e, LookupError):
+        return HTTPStatus.NOT_FOUND
+    if isinstance(e, (ValueError, TypeError)):
+        return HTTPStatus.BAD_REQUEST
+    if isinstance(e, Error):
+        if e.errno in CONFLICT_ERRORS:
+            return HTTPStatus.CONFLICT
+        if e.errno in BAD_VALUE_ERRORS:
+            return HTTPStatus.BAD_REQUEST
+        if is_transient(e):
+            return HTTPStatus.SERVICE_UNAVAILABLE
+    return HTTPStatus.INTERNAL_SERVER_ERROR
+
+
+class Request:
+    def __init__(self, method, path, query, headers, body):
+        self.method = method
+        self.parts = [p for p in path.split("/") if p]
+        self.query = {k: v[-1] for k, v in parse_qs(query).items()}
+        self.headers = headers
+        self.body = body
+
+    def arg(self, name, default=None):
+        return self.query.get(name, default)
+
+    def json(self):
+        if not self.body:
+            raise ValueError("Request body must be JSON")
+        try:
+            return json.loads(self.body)
+        except ValueError:
+            raise ValueError("Request body is not valid JSON") from None
+
+    def json_object(self):
+        data = self.json()
+        if not isinstance(data, dict):
+            raise ValueError("Request body must be a JSON object")
+        return data
+
+
+class CineBaseServer:
+    def __init__(self, db_pool=None, host=HOST, port=PORT, allow_writes=False, token=API_TOKEN):
+        if allow_writes and not token:
+            raise ValueError("Writes need an API token: set CINEBASE_API_TOKEN")
+        self.db_pool = db_pool or DatabasePool()
+        if self.db_pool.profiler is None:
+            self.db_pool.profiler = Profiler(connect=lambda: self.db_pool.dedicated_connection(profile=False))
+        self.service = CineBaseService(self.db_pool, SchemaCatalog())
+        self.host = host
+        self.port = port
+        self.read_only = not allow_writes
+        self.token = token
+        # One thread per pooled connection: more would only queue on the pool
+        self.threads = ThreadPoolExecutor(max_workers=self.db_pool.size, thread_name_prefix="cinebase-http")
+        self.requests = 0
+
+    async def db(self, method, *args, retries=RETRIES, **kwargs):
+        """
+        Run service.method(conn, ...) on a pooled connection, off the event loop.
+        Writes pass retries=0: a connection lost after the commit would
+        otherwise run them a second time.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.threads, lambda: self.db_pool.run(lambda conn: method(conn, *args, **kwargs), retries=retries))
+
+    # ---------------- Routing ----------------
+    async def dispatch(self, request):
+        """(status, body) for a request"""
+        method, parts = request.method, request.parts
+        service = self.service
+        if method != "GET":
+            if self.read_only:
+                raise HttpError(HTTPStatus.FORBIDDEN, "The server is read-only")
+            self.authorize(request)
+
+        if parts == ["health"] and method == "GET":
+            return HTTPStatus.OK, {"pool": self.db_pool.stats(), "cache": service.cache.stats(),
+                                   "requests": self.requests}
+        if parts == ["profile"] and method == "GET":
+            return HTTPStatus.OK, self.db_pool.profiler.snapshot()
+        if parts == ["tables"] and method == "GET":
+            return HTTPStatus.OK, {"tables": await self.db(service.tables)}
+        if len(parts) == 2 and parts[0] == "tables":
+            table = parts[1]
+            if method == "GET":
+                result = await self.db(service.browse, table, decode_key(request.arg("after")), request.arg("limit"))
+                return HTTPStatus.OK, page(result)
+            if method == "POST":
+                row_id = await self.db(service.insert_row, table, request.json_object(), retries=0)
+                return HTTPStatus.CREATED, {"inserted": 1, "id": row_id or None}
+            if method == "PATCH":
+                data = request.json_object()
+                updated = await self.db(service.update_rows, table, data.get("keys") or [], data.get("values") or {},
+                                        retries=0)
+                return HTTPStatus.OK, {"updated": updated}
+            if method == "DELETE":
+                deleted = await self.db(service.delete_rows, table, request.json_object().get("keys") or [], retries=0)
+                return HTTPStatus.OK, {"deleted": deleted}
+        if parts == ["queries"] and method == "GET":
+            return HTTPStatus.OK, {"queries": {name: title for name, (title, _) in CANNED_QUERIES.items()}}
+        if len(parts) == 2 and parts[0] == "queries" and method == "GET":
+            result = await self.db(service.run_query, parts[1], request.arg("limit"), request.arg("offset", 0))
+            return HTTPStatus.OK, page(result)
+        if parts == ["procedures", "add-movie"] and method == "POST":
+            await self.db(service.add_movie, request.json_object(), retries=0)
+            return HTTPStatus.CREATED, {"added": 1}
+        if parts == ["procedures", "average-rating"] and method == "GET":
+            result = await self.db(service.average_rating, request.arg("movie_id"), request.arg("show_id"))
+            return HTTPStatus.OK, rows_result(result)
+        if parts == ["procedures", "genre-statistics"] and method == "GET":
+            return HTTPStatus.OK, rows_result(await self.db(service.genre_statistics))
+        if parts == ["functions", "user-review-count"] and method == "GET":
+            user_id = self.user_id(request)
+            return HTTPStatus.OK, {"user_id": user_id, "reviews": await self.db(service.user_review_count, user_id)}
+        if parts == ["functions", "age"] and method == "GET":
+            user_id = self.user_id(request)
+            dob, age = await self.db(service.user_age, user_id)
+            return HTTPStatus.OK, {"user_id": user_id, "date_of_birth": dob, "age": age}
+        if parts == ["functions", "user-stats"] and method == "GET":
+            rows, truncated, missing = await self.db(service.user_stats, request.arg("users", ""))
+            return HTTPStatus.OK, {"columns": ["UserID", "DateOfBirth", "Age", "Reviews"], "rows": rows,
+                                   "truncated": truncated, "missing": missing}
+        if parts == ["log"] and method == "GET":
+            result = await self.db(service.review_log, decode_key(request.arg("before")), request.arg("limit"),
+                                   request.arg("since"), request.arg("until"))
+            return HTTPStatus.OK, page(result)
+        if parts == ["log", "tail"] and method == "GET":
+            return HTTPStatus.OK, await self.db(service.log_after, request.arg("after", 0), request.arg("limit"))
+        if parts == ["log", "archive"] and method == "POST":
+            moved = await self.db(service.archive_log, request.arg("keep_days", LOG_ARCHIVE_DAYS), retries=0)
+            return HTTPStatus.OK, {"archived": moved}
+        if parts == ["titles"] and method == "GET":
+            result = await self.db(service.titles, decode_key(request.arg("before")), request.arg("limit"),
+                                   request.arg("type"))
+            return HTTPStatus.OK, page(result)
+        if parts == ["titles", "rebuild"] and method == "POST":
+            return HTTPStatus.OK, {"titles": await self.db(service.rebuild_titles, retries=0)}
+        if len(parts) == 3 and parts[0] == "titles" and method == "GET":
+            return HTTPStatus.OK, await self.db(service.title_detail, parts[1], parts[2])
+        if parts == ["users", "purge"] and method == "POST":
+            eligible, deleted = await self.db(service.purge_users, request.arg("inactive_days", PURGE_INACTIVE_DAYS),
+                                              dry_run=request.arg("dry_run", "") in ("1", "true"), retries=0)
+            return HTTPStatus.OK, {"eligible": eligible, "deleted": deleted}
+        raise HttpError(HTTPStatus.NOT_FOUND, f"No route for {method} /{'/'.join(parts)}")
+
+    def authorize(self, request):
+        """Refuse a write without the API token"""
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not hmac.compare_digest(token.strip().encode(), self.token.encode()):
+            raise HttpError(HTTPStatus.UNAUTHORIZED, "Writes need an Authorization: Bearer <token> header")
+
+    @staticmethod
+    def user_id(request):
+        user_id = request.arg("user_id", "")
+        if not user_id.isdigit():
+            raise ValueError("user_id must be a number")
+        return int(user_id)
+
+    # ---------------- HTTP ----------------
+    async def read_request(self, reader):
+        """The next Request on the connection, or None once the client is done"""
+        try:
+            line = await asyncio.wait_for(reader.readline(), KEEP_ALIVE_TIMEOUT)
+        except ValueError:      # longer than the stream limit (64 KiB)
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Request line too long") from None
+        if not line.strip():
+            return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Malformed request line") from None
+        headers = {}
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                raise HttpError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Request header too long") from None
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Content-Length must be a non-negative integer")
+        if length > MAX_BODY_BYTES:
+            raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+        if version == "HTTP/1.0" and headers.get("connection", "").lower() != "keep-alive":
+            headers["connection"] = "close"
+        url = urlsplit(target)
+        return Request(method.upper(), url.path, url.query, headers, body)
+
+    @staticmethod
+    def write_response(writer, status, body, keep_alive):
+        payload = json.dumps(body, default=json_value, ensure_ascii=False).encode()
+        status = HTTPStatus(status)
+        head_lines = [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(payload)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        writer.write(("\r\n".join(head_lines) + "\r\n\r\n").encode("latin-1") + payload)
+
+    async def handle(self, reader, writer):
+        """Serve one client connection, request after request (keep-alive)"""
+        try:
+            while True:
+                try:
+                    request = await self.read_request(reader)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except HttpError as e:
+                    self.write_response(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                self.requests += 1
+                keep_alive = request.headers.get("connection", "").lower() != "close"
+                try:
+                    status, body = await self.dispatch(request)
+                except Exception as e:
+                    status, body = error_status(e), {"error": str(e)}
+                    if status == HTTPStatus.SERVICE_UNAVAILABLE:
+                        body = {"error": "The database is unavailable, try again"}
+                    elif status == HTTPStatus.INTERNAL_SERVER_ERROR:
+                        # The MySQL message can name tables, columns and the server; keep it in the log
+                        print(f"{request.method} /{'/'.join(request.parts)} failed:", file=sys.stderr)
+                        traceback.print_exception(type(e), e, e.__traceback__, file=sys.stderr)
+                        body = {"error": "Internal server error"}
+                self.write_response(writer, status, body, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve_forever(self):
+        server = await asyncio.start_server(self.handle, self.host, self.port)
+        print(f"CineBase API listening on http://{self.host}:{self.port}", file=sys.stderr, flush=True)
+        async with server:
+            await server.serve_forever()
+
+    def run(self):
+        try:
+            asyncio.run(self.serve_forever())
+        finally:
+            self.threads.shutdown(wait=False)
@@ -0,0 +1,563 @@
+"""
+CineBase data operations, independent of any user interface.
+
+CineBaseService holds what the Tk GUI and the HTTP server (server.py) have
+in common: browsing tables, adding / editing / deleting rows, the canned
+queries, the stored procedures and functions and the Review_Log. Every
+method takes the connection to run on as its first argument, so the GUI
+calls it from a QueryExecutor worker and the server through db_pool.run();
+nothing here touches Tk.
+
+Writes invalidate the result cache for every table they can change and
+then notify the `on_invalidate` listeners. Bad input raises ValueError, an
+unknown table, query or user LookupError; database errors are passed on.
+"""
+
+import datetime
+
+from paging import PAGE_SIZE, TAIL_ROWS, KeysetPager, LogTail, StreamPager
+from result_cache import ROUTINE_TABLES, ResultCache, affected_tables
+
+MAX_PAGE_SIZE = 10000       # rows per page a caller may ask for
+KEY_BATCH = 1000            # primary keys per DELETE / UPDATE ... WHERE pk IN (...)
+USER_BATCH_LIMIT = 10000    # users listed by one set-based function call
+
+# name -> (title, query), shown as buttons on the Custom Queries tab
+CANNED_QUERIES = {
+    "award-reviewers": ("Users Who Reviewed Award-Winning Movies", """
+        SELECT DISTINCT u.UserID, u.Username, u.Email, u.Country
+        FROM Users u
+        WHERE u.UserID IN (
+            SELECT r.UserID
+            FROM Review r
+            WHERE r.MovieID IN (
+                SELECT aw.MovieID
+                FROM Award_Winner aw
+                WHERE aw.MovieID IS NOT NULL
+            )
+        )
+        """),
+    # Read from the precomputed Title_Detail rows, in idx_title_detail_rating order
+    "movie-details": ("Detailed Movie Information", """
+        SELECT
+            TitleID AS MovieID,
+            Title,
+            ReleaseDate,
+            Runtime,
+            Language,
+            Country,
+            Genres,
+            AverageRating AS AvgRating,
+            ReviewCount AS Reviews
+        FROM Title_Detail
+        WHERE TitleType = 'Movie'
+        ORDER BY RatingRank DESC, TitleID DESC
+        """),
+    "genre-stats": ("Genre Statistics", """
+        SELECT
+            g.Name AS Genre,
+            IFNULL(s.MovieCount, 0) AS Movies,
+            IFNULL(s.ShowCount, 0) AS Shows,
+            IFNULL(s.MovieCount + s.ShowCount, 0) AS Total,
+            ROUND(s.RatingSum / NULLIF(s.RatingCount, 0), 2) AS AvgRating,
+            s.MaxRating AS MaxRating,
+            s.MinRating AS MinRating
+        FROM Genre g
+        LEFT JOIN Genre_Rating_Stats s ON g.GenreID = s.GenreID
+        ORDER BY Total DESC
+        """),
+}
+
+ADD_MOVIE_FIELDS = ["movieTitle", "releaseDate", "runtime", "languageName", "countryName", "genreName"]
+
+# Review count and age for many users in one GROUP BY query instead of a call per user
+USER_STATS_QUERY = """
+SELECT u.UserID, u.DateOfBirth, CalculateAge(u.DateOfBirth) AS Age, COUNT(r.ReviewID) AS Reviews
+FROM Users u
+LEFT JOIN Review r ON r.UserID = u.UserID
+WHERE {condition}
+GROUP BY u.UserID, u.DateOfBirth
+ORDER BY u.UserID
+LIMIT %s
+"""
+
+LOG_TABLE = "Review_Log"
+LOG_KEY = ["ActionTime", "LogID"]       # newest first; LogID breaks ties within a second
+LOG_ARCHIVE_DAYS = 90       # ArchiveReviewLog default: keep this many days in Review_Log
+LOG_ARCHIVE_BATCH = 10000   # log rows moved per transaction
+TITLE_TABLE = "Title_Detail"
+TITLE_KEY = ["RatingRank", "TitleType", "TitleID"]     # best rated first, along idx_title_detail_rating
+TITLE_TYPES = {"movie": "Movie", "show": "Show"}
+PURGE_INACTIVE_DAYS = 365    # PurgeInactiveUsers default: accounts older than this without reviews
+PURGE_BATCH = 1000          # users deleted per transaction
+PURGE_PAUSE_MS = 100        # pause between purge batches, for replication
+TIME_FORMATS = ["%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"]
+
+
+def query_all(conn, query, params=()):
+    """Run a query on its own cursor and return (column names, rows)"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        cols = [d[0] for d in cursor.description] if cursor.description else []
+        return cols, rows
+    finally:
+        cursor.close()
+
+
+def call_procedure(conn, proc, args):
+    """(column names, rows) of the first result set of a stored procedure"""
+    cursor = conn.cursor()
+    try:
+        cursor.callproc(proc, args)
+        results = [([d[0] for d in result.description], result.fetchall())
+                   for result in cursor.stored_results()]
+    finally:
+        cursor.close()
+    return results[0] if results else ([], [])
+
+
+def key_condition(pk, count):
+    """WHERE fragment matching `count` primary keys: pk IN (...), or (a, b) IN ((...), ...) for composite keys"""
+    if len(pk) == 1:
+        return f"{pk[0]} IN ({', '.join(['%s'] * count)})"
+    row = "(" + ", ".join(["%s"] * len(pk)) + ")"
+    return f"({', '.join(pk)}) IN ({', '.join([row] * count)})"
+
+
+def user_id_condition(text, column="u.UserID"):
+    """
+    Parse a list of UserIDs and ranges such as "3, 7, 10-20" into a WHERE
+    fragment, its parameters and the individually listed IDs
+    """
+    ids, ranges = [], []
+    for item in text.replace(";", ",").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        low, sep, high = (part.strip() for part in item.partition("-"))
+        if not low.isdigit() or (sep and not high.isdigit()):
+            raise ValueError(f"Not a UserID or range: {item}")
+        if sep:
+            ranges.append((int(low), int(high)))
+        else:
+            ids.append(int(low))
+    parts, params = [], []
+    if ids:
+        parts.append(f"{column} IN ({', '.join(['%s'] * len(ids))})")
+        params += ids
+    for low, high in ranges:
+        parts.append(f"{column} BETWEEN %s AND %s")
+        params += [low, high]
+    if not parts:
+        raise ValueError("Enter at least one UserID")
+    return " OR ".join(parts), params, ids
+
+
+def parse_time(text):
+    """'2024-05-01', '2024-05-01 13:30' or '2024-05-01 13:30:15' as a datetime; None for blank"""
+    if text is None or isinstance(text, datetime.datetime):
+        return text
+    text = text.strip().replace("T", " ")
+    if not text:
+        return None
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.datetime.strptime(text, fmt)
+        except ValueError:
+            pass
+    raise ValueError(f"Not a date / time: {text} (use YYYY-MM-DD [HH:MM[:SS]])")
+
+
+def log_condition(since=None, until=None):
+    """WHERE fragment and parameters for since <= ActionTime < until (either may be None)"""
+    since, until = parse_time(since), parse_time(until)
+    if since and until and since >= until:
+        raise ValueError("The start of the time range must be before its end")
+    parts, params = [], []
+    if since is not None:
+        parts.append("ActionTime >= %s")
+        params.append(since)
+    if until is not None:
+        parts.append("ActionTime < %s")
+        params.append(until)
+    return " AND ".join(parts) or None, params
+
+
+def title_condition(title_type=None):
+    """WHERE fragment and parameters for one kind of title ("movie" or "show"), or (None, []) for both"""
+    if not title_type:
+        return None, []
+    try:
+        return "TitleType = %s", [TITLE_TYPES[title_type.lower()]]
+    except KeyError:
+        raise ValueError(f"Title type must be one of: {', '.join(TITLE_TYPES)}") from None
+
+
+def page_size(limit):
+    limit = PAGE_SIZE if limit is None else int(limit)
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    return limit
+
+
+class CineBaseService:
+    def __init__(self, db_pool, catalog, cache=None):
+        self.db_pool = db_pool
+        self.catalog = catalog
+        self.cache = cache if cache is not None else ResultCache()
+        self.on_invalidate = []     # callables taking the set of affected (lower-case) tables
+
+    # ---------------- Cache ----------------
+    def invalidate(self, tables):
+        """Forget cached results that a write to `tables` may have changed"""
+        affected = affected_tables(tables, self.catalog)
+        self.cache.invalidate(affected)
+        for listener in self.on_invalidate:
+            listener(affected)
+        return affected
+
+    def cached(self, conn, sql, params, fetch, tables=None):
+        """(columns, rows) for `sql` and `params` from the cache, or from fetch(conn) on a miss"""
+        result = self.cache.get(sql, params)
+        if result is None:
+            result = fetch(conn)
+            self.cache.put(sql, params, *result, tables=tables)
+        return result
+
+    # ---------------- Tables ----------------
+    def tables(self, conn, reload=False):
+        """Table names; reload=True rereads the schema, picking up DDL made elsewhere"""
+        if reload:
+            self.catalog.load(conn)
+        else:
+            self.catalog.ensure(conn)
+        return self.catalog.table_names()
+
+    def table_info(self, conn, table):
+        info = self.catalog.ensure(conn).get(table)
+        if info is None:
+            raise LookupError(f"Unknown table {table}")
+        return info
+
+    def check_columns(self, info, columns):
+        unknown = [c for c in columns if c not in info.column_names]
+        if unknown:
+            raise ValueError(f"Unknown column(s) in {info.name}: {', '.join(unknown)}")
+
+    def table_pager(self, conn, table, limit=None):
+        """KeysetPager over the table's primary key, or a StreamPager on its own connection if it has none"""
+        info = self.table_info(conn, table)
+        if info.primary_key:
+            return KeysetPager(info.name, info.primary_key, page_size=page_size(limit))
+        # No key to seek on: stream the table instead
+        return StreamPager(self.db_pool.dedicated_connection(), f"SELECT * FROM {info.name}",
+                           page_size=page_size(limit))
+
+    def browse(self, conn, table, after=None, limit=None):
+        """
+        One page of `table`: {"columns", "rows", "next"}. `next` is the key of
+        the last row (pass it back as `after`), or a row offset for tables
+        without a primary key; None on the last page.
+        """
+        info = self.table_info(conn, table)
+        limit = page_size(limit)
+        if not info.primary_key:
+            offset = int(after or 0)
+            cols, rows = query_all(conn, f"SELECT * FROM {info.name} LIMIT %s OFFSET %s", (limit, offset))
+            return {"columns": cols, "rows": rows, "next": offset + len(rows) if len(rows) == limit else None}
+        pager = KeysetPager(info.name, info.primary_key, page_size=limit)
+        if after is not None:
+            if len(after) != len(info.primary_key):
+                raise ValueError(f"after needs one value per key column: {', '.join(info.primary_key)}")
+            pager.last_key = tuple(after)
+        rows = pager.next_page(conn)
+        return {"columns": pager.columns, "rows": rows, "next": None if pager.at_end else list(pager.last_key)}
+
+    def insert_row(self, conn, table, values):
+        """Insert one row from a {column: value} dict; returns its AUTO_INCREMENT id, if any"""
+        info = self.table_info(conn, table)
+        if not values:
+            raise ValueError("No values to insert")
+        self.check_columns(info, values)
+        cols = list(values)
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"INSERT INTO {info.name} ({', '.join(cols)}) VALUES ({', '.join(['%s'] * len(cols))})",
+                           [values[c] for c in cols])
+            row_id = cursor.lastrowid
+            conn.commit()
+        finally:
+            cursor.close()
+        self.invalidate([info.name])
+        return row_id
+
+    def update_rows(self, conn, table, keys, values):
+        """
+        Set {column: value} on the rows with primary keys `keys` (lists of key
+        values) in one transaction, KEY_BATCH keys per UPDATE; returns the number changed
+        """
+        info = self.table_info(conn, table)
+        pk = self.primary_key(info, "edited")
+        if not values:
+            raise ValueError("No values to update")
+        self.check_columns(info, values)
+        set_clause = ", ".join(f"{c}=%s" for c in values)
+        new_values = list(values.values())
+        updated = self.for_key_batches(
+            conn, info, keys,
+            lambda batch: (f"UPDATE {info.name} SET {set_clause} WHERE {key_condition(pk, len(batch))}",
+                           new_values + [v for key in batch for v in key]))
+        self.invalidate([info.name])
+        return updated
+
+    def delete_rows(self, conn, table, keys):
+        """Delete the rows with primary keys `keys` in one transaction; returns the number deleted"""
+        info = self.table_info(conn, table)
+        pk = self.primary_key(info, "deleted")
+        deleted = self.for_key_batches(
+            conn, info, keys,
+            lambda batch: (f"DELETE FROM {info.name} WHERE {key_condition(pk, len(batch))}",
+                           [v for key in batch for v in key]))
+        self.invalidate([info.name])
+        return deleted
+
+    @staticmethod
+    def primary_key(info, verb):
+        if not info.primary_key:
+            raise ValueError(f"{info.name} has no primary key; rows cannot be {verb}.")
+        return info.primary_key
+
+    @staticmethod
+    def for_key_batches(conn, info, keys, statement):
+        """Run statement(batch) for every KEY_BATCH keys in one transaction; returns the rows affected"""
+        keys = [list(key) for key in keys]
+        if not keys:
+            raise ValueError("No rows selected")
+        if any(len(key) != len(info.primary_key) for key in keys):
+            raise ValueError(f"Each key needs one value per key column: {', '.join(info.primary_key)}")
+        cursor = conn.cursor()
+        try:
+            affected = 0
+            for i in range(0, len(keys), KEY_BATCH):
+                cursor.execute(*statement(keys[i:i + KEY_BATCH]))
+                affected += cursor.rowcount
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+        return affected
+
+    # ---------------- Canned queries ----------------
+    @staticmethod
+    def canned_query(name):
+        """(title, query) of a canned query"""
+        try:
+            return CANNED_QUERIES[name]
+        except KeyError:
+            raise LookupError(f"Unknown query {name}") from None
+
+    def run_query(self, conn, name, limit=None, offset=0):
+        """One page of a canned query: {"title", "columns", "rows", "next"}"""
+        title, query = self.canned_query(name)
+        limit = page_size(limit)
+        offset = int(offset or 0)
+        if offset < 0:
+            raise ValueError("offset must not be negative")
+        sql = query.rstrip() + "\nLIMIT %s OFFSET %s"
+        cols, rows = self.cached(conn, sql, (limit, offset), lambda conn: query_all(conn, sql, (limit, offset)))
+        return {"title": title, "columns": cols, "rows": rows,
+                "next": offset + len(rows) if len(rows) == limit else None}
+
+    def stream_query(self, conn, query):
+        """
+        (pager, (columns, first page)) for an arbitrary query, streamed on a
+        connection of its own; pager is None when the result came from the cache
+        """
+        cached = self.cache.get(query)
+        if cached is not None:
+            return None, cached
+        # Results are streamed page by page; the rest loads as the grid is scrolled
+        pager = StreamPager(self.db_pool.dedicated_connection(), query)
+        rows = pager.next_page()
+        if pager.at_end:
+            # Complete in one page: keep it for the next call
+            self.cache.put(query, (), pager.columns, rows)
+        return pager, (pager.columns, rows)
+
+    # ---------------- Procedures / functions ----------------
+    def add_movie(self, conn, values):
+        """AddMovieWithGenre from a dict keyed by ADD_MOVIE_FIELDS"""
+        missing = [f for f in ADD_MOVIE_FIELDS if f not in values]
+        if missing:
+            raise ValueError(f"Missing field(s): {', '.join(missing)}")
+        cursor = conn.cursor()
+        try:
+            cursor.callproc("AddMovieWithGenre", [values[f] for f in ADD_MOVIE_FIELDS])
+            conn.commit()
+        finally:
+            cursor.close()
+        self.invalidate(["Movie", "Genre", "Movie_Genre"])
+
+    def call_cached(self, conn, proc, args=()):
+        args = list(args)
+        return self.cached(conn, f"CALL {proc}", args, lambda conn: call_procedure(conn, proc, args),
+                           ROUTINE_TABLES.get(proc))
+
+    def average_rating(self, conn, movie_id=None, show_id=None):
+        """(columns, rows) of GetAverageRating"""
+        return self.call_cached(conn, "GetAverageRating", [movie_id, show_id])
+
+    def genre_statistics(self, conn):
+        """(columns, rows) of GetGenreStatistics"""
+        return self.call_cached(conn, "GetGenreStatistics")
+
+    def user_review_count(self, conn, user_id):
+        query = "SELECT GetUserReviewCount(%s);"
+        _, rows = self.cached(conn, query, (user_id,), lambda conn: query_all(conn, query, (user_id,)),
+                              ROUTINE_TABLES["GetUserReviewCount"])
+        return rows[0][0]
+
+    def user_age(self, conn, user_id):
+        """(DateOfBirth, age) of a user; both None if no DateOfBirth is recorded"""
+        _, result = query_all(conn, "SELECT DateOfBirth FROM Users WHERE UserID = %s", (user_id,))
+        if not result or not result[0][0]:
+            return None, None
+
+        dob = result[0][0]
+        _, age_result = query_all(conn, "SELECT CalculateAge(%s);", (dob,))
+        age = age_result[0][0] if age_result else "Unknown"
+        return dob, age
+
+    def user_stats(self, conn, text, limit=USER_BATCH_LIMIT):
+        """
+        Review counts and ages for a list or range of UserIDs ("1, 5, 10-20")
+        in one query: (rows of (UserID, DateOfBirth, Age, Reviews), truncated,
+        listed IDs that do not exist)
+        """
+        condition, params, ids = user_id_condition(text)
+        _, rows = query_all(conn, USER_STATS_QUERY.format(condition=condition), params + [limit + 1])
+        truncated = len(rows) > limit
+        rows = rows[:limit]
+        missing = [] if truncated else sorted(set(ids) - {row[0] for row in rows})
+        return rows, truncated, missing
+
+    # ---------------- Review log ----------------
+    def log_pager(self, limit=None, since=None, until=None):
+        """Review_Log newest first, optionally within a time range (idx_review_log_time serves both)"""
+        where, params = log_condition(since, until)
+        return KeysetPager(LOG_TABLE, LOG_KEY, page_size=page_size(limit), descending=True,
+                           where=where, params=params)
+
+    def log_query(self, since=None, until=None):
+        """(query, params) of the whole log in the same order and range, e.g. for an export"""
+        where, params = log_condition(since, until)
+        return (f"SELECT * FROM {LOG_TABLE}" + (f" WHERE {where}" if where else "")
+                + " ORDER BY ActionTime DESC, LogID DESC"), params
+
+    def log_tail(self, since=None, until=None, max_rows=TAIL_ROWS):
+        """LogTail following Review_Log by LogID, optionally restricted to a time range"""
+        where, params = log_condition(since, until)
+        since, until = parse_time(since), parse_time(until)
+
+        def keep(row):
+            logged = row[tail.columns.index("ActionTime")]
+            return (since is None or logged >= since) and (until is None or logged < until)
+
+        tail = LogTail(LOG_TABLE, "LogID", "ActionTime", max_rows=max_rows, where=where, params=params,
+                       keep=keep if where else None)
+        return tail
+
+    def review_log(self, conn, before=None, limit=None, since=None, until=None):
+        """One page of Review_Log, newest first: {"columns", "rows", "next"}"""
+        pager = self.log_pager(limit, since, until)
+        if before is not None:
+            if len(before) != len(LOG_KEY):
+                raise ValueError("before needs an ActionTime and a LogID")
+            pager.last_key = tuple(before)
+        rows = pager.next_page(conn)
+        return {"columns": pager.columns, "rows": rows, "next": None if pager.at_end else list(pager.last_key)}
+
+    def log_after(self, conn, after_id, limit=None):
+        """
+        Review_Log entries with a LogID above `after_id`, oldest first (a tail
+        poll): {"columns", "rows", "next"}; `next` is the LogID to poll from next
+        """
+        tail = LogTail(LOG_TABLE, "LogID", "ActionTime", batch_rows=page_size(limit))
+        tail.last_id = int(after_id)
+        rows, _ = tail.poll(conn)
+        return {"columns": tail.columns, "rows": rows, "next": tail.last_id}
+
+    def archive_log(self, conn, keep_days=LOG_ARCHIVE_DAYS, batch_rows=LOG_ARCHIVE_BATCH):
+        """Move Review_Log entries older than `keep_days` to Review_Log_Archive; returns the number moved"""
+        keep_days, batch_rows = int(keep_days), int(batch_rows)
+        if keep_days < 0 or batch_rows < 1:
+            raise ValueError("keep_days must not be negative and batch_rows must be positive")
+        _, rows = call_procedure(conn, "ArchiveReviewLog", [keep_days, batch_rows])
+        conn.commit()
+        self.invalidate([LOG_TABLE, "Review_Log_Archive"])
+        return rows[0][0] if rows else 0
+
+    # ---------------- Title details ----------------
+    def title_pager(self, limit=None, title_type=None):
+        """Title_Detail best rated first, optionally only movies or shows"""
+        where, params = title_condition(title_type)
+        return KeysetPager(TITLE_TABLE, TITLE_KEY, page_size=page_size(limit), descending=True,
+                           where=where, params=params)
+
+    def title_query(self, title_type=None):
+        """(query, params) of all title details in the same order, e.g. for an export"""
+        where, params = title_condition(title_type)
+        return (f"SELECT * FROM {TITLE_TABLE}" + (f" WHERE {where}" if where else "")
+                + " ORDER BY RatingRank DESC, TitleType DESC, TitleID DESC"), params
+
+    def titles(self, conn, before=None, limit=None, title_type=None):
+        """One page of title details, best rated first: {"columns", "rows", "next"}"""
+        pager = self.title_pager(limit, title_type)
+        if before is not None:
+            if len(before) != len(TITLE_KEY):
+                raise ValueError("before needs a RatingRank, a TitleType and a TitleID")
+            pager.last_key = tuple(before)
+        rows = pager.next_page(conn)
+        return {"columns": pager.columns, "rows": rows, "next": None if pager.at_end else list(pager.last_key)}
+
+    def title_detail(self, conn, title_type, title_id):
+        """The Title_Detail row of one movie or show, as a dict"""
+        where, params = title_condition(title_type)
+        if where is None:
+            raise ValueError(f"Title type must be one of: {', '.join(TITLE_TYPES)}")
+        query = f"SELECT * FROM {TITLE_TABLE} WHERE {where} AND TitleID = %s"
+        params = params + [int(title_id)]
+        cols, rows = self.cached(conn, query, params, lambda conn: query_all(conn, query, params))
+        if not rows:
+            raise LookupError(f"No {title_type} with ID {title_id}")
+        return dict(zip(cols, rows[0]))
+
+    def rebuild_titles(self, conn):
+        """Recompute every Title_Detail row (RebuildTitleDetail); returns the number of titles"""
+        call_procedure(conn, "RebuildTitleDetail", [])
+        conn.commit()
+        self.invalidate([TITLE_TABLE])
+        _, rows = query_all(conn, f"SELECT COUNT(*) FROM {TITLE_TABLE}")
+        return rows[0][0]
+
+    # ---------------- Users ----------------
+    def purge_users(self, conn, inactive_days=PURGE_INACTIVE_DAYS, batch_rows=PURGE_BATCH,
+                    pause_ms=PURGE_PAUSE_MS, dry_run=False):
+        """
+        Delete users who joined more than `inactive_days` ago and never wrote a
+        review, through PurgeInactiveUsers; returns (eligible, deleted).
+        dry_run only counts them.
+        """
+        inactive_days, batch_rows, pause_ms = int(inactive_days), int(batch_rows), int(pause_ms)
+        if inactive_days < 0 or batch_rows < 1 or pause_ms < 0:
+            raise ValueError("inactive_days and pause_ms must not be negative and batch_rows must be positive")
+        _, rows = call_procedure(conn, "PurgeInactiveUsers", [inactive_days, batch_rows, pause_ms, bool(dry_run)])
+        conn.commit()
+        eligible, deleted = rows[0] if rows else (0, 0)
+        if deleted:
+            self.invalidate(["Users"])
+        return eligible, deleted
@@ -0,0 +1,29 @@
+USE cinebase;
+
+-- Secondary indexes for the Review / Award_Winner access paths.
+-- Run after cinebase_triggers.sql. Where one of these starts with a foreign key
+-- column, InnoDB drops the index it created implicitly for that key.
+
+-- GetAverageRating fallbacks and the rating-range refresh in ApplyReviewToStats:
+-- WHERE MovieID = ? / ShowID = ? reading only Rating
+CREATE INDEX idx_review_movie_rating ON Review (MovieID, Rating);
+CREATE INDEX idx_review_show_rating ON Review (ShowID, Rating);
+
+-- GetUserReviewCount and before_user_delete (WHERE UserID = ?), and the nested
+-- award query's semi-join, which reads MovieID for a user without touching rows
+CREATE INDEX idx_review_user_movie ON Review (UserID, MovieID);
+
+-- Nested award query: WHERE aw.MovieID IS NOT NULL / IN (...)
+CREATE INDEX idx_award_winner_movie ON Award_Winner (MovieID);
+
+-- Trigger Log tab: newest-first keyset paging on (ActionTime, LogID), time-range
+-- filters, the live tail's first fill and ArchiveReviewLog's cutoff. The tail's
+-- polls (LogID > last seen) use the primary key.
+CREATE INDEX idx_review_log_time ON Review_Log (ActionTime, LogID);
+
+-- Search tab: full-text search on titles and names (boolean mode, prefix terms).
+-- Without these MATCH ... AGAINST fails; the fuzzy trigram matching is done in the app.
+CREATE FULLTEXT INDEX ft_movie_title ON Movie (Title);
+CREATE FULLTEXT INDEX ft_show_title ON TV_Show (Title);
+CREATE FULLTEXT INDEX ft_episode_title ON Episode (Title);
+CREATE FULLTEXT INDEX ft_person_name ON Person (Name);
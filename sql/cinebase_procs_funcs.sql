@@ -34,10 +34,13 @@ CREATE PROCEDURE GetAverageRating (
     IN showID INT
 )
 BEGIN
+    -- Reads the trigger-maintained summary row instead of scanning Review
     IF movieID IS NOT NULL THEN
-        SELECT AVG(Rating) AS AvgRating FROM Review WHERE MovieID = movieID;
+        SELECT (SELECT s.RatingSum / NULLIF(s.RatingCount, 0)
+                FROM Movie_Rating_Stats s WHERE s.MovieID = movieID) AS AvgRating;
     ELSEIF showID IS NOT NULL THEN
-        SELECT AVG(Rating) AS AvgRating FROM Review WHERE ShowID = showID;
+        SELECT (SELECT s.RatingSum / NULLIF(s.RatingCount, 0)
+                FROM Show_Rating_Stats s WHERE s.ShowID = showID) AS AvgRating;
     ELSE
         SELECT 'Provide either movieID or showID' AS Message;
     END IF;
@@ -63,3 +66,554 @@ BEGIN
     RETURN TIMESTAMPDIFF(YEAR, birth_date, CURDATE());
 END //
 DELIMITER ;
+
+DELIMITER //
+CREATE PROCEDURE GetGenreStatistics ()
+BEGIN
+    -- Movies and shows are aggregated per title first (one pass over Review each,
+    -- along the (MovieID, Rating) / (ShowID, Rating) indexes) and only then merged
+    -- per genre, so every review is counted once per genre of its title.
+    WITH movie_ratings AS (
+        SELECT MovieID, COUNT(*) AS Reviews, COUNT(Rating) AS Rated, SUM(Rating) AS RatingSum,
+               MIN(Rating) AS MinRating, MAX(Rating) AS MaxRating
+        FROM Review
+        WHERE MovieID IS NOT NULL
+        GROUP BY MovieID
+    ), show_ratings AS (
+        SELECT ShowID, COUNT(*) AS Reviews, COUNT(Rating) AS Rated, SUM(Rating) AS RatingSum,
+               MIN(Rating) AS MinRating, MAX(Rating) AS MaxRating
+        FROM Review
+        WHERE ShowID IS NOT NULL
+        GROUP BY ShowID
+    ), titles AS (
+        SELECT mg.GenreID, 1 AS IsMovie, mr.Reviews, mr.Rated, mr.RatingSum, mr.MinRating, mr.MaxRating
+        FROM Movie_Genre mg LEFT JOIN movie_ratings mr ON mr.MovieID = mg.MovieID
+        UNION ALL
+        SELECT sg.GenreID, 0, sr.Reviews, sr.Rated, sr.RatingSum, sr.MinRating, sr.MaxRating
+        FROM Show_Genre sg LEFT JOIN show_ratings sr ON sr.ShowID = sg.ShowID
+    )
+    SELECT
+        g.Name AS Genre,
+        IFNULL(SUM(t.IsMovie), 0) AS Movies,
+        IFNULL(SUM(1 - t.IsMovie), 0) AS Shows,
+        COUNT(t.GenreID) AS Total,
+        IFNULL(SUM(t.Reviews), 0) AS Reviews,
+        ROUND(SUM(t.RatingSum) / NULLIF(SUM(t.Rated), 0), 2) AS AvgRating,
+        MAX(t.MaxRating) AS MaxRating,
+        MIN(t.MinRating) AS MinRating
+    FROM Genre g
+    LEFT JOIN titles t ON t.GenreID = g.GenreID
+    GROUP BY g.GenreID, g.Name
+    ORDER BY Total DESC;
+END //
+DELIMITER ;
+
+-- ---------------- Rating summary maintenance ----------------
+-- Used by the Review / Movie_Genre / Show_Genre triggers in cinebase_triggers.sql
+-- to keep Movie_Rating_Stats, Show_Rating_Stats and Genre_Rating_Stats current.
+
+DELIMITER //
+CREATE PROCEDURE RefreshGenreRatingRange (
+    IN p_genreID INT
+)
+BEGIN
+    DECLARE m_min INT;
+    DECLARE m_max INT;
+    DECLARE s_min INT;
+    DECLARE s_max INT;
+
+    SELECT MIN(ms.MinRating), MAX(ms.MaxRating) INTO m_min, m_max
+    FROM Movie_Genre mg JOIN Movie_Rating_Stats ms ON ms.MovieID = mg.MovieID
+    WHERE mg.GenreID = p_genreID;
+
+    SELECT MIN(ss.MinRating), MAX(ss.MaxRating) INTO s_min, s_max
+    FROM Show_Genre sg JOIN Show_Rating_Stats ss ON ss.ShowID = sg.ShowID
+    WHERE sg.GenreID = p_genreID;
+
+    UPDATE Genre_Rating_Stats
+    SET MinRating = COALESCE(LEAST(m_min, s_min), m_min, s_min),
+        MaxRating = COALESCE(GREATEST(m_max, s_max), m_max, s_max)
+    WHERE GenreID = p_genreID;
+END //
+DELIMITER ;
+
+DELIMITER //
+CREATE PROCEDURE RefreshTitleGenreRanges (
+    IN p_movieID INT,
+    IN p_showID INT
+)
+BEGIN
+    DECLARE done INT DEFAULT 0;
+    DECLARE g INT;
+    DECLARE genres CURSOR FOR
+        SELECT GenreID FROM Movie_Genre WHERE MovieID = p_movieID
+        UNION
+        SELECT GenreID FROM Show_Genre WHERE ShowID = p_showID;
+    DECLARE CONTINUE HANDLER FOR NOT FOUND SET done = 1;
+
+    OPEN genres;
+    genre_loop: LOOP
+        FETCH genres INTO g;
+        IF done THEN
+            LEAVE genre_loop;
+        END IF;
+        CALL RefreshGenreRatingRange(g);
+    END LOOP;
+    CLOSE genres;
+END //
+DELIMITER ;
+
+DELIMITER //
+CREATE PROCEDURE ApplyReviewToStats (
+    IN p_movieID INT,
+    IN p_showID INT,
+    IN p_rating INT,
+    IN p_sign INT
+)
+BEGIN
+    -- p_sign is 1 when a review is added and -1 when it is removed
+    DECLARE rated INT DEFAULT IF(p_rating IS NULL, 0, 1);
+    DECLARE points INT DEFAULT IFNULL(p_rating, 0);
+    DECLARE old_min INT;
+    DECLARE old_max INT;
+    DECLARE range_changed INT DEFAULT 0;
+
+    IF p_sign > 0 THEN
+        IF p_movieID IS NOT NULL THEN
+            INSERT INTO Movie_Rating_Stats (MovieID, ReviewCount, RatingCount, RatingSum, MinRating, MaxRating)
+            VALUES (p_movieID, 1, rated, points, p_rating, p_rating)
+            ON DUPLICATE KEY UPDATE
+                ReviewCount = ReviewCount + 1,
+                RatingCount = RatingCount + rated,
+                RatingSum = RatingSum + points,
+                MinRating = COALESCE(LEAST(MinRating, p_rating), MinRating, p_rating),
+                MaxRating = COALESCE(GREATEST(MaxRating, p_rating), MaxRating, p_rating);
+        END IF;
+        IF p_showID IS NOT NULL THEN
+            INSERT INTO Show_Rating_Stats (ShowID, ReviewCount, RatingCount, RatingSum, MinRating, MaxRating)
+            VALUES (p_showID, 1, rated, points, p_rating, p_rating)
+            ON DUPLICATE KEY UPDATE
+                ReviewCount = ReviewCount + 1,
+                RatingCount = RatingCount + rated,
+                RatingSum = RatingSum + points,
+                MinRating = COALESCE(LEAST(MinRating, p_rating), MinRating, p_rating),
+                MaxRating = COALESCE(GREATEST(MaxRating, p_rating), MaxRating, p_rating);
+        END IF;
+
+        INSERT INTO Genre_Rating_Stats (GenreID, ReviewCount, RatingCount, RatingSum, MinRating, MaxRating)
+        SELECT t.GenreID, 1, rated, points, p_rating, p_rating
+        FROM (
+            SELECT GenreID FROM Movie_Genre WHERE MovieID = p_movieID
+            UNION ALL
+            SELECT GenreID FROM Show_Genre WHERE ShowID = p_showID
+        ) t
+        ON DUPLICATE KEY UPDATE
+            ReviewCount = Genre_Rating_Stats.ReviewCount + 1,
+            RatingCount = Genre_Rating_Stats.RatingCount + rated,
+            RatingSum = Genre_Rating_Stats.RatingSum + points,
+            MinRating = COALESCE(LEAST(Genre_Rating_Stats.MinRating, p_rating), Genre_Rating_Stats.MinRating, p_rating),
+            MaxRating = COALESCE(GREATEST(Genre_Rating_Stats.MaxRating, p_rating), Genre_Rating_Stats.MaxRating, p_rating);
+    ELSE
+        IF p_movieID IS NOT NULL THEN
+            -- SELECT ... INTO leaves the variables alone when there is no row
+            SET old_min = NULL, old_max = NULL;
+            SELECT MinRating, MaxRating INTO old_min, old_max FROM Movie_Rating_Stats WHERE MovieID = p_movieID;
+            UPDATE Movie_Rating_Stats
+            SET ReviewCount = ReviewCount - 1,
+                RatingCount = RatingCount - rated,
+                RatingSum = RatingSum - points
+            WHERE MovieID = p_movieID;
+            -- Only a removed extreme can move the range; re-read it from the (MovieID, Rating) index
+            IF p_rating IN (old_min, old_max) THEN
+                UPDATE Movie_Rating_Stats
+                SET MinRating = (SELECT MIN(Rating) FROM Review WHERE MovieID = p_movieID),
+                    MaxRating = (SELECT MAX(Rating) FROM Review WHERE MovieID = p_movieID)
+                WHERE MovieID = p_movieID;
+                SET range_changed = 1;
+            END IF;
+        END IF;
+        IF p_showID IS NOT NULL THEN
+            SET old_min = NULL, old_max = NULL;
+            SELECT MinRating, MaxRating INTO old_min, old_max FROM Show_Rating_Stats WHERE ShowID = p_showID;
+            UPDATE Show_Rating_Stats
+            SET ReviewCount = ReviewCount - 1,
+                RatingCount = RatingCount - rated,
+                RatingSum = RatingSum - points
+            WHERE ShowID = p_showID;
+            IF p_rating IN (old_min, old_max) THEN
+                UPDATE Show_Rating_Stats
+                SET MinRating = (SELECT MIN(Rating) FROM Review WHERE ShowID = p_showID),
+                    MaxRating = (SELECT MAX(Rating) FROM Review WHERE ShowID = p_showID)
+                WHERE ShowID = p_showID;
+                SET range_changed = 1;
+            END IF;
+        END IF;
+
+        -- A review of both a movie and a show counts once for each of their genres
+        UPDATE Genre_Rating_Stats gs
+        JOIN (
+            SELECT GenreID, COUNT(*) AS n
+            FROM (
+                SELECT GenreID FROM Movie_Genre WHERE MovieID = p_movieID
+                UNION ALL
+                SELECT GenreID FROM Show_Genre WHERE ShowID = p_showID
+            ) titles
+            GROUP BY GenreID
+        ) t ON t.GenreID = gs.GenreID
+        SET gs.ReviewCount = gs.ReviewCount - t.n,
+            gs.RatingCount = gs.RatingCount - t.n * rated,
+            gs.RatingSum = gs.RatingSum - t.n * points;
+        IF range_changed THEN
+            CALL RefreshTitleGenreRanges(p_movieID, p_showID);
+        END IF;
+    END IF;
+
+    -- Copy the new totals into the titles' Title_Detail rows
+    IF p_movieID IS NOT NULL THEN
+        UPDATE Title_Detail d
+        JOIN Movie_Rating_Stats s ON s.MovieID = d.TitleID
+        SET d.ReviewCount = s.ReviewCount,
+            d.RatingCount = s.RatingCount,
+            d.AverageRating = ROUND(s.RatingSum / NULLIF(s.RatingCount, 0), 2)
+        WHERE d.TitleType = 'Movie' AND d.TitleID = p_movieID;
+    END IF;
+    IF p_showID IS NOT NULL THEN
+        UPDATE Title_Detail d
+        JOIN Show_Rating_Stats s ON s.ShowID = d.TitleID
+        SET d.ReviewCount = s.ReviewCount,
+            d.RatingCount = s.RatingCount,
+            d.AverageRating = ROUND(s.RatingSum / NULLIF(s.RatingCount, 0), 2)
+        WHERE d.TitleType = 'Show' AND d.TitleID = p_showID;
+    END IF;
+END //
+DELIMITER ;
+
+DELIMITER //
+CREATE PROCEDURE ApplyTitleToGenreStats (
+    IN p_genreID INT,
+    IN p_movieID INT,
+    IN p_showID INT,
+    IN p_sign INT
+)
+BEGIN
+    -- Adds (p_sign = 1) or removes (p_sign = -1) one title's totals to/from a genre
+    DECLARE c INT;
+    DECLARE rc INT;
+    DECLARE rs INT;
+    DECLARE mn INT;
+    DECLARE mx INT;
+    DECLARE is_movie INT DEFAULT IF(p_movieID IS NULL, 0, 1);
+
+    IF is_movie THEN
+        SELECT IFNULL(MAX(ReviewCount), 0), IFNULL(MAX(RatingCount), 0), IFNULL(MAX(RatingSum), 0),
+               MAX(MinRating), MAX(MaxRating)
+        INTO c, rc, rs, mn, mx
+        FROM Movie_Rating_Stats WHERE MovieID = p_movieID;
+    ELSE
+        SELECT IFNULL(MAX(ReviewCount), 0), IFNULL(MAX(RatingCount), 0), IFNULL(MAX(RatingSum), 0),
+               MAX(MinRating), MAX(MaxRating)
+        INTO c, rc, rs, mn, mx
+        FROM Show_Rating_Stats WHERE ShowID = p_showID;
+    END IF;
+
+    IF p_sign > 0 THEN
+        INSERT INTO Genre_Rating_Stats (GenreID, MovieCount, ShowCount, ReviewCount, RatingCount, RatingSum, MinRating, MaxRating)
+        VALUES (p_genreID, is_movie, 1 - is_movie, c, rc, rs, mn, mx)
+        ON DUPLICATE KEY UPDATE
+            MovieCount = MovieCount + is_movie,
+            ShowCount = ShowCount + 1 - is_movie,
+            ReviewCount = ReviewCount + c,
+            RatingCount = RatingCount + rc,
+            RatingSum = RatingSum + rs,
+            MinRating = COALESCE(LEAST(MinRating, mn), MinRating, mn),
+            MaxRating = COALESCE(GREATEST(MaxRating, mx), MaxRating, mx);
+    ELSE
+        UPDATE Genre_Rating_Stats
+        SET MovieCount = MovieCount - is_movie,
+            ShowCount = ShowCount - (1 - is_movie),
+            ReviewCount = ReviewCount - c,
+            RatingCount = RatingCount - rc,
+            RatingSum = RatingSum - rs
+        WHERE GenreID = p_genreID;
+        CALL RefreshGenreRatingRange(p_genreID);
+    END IF;
+END //
+DELIMITER ;
+
+DELIMITER //
+CREATE PROCEDURE RebuildRatingStats ()
+BEGIN
+    -- One-shot rebuild from Review, e.g. after a bulk load or FK cascades (which do not fire triggers)
+    DELETE FROM Genre_Rating_Stats;
+    DELETE FROM Movie_Rating_Stats;
+    DELETE FROM Show_Rating_Stats;
+
+    INSERT INTO Movie_Rating_Stats (MovieID, ReviewCount, RatingCount, RatingSum, MinRating, MaxRating)
+    SELECT MovieID, COUNT(*), COUNT(Rating), IFNULL(SUM(Rating), 0), MIN(Rating), MAX(Rating)
+    FROM Review
+    WHERE MovieID IS NOT NULL
+    GROUP BY MovieID;
+
+    INSERT INTO Show_Rating_Stats (ShowID, ReviewCount, RatingCount, RatingSum, MinRating, MaxRating)
+    SELECT ShowID, COUNT(*), COUNT(Rating), IFNULL(SUM(Rating), 0), MIN(Rating), MAX(Rating)
+    FROM Review
+    WHERE ShowID IS NOT NULL
+    GROUP BY ShowID;
+
+    INSERT INTO Genre_Rating_Stats (GenreID, MovieCount, ShowCount, ReviewCount, RatingCount, RatingSum, MinRating, MaxRating)
+    SELECT g.GenreID,
+           IFNULL(SUM(t.IsMovie), 0), IFNULL(SUM(1 - t.IsMovie), 0),
+           IFNULL(SUM(t.ReviewCount), 0), IFNULL(SUM(t.RatingCount), 0), IFNULL(SUM(t.RatingSum), 0),
+           MIN(t.MinRating), MAX(t.MaxRating)
+    FROM Genre g
+    LEFT JOIN (
+        SELECT mg.GenreID, 1 AS IsMovie, ms.ReviewCount, ms.RatingCount, ms.RatingSum, ms.MinRating, ms.MaxRating
+        FROM Movie_Genre mg LEFT JOIN Movie_Rating_Stats ms ON ms.MovieID = mg.MovieID
+        UNION ALL
+        SELECT sg.GenreID, 0, ss.ReviewCount, ss.RatingCount, ss.RatingSum, ss.MinRating, ss.MaxRating
+        FROM Show_Genre sg LEFT JOIN Show_Rating_Stats ss ON ss.ShowID = sg.ShowID
+    ) t ON t.GenreID = g.GenreID
+    GROUP BY g.GenreID;
+END //
+DELIMITER ;
+
+-- ---------------- Title detail maintenance ----------------
+-- Used by the triggers in cinebase_triggers.sql to keep Title_Detail current.
+-- The Genres and Credits lists keep only the items whose running length
+-- (with separators) stays within 1000 bytes: that fits Genres VARCHAR(1000)
+-- and the default group_concat_max_len of 1024, so GROUP_CONCAT never cuts a
+-- row (an error under strict mode) and the session settings are left alone.
+-- CreditCount always counts every credit.
+
+DELIMITER //
+CREATE PROCEDURE RefreshTitleDetail (
+    IN p_movieID INT,
+    IN p_showID INT
+)
+BEGIN
+    -- Recomputes the row of a movie and / or a show; a title that no longer
+    -- exists loses its row. Each part is read along the title's FK index.
+    IF p_movieID IS NOT NULL THEN
+        DELETE FROM Title_Detail WHERE TitleType = 'Movie' AND TitleID = p_movieID;
+        INSERT INTO Title_Detail (TitleType, TitleID, Title, ReleaseDate, EndDate, Runtime, Language, Country,
+                                  Genres, Credits, CreditCount, AwardCount, SeasonCount, EpisodeCount,
+                                  ReviewCount, RatingCount, AverageRating)
+        SELECT 'Movie', m.MovieID, m.Title, m.ReleaseDate, NULL, m.Runtime, m.Language, m.Country,
+               (SELECT GROUP_CONCAT(x.Name ORDER BY x.Name SEPARATOR ', ')
+                FROM (SELECT g.Name, SUM(LENGTH(g.Name) + 2) OVER (ORDER BY g.Name, g.GenreID) AS ListBytes
+                      FROM Movie_Genre mg JOIN Genre g ON g.GenreID = mg.GenreID
+                      WHERE mg.MovieID = p_movieID) x
+                WHERE x.ListBytes <= 1000),
+               (SELECT GROUP_CONCAT(x.Credit ORDER BY x.RoleID SEPARATOR ', ')
+                FROM (SELECT r.RoleID, CONCAT(p.Name, ' (', r.RoleType, ')') AS Credit,
+                             SUM(LENGTH(CONCAT(p.Name, ' (', r.RoleType, ')')) + 2) OVER (ORDER BY r.RoleID) AS ListBytes
+                      FROM Role r JOIN Person p ON p.PersonID = r.PersonID
+                      WHERE r.MovieID = p_movieID) x
+                WHERE x.ListBytes <= 1000),
+               (SELECT COUNT(*) FROM Role r WHERE r.MovieID = m.MovieID),
+               (SELECT COUNT(*) FROM Award_Winner aw WHERE aw.MovieID = m.MovieID),
+               0, 0,
+               IFNULL(s.ReviewCount, 0), IFNULL(s.RatingCount, 0), ROUND(s.RatingSum / NULLIF(s.RatingCount, 0), 2)
+        FROM Movie m
+        LEFT JOIN Movie_Rating_Stats s ON s.MovieID = m.MovieID
+        WHERE m.MovieID = p_movieID;
+    END IF;
+
+    IF p_showID IS NOT NULL THEN
+        DELETE FROM Title_Detail WHERE TitleType = 'Show' AND TitleID = p_showID;
+        INSERT INTO Title_Detail (TitleType, TitleID, Title, ReleaseDate, EndDate, Runtime, Language, Country,
+                                  Genres, Credits, CreditCount, AwardCount, SeasonCount, EpisodeCount,
+                                  ReviewCount, RatingCount, AverageRating)
+        SELECT 'Show', t.ShowID, t.Title, t.StartDate, t.EndDate, NULL, NULL, NULL,
+               (SELECT GROUP_CONCAT(x.Name ORDER BY x.Name SEPARATOR ', ')
+                FROM (SELECT g.Name, SUM(LENGTH(g.Name) + 2) OVER (ORDER BY g.Name, g.GenreID) AS ListBytes
+                      FROM Show_Genre sg JOIN Genre g ON g.GenreID = sg.GenreID
+                      WHERE sg.ShowID = p_showID) x
+                WHERE x.ListBytes <= 1000),
+               (SELECT GROUP_CONCAT(x.Credit ORDER BY x.RoleID SEPARATOR ', ')
+                FROM (SELECT r.RoleID, CONCAT(p.Name, ' (', r.RoleType, ')') AS Credit,
+                             SUM(LENGTH(CONCAT(p.Name, ' (', r.RoleType, ')')) + 2) OVER (ORDER BY r.RoleID) AS ListBytes
+                      FROM Role r JOIN Person p ON p.PersonID = r.PersonID
+                      WHERE r.ShowID = p_showID) x
+                WHERE x.ListBytes <= 1000),
+               (SELECT COUNT(*) FROM Role r WHERE r.ShowID = t.ShowID),
+               (SELECT COUNT(*) FROM Award_Winner aw WHERE aw.ShowID = t.ShowID),
+               (SELECT COUNT(*) FROM Season se WHERE se.ShowID = t.ShowID),
+               (SELECT COUNT(*) FROM Season se JOIN Episode e ON e.SeasonID = se.SeasonID WHERE se.ShowID = t.ShowID),
+               IFNULL(s.ReviewCount, 0), IFNULL(s.RatingCount, 0), ROUND(s.RatingSum / NULLIF(s.RatingCount, 0), 2)
+        FROM TV_Show t
+        LEFT JOIN Show_Rating_Stats s ON s.ShowID = t.ShowID
+        WHERE t.ShowID = p_showID;
+    END IF;
+END //
+DELIMITER ;
+
+DELIMITER //
+CREATE PROCEDURE RebuildTitleDetail ()
+BEGIN
+    -- Set-based rebuild of every row, from a scheduled job (python cli.py
+    -- refresh-title-detail) or after a bulk load. Ratings come from the rating
+    -- summaries; run RebuildRatingStats() first if those are stale as well.
+    DELETE FROM Title_Detail;
+
+    INSERT INTO Title_Detail (TitleType, TitleID, Title, ReleaseDate, EndDate, Runtime, Language, Country,
+                              Genres, Credits, CreditCount, AwardCount, SeasonCount, EpisodeCount,
+                              ReviewCount, RatingCount, AverageRating)
+    SELECT 'Movie', m.MovieID, m.Title, m.ReleaseDate, NULL, m.Runtime, m.Language, m.Country,
+           g.Genres, c.Credits, IFNULL(c.CreditCount, 0), IFNULL(a.AwardCount, 0), 0, 0,
+           IFNULL(s.ReviewCount, 0), IFNULL(s.RatingCount, 0), ROUND(s.RatingSum / NULLIF(s.RatingCount, 0), 2)
+    FROM Movie m
+    LEFT JOIN (
+        SELECT x.MovieID, GROUP_CONCAT(x.Name ORDER BY x.Name SEPARATOR ', ') AS Genres
+        FROM (SELECT mg.MovieID, g.Name,
+                     SUM(LENGTH(g.Name) + 2) OVER (PARTITION BY mg.MovieID ORDER BY g.Name, g.GenreID) AS ListBytes
+              FROM Movie_Genre mg JOIN Genre g ON g.GenreID = mg.GenreID) x
+        WHERE x.ListBytes <= 1000
+        GROUP BY x.MovieID
+    ) g ON g.MovieID = m.MovieID
+    LEFT JOIN (
+        SELECT x.MovieID, COUNT(*) AS CreditCount,
+               GROUP_CONCAT(IF(x.ListBytes <= 1000, x.Credit, NULL) ORDER BY x.RoleID SEPARATOR ', ') AS Credits
+        FROM (SELECT r.MovieID, r.RoleID, CONCAT(p.Name, ' (', r.RoleType, ')') AS Credit,
+                     SUM(LENGTH(CONCAT(p.Name, ' (', r.RoleType, ')')) + 2)
+                         OVER (PARTITION BY r.MovieID ORDER BY r.RoleID) AS ListBytes
+              FROM Role r JOIN Person p ON p.PersonID = r.PersonID
+              WHERE r.MovieID IS NOT NULL) x
+        GROUP BY x.MovieID
+    ) c ON c.MovieID = m.MovieID
+    LEFT JOIN (
+        SELECT MovieID, COUNT(*) AS AwardCount FROM Award_Winner WHERE MovieID IS NOT NULL GROUP BY MovieID
+    ) a ON a.MovieID = m.MovieID
+    LEFT JOIN Movie_Rating_Stats s ON s.MovieID = m.MovieID;
+
+    INSERT INTO Title_Detail (TitleType, TitleID, Title, ReleaseDate, EndDate, Runtime, Language, Country,
+                              Genres, Credits, CreditCount, AwardCount, SeasonCount, EpisodeCount,
+                              ReviewCount, RatingCount, AverageRating)
+    SELECT 'Show', t.ShowID, t.Title, t.StartDate, t.EndDate, NULL, NULL, NULL,
+           g.Genres, c.Credits, IFNULL(c.CreditCount, 0), IFNULL(a.AwardCount, 0),
+           IFNULL(e.SeasonCount, 0), IFNULL(e.EpisodeCount, 0),
+           IFNULL(s.ReviewCount, 0), IFNULL(s.RatingCount, 0), ROUND(s.RatingSum / NULLIF(s.RatingCount, 0), 2)
+    FROM TV_Show t
+    LEFT JOIN (
+        SELECT x.ShowID, GROUP_CONCAT(x.Name ORDER BY x.Name SEPARATOR ', ') AS Genres
+        FROM (SELECT sg.ShowID, g.Name,
+                     SUM(LENGTH(g.Name) + 2) OVER (PARTITION BY sg.ShowID ORDER BY g.Name, g.GenreID) AS ListBytes
+              FROM Show_Genre sg JOIN Genre g ON g.GenreID = sg.GenreID) x
+        WHERE x.ListBytes <= 1000
+        GROUP BY x.ShowID
+    ) g ON g.ShowID = t.ShowID
+    LEFT JOIN (
+        SELECT x.ShowID, COUNT(*) AS CreditCount,
+               GROUP_CONCAT(IF(x.ListBytes <= 1000, x.Credit, NULL) ORDER BY x.RoleID SEPARATOR ', ') AS Credits
+        FROM (SELECT r.ShowID, r.RoleID, CONCAT(p.Name, ' (', r.RoleType, ')') AS Credit,
+                     SUM(LENGTH(CONCAT(p.Name, ' (', r.RoleType, ')')) + 2)
+                         OVER (PARTITION BY r.ShowID ORDER BY r.RoleID) AS ListBytes
+              FROM Role r JOIN Person p ON p.PersonID = r.PersonID
+              WHERE r.ShowID IS NOT NULL) x
+        GROUP BY x.ShowID
+    ) c ON c.ShowID = t.ShowID
+    LEFT JOIN (
+        SELECT ShowID, COUNT(*) AS AwardCount FROM Award_Winner WHERE ShowID IS NOT NULL GROUP BY ShowID
+    ) a ON a.ShowID = t.ShowID
+    LEFT JOIN (
+        SELECT se.ShowID, COUNT(DISTINCT se.SeasonID) AS SeasonCount, COUNT(ep.EpisodeID) AS EpisodeCount
+        FROM Season se LEFT JOIN Episode ep ON ep.SeasonID = se.SeasonID
+        GROUP BY se.ShowID
+    ) e ON e.ShowID = t.ShowID
+    LEFT JOIN Show_Rating_Stats s ON s.ShowID = t.ShowID;
+END //
+DELIMITER ;
+
+-- ---------------- Review_Log archival ----------------
+-- Review_Log only grows (after_review_insert appends to it). Run this from a
+-- scheduled job (python cli.py archive-log) to keep the hot table small; old
+-- entries stay queryable in Review_Log_Archive.
+
+DELIMITER //
+CREATE PROCEDURE ArchiveReviewLog (
+    IN keepDays INT,
+    IN batchRows INT
+)
+BEGIN
+    -- Moves entries older than keepDays days, batchRows LogIDs per transaction
+    -- so locks are short and replication lag stays low
+    DECLARE cutoff TIMESTAMP DEFAULT NOW() - INTERVAL keepDays DAY;
+    DECLARE lo INT;
+    DECLARE lastId INT;
+    DECLARE moved INT DEFAULT 0;
+
+    SELECT MIN(LogID), MAX(LogID) INTO lo, lastId FROM Review_Log WHERE ActionTime < cutoff;
+
+    WHILE lo IS NOT NULL AND lo <= lastId DO
+        START TRANSACTION;
+        INSERT INTO Review_Log_Archive (LogID, ReviewID, UserID, MovieID, ShowID, Action, ActionTime)
+        SELECT LogID, ReviewID, UserID, MovieID, ShowID, Action, ActionTime
+        FROM Review_Log
+        WHERE LogID BETWEEN lo AND lo + batchRows - 1 AND ActionTime < cutoff;
+        DELETE FROM Review_Log
+        WHERE LogID BETWEEN lo AND lo + batchRows - 1 AND ActionTime < cutoff;
+        SET moved = moved + ROW_COUNT();
+        COMMIT;
+        SET lo = lo + batchRows;
+    END WHILE;
+
+    SELECT moved AS ArchivedRows;
+END //
+DELIMITER ;
+
+-- ---------------- Inactive user purge ----------------
+-- Deletes accounts that joined more than inactiveDays days ago and never
+-- wrote a review (python cli.py purge-users, or the Procedures tab).
+
+DELIMITER //
+CREATE PROCEDURE PurgeInactiveUsers (
+    IN inactiveDays INT,
+    IN batchRows INT,
+    IN pauseMs INT,
+    IN dryRun BOOLEAN
+)
+BEGIN
+    -- Candidates come from one anti-join against Review; they are then deleted
+    -- batchRows at a time, one transaction each, sleeping pauseMs between
+    -- batches so replicas keep up. A review written meanwhile spares its user.
+    DECLARE lo INT DEFAULT 0;
+    DECLARE hi INT;
+    DECLARE eligible INT;
+    DECLARE deleted INT DEFAULT 0;
+
+    DROP TEMPORARY TABLE IF EXISTS Purge_Candidates;
+    CREATE TEMPORARY TABLE Purge_Candidates (UserID INT PRIMARY KEY);
+    INSERT INTO Purge_Candidates (UserID)
+    SELECT u.UserID
+    FROM Users u
+    LEFT JOIN Review r ON r.UserID = u.UserID
+    WHERE r.ReviewID IS NULL
+      AND u.JoinDate < CURRENT_DATE - INTERVAL inactiveDays DAY;
+    SELECT COUNT(*) INTO eligible FROM Purge_Candidates;
+
+    purge: WHILE NOT dryRun DO
+        SELECT MAX(UserID) INTO hi
+        FROM (SELECT UserID FROM Purge_Candidates WHERE UserID > lo ORDER BY UserID LIMIT batchRows) b;
+        IF hi IS NULL THEN
+            LEAVE purge;
+        END IF;
+
+        START TRANSACTION;
+        DELETE u
+        FROM Users u
+        JOIN Purge_Candidates c ON c.UserID = u.UserID
+        WHERE c.UserID > lo AND c.UserID <= hi
+          AND NOT EXISTS (SELECT 1 FROM Review r WHERE r.UserID = u.UserID);
+        SET deleted = deleted + ROW_COUNT();
+        COMMIT;
+
+        SET lo = hi;
+        IF pauseMs > 0 THEN
+            DO SLEEP(pauseMs / 1000);
+        END IF;
+    END WHILE;
+
+    DROP TEMPORARY TABLE Purge_Candidates;
+    SELECT eligible AS EligibleUsers, deleted AS DeletedUsers;
+END //
+DELIMITER ;
@@ -21,7 +21,8 @@ WHERE u.UserID IN (
 -- 2. JOIN QUERY
 -- Get detailed movie information with genres and average ratings
 
--- This query joins Movie, Movie_Genre, Genre, and Review tables to show comprehensive movie details
+-- This query joins Movie, Movie_Genre, Genre, and Movie_Rating_Stats tables to show comprehensive movie details.
+-- Ratings come from the trigger-maintained summary (see cinebase_triggers.sql) instead of aggregating Review.
 SELECT 
     m.MovieID,
     m.Title,
@@ -30,13 +31,14 @@ SELECT
     m.Language,
     m.Country,
     GROUP_CONCAT(DISTINCT g.Name ORDER BY g.Name SEPARATOR ', ') AS Genres,
-    ROUND(AVG(r.Rating), 2) AS AverageRating,
-    COUNT(DISTINCT r.ReviewID) AS TotalReviews
+    ROUND(s.RatingSum / NULLIF(s.RatingCount, 0), 2) AS AverageRating,
+    IFNULL(s.ReviewCount, 0) AS TotalReviews
 FROM Movie m
 LEFT JOIN Movie_Genre mg ON m.MovieID = mg.MovieID
 LEFT JOIN Genre g ON mg.GenreID = g.GenreID
-LEFT JOIN Review r ON m.MovieID = r.MovieID
-GROUP BY m.MovieID, m.Title, m.ReleaseDate, m.Runtime, m.Language, m.Country
+LEFT JOIN Movie_Rating_Stats s ON m.MovieID = s.MovieID
+GROUP BY m.MovieID, m.Title, m.ReleaseDate, m.Runtime, m.Language, m.Country,
+         s.RatingSum, s.RatingCount, s.ReviewCount
 ORDER BY AverageRating DESC;
 
 
@@ -44,18 +46,39 @@ ORDER BY AverageRating DESC;
 -- Get statistics on content by genre
 
 -- This query provides aggregate statistics showing how many movies and shows exist per genre,
--- along with average ratings
+-- along with average ratings.
+-- Movie and show ratings are aggregated per title first and then merged per genre with UNION ALL.
+-- (Joining Genre to both link tables and then to Review with an OR condition multiplies every
+-- review by the number of titles on the other side, which skews AVG and cannot use an index.)
+-- The same query is available as CALL GetGenreStatistics();
+WITH movie_ratings AS (
+    SELECT MovieID, COUNT(Rating) AS Rated, SUM(Rating) AS RatingSum,
+           MIN(Rating) AS MinRating, MAX(Rating) AS MaxRating
+    FROM Review
+    WHERE MovieID IS NOT NULL
+    GROUP BY MovieID
+), show_ratings AS (
+    SELECT ShowID, COUNT(Rating) AS Rated, SUM(Rating) AS RatingSum,
+           MIN(Rating) AS MinRating, MAX(Rating) AS MaxRating
+    FROM Review
+    WHERE ShowID IS NOT NULL
+    GROUP BY ShowID
+), titles AS (
+    SELECT mg.GenreID, 1 AS IsMovie, mr.Rated, mr.RatingSum, mr.MinRating, mr.MaxRating
+    FROM Movie_Genre mg LEFT JOIN movie_ratings mr ON mr.MovieID = mg.MovieID
+    UNION ALL
+    SELECT sg.GenreID, 0, sr.Rated, sr.RatingSum, sr.MinRating, sr.MaxRating
+    FROM Show_Genre sg LEFT JOIN show_ratings sr ON sr.ShowID = sg.ShowID
+)
 SELECT 
     g.Name AS Genre,
-    COUNT(DISTINCT mg.MovieID) AS TotalMovies,
-    COUNT(DISTINCT sg.ShowID) AS TotalShows,
-    COUNT(DISTINCT mg.MovieID) + COUNT(DISTINCT sg.ShowID) AS TotalContent,
-    ROUND(AVG(r.Rating), 2) AS AverageRating,
-    MAX(r.Rating) AS HighestRating,
-    MIN(r.Rating) AS LowestRating
+    IFNULL(SUM(t.IsMovie), 0) AS TotalMovies,
+    IFNULL(SUM(1 - t.IsMovie), 0) AS TotalShows,
+    COUNT(t.GenreID) AS TotalContent,
+    ROUND(SUM(t.RatingSum) / NULLIF(SUM(t.Rated), 0), 2) AS AverageRating,
+    MAX(t.MaxRating) AS HighestRating,
+    MIN(t.MinRating) AS LowestRating
 FROM Genre g
-LEFT JOIN Movie_Genre mg ON g.GenreID = mg.GenreID
-LEFT JOIN Show_Genre sg ON g.GenreID = sg.GenreID
-LEFT JOIN Review r ON (r.MovieID = mg.MovieID OR r.ShowID = sg.ShowID)
+LEFT JOIN titles t ON t.GenreID = g.GenreID
 GROUP BY g.GenreID, g.Name
 ORDER BY TotalContent DESC;
@@ -10,6 +10,18 @@ CREATE TABLE Review_Log (
     ActionTime TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Entries moved out of Review_Log by ArchiveReviewLog (cinebase_procs_funcs.sql)
+CREATE TABLE Review_Log_Archive (
+    LogID INT PRIMARY KEY,
+    ReviewID INT,
+    UserID INT,
+    MovieID INT,
+    ShowID INT,
+    Action VARCHAR(50),
+    ActionTime TIMESTAMP NULL,
+    INDEX idx_review_log_archive_time (ActionTime, LogID)
+);
+
 DELIMITER //
 CREATE TRIGGER after_review_insert
 AFTER INSERT ON Review
@@ -25,8 +37,392 @@ CREATE TRIGGER before_user_delete
 BEFORE DELETE ON Users
 FOR EACH ROW
 BEGIN
-    IF (SELECT COUNT(*) FROM Review WHERE UserID = OLD.UserID) > 0 THEN
+    -- EXISTS stops at the first review instead of counting them all
+    IF EXISTS (SELECT 1 FROM Review WHERE UserID = OLD.UserID) THEN
         SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Cannot delete user with existing reviews';
     END IF;
 END //
 DELIMITER ;
+
+-- ---------------- Rating summaries ----------------
+-- Per-title and per-genre rating totals kept current by the triggers below,
+-- so averages are read from one row instead of aggregating Review.
+-- AVG = RatingSum / RatingCount (RatingCount skips reviews without a rating).
+
+CREATE TABLE Movie_Rating_Stats (
+    MovieID INT PRIMARY KEY,
+    ReviewCount INT NOT NULL DEFAULT 0,
+    RatingCount INT NOT NULL DEFAULT 0,
+    RatingSum INT NOT NULL DEFAULT 0,
+    MinRating INT NULL,
+    MaxRating INT NULL,
+    FOREIGN KEY (MovieID) REFERENCES Movie(MovieID)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE
+);
+
+CREATE TABLE Show_Rating_Stats (
+    ShowID INT PRIMARY KEY,
+    ReviewCount INT NOT NULL DEFAULT 0,
+    RatingCount INT NOT NULL DEFAULT 0,
+    RatingSum INT NOT NULL DEFAULT 0,
+    MinRating INT NULL,
+    MaxRating INT NULL,
+    FOREIGN KEY (ShowID) REFERENCES TV_Show(ShowID)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE
+);
+
+CREATE TABLE Genre_Rating_Stats (
+    GenreID INT PRIMARY KEY,
+    MovieCount INT NOT NULL DEFAULT 0,
+    ShowCount INT NOT NULL DEFAULT 0,
+    ReviewCount INT NOT NULL DEFAULT 0,
+    RatingCount INT NOT NULL DEFAULT 0,
+    RatingSum INT NOT NULL DEFAULT 0,
+    MinRating INT NULL,
+    MaxRating INT NULL,
+    FOREIGN KEY (GenreID) REFERENCES Genre(GenreID)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE
+);
+
+DELIMITER //
+CREATE TRIGGER after_review_insert_stats
+AFTER INSERT ON Review
+FOR EACH ROW
+FOLLOWS after_review_insert
+BEGIN
+    CALL ApplyReviewToStats(NEW.MovieID, NEW.ShowID, NEW.Rating, 1);
+END //
+DELIMITER ;
+
+DELIMITER //
+CREATE TRIGGER after_review_update
+AFTER UPDATE ON Review
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.Rating <=> NEW.Rating AND OLD.MovieID <=> NEW.MovieID AND OLD.ShowID <=> NEW.ShowID) THEN
+        CALL ApplyReviewToStats(OLD.MovieID, OLD.ShowID, OLD.Rating, -1);
+        CALL ApplyReviewToStats(NEW.MovieID, NEW.ShowID, NEW.Rating, 1);
+    END IF;
+END //
+DELIMITER ;
+
+DELIMITER //
+CREATE TRIGGER after_review_delete
+AFTER DELETE ON Review
+FOR EACH ROW
+BEGIN
+    CALL ApplyReviewToStats(OLD.MovieID, OLD.ShowID, OLD.Rating, -1);
+END //
+DELIMITER ;
+
+DELIMITER //
+CREATE TRIGGER after_movie_genre_insert
+AFTER INSERT ON Movie_Genre
+FOR EACH ROW
+BEGIN
+    CALL ApplyTitleToGenreStats(NEW.GenreID, NEW.MovieID, NULL, 1);
+    CALL RefreshTitleDetail(NEW.MovieID, NULL);
+END //
+DELIMITER ;
+
+DELIMITER //
+CREATE TRIGGER after_movie_genre_delete
+AFTER DELETE ON Movie_Genre
+FOR EACH ROW
+BEGIN
+    CALL ApplyTitleToGenreStats(OLD.GenreID, OLD.MovieID, NULL, -1);
+    CALL RefreshTitleDetail(OLD.MovieID, NULL);
+END //
+DELIMITER ;
+
+DELIMITER //
+CREATE TRIGGER after_movie_genre_update
+AFTER UPDATE ON Movie_Genre
+FOR EACH ROW
+BEGIN
+    CALL ApplyTitleToGenreStats(OLD.GenreID, OLD.MovieID, NULL, -1);
+    CALL ApplyTitleToGenreStats(NEW.GenreID, NEW.MovieID, NULL, 1);
+    CALL RefreshTitleDetail(OLD.MovieID, NULL);
+    CALL RefreshTitleDetail(NEW.MovieID, NULL);
+END //
+DELIMITER ;
+
+DELIMITER //
+CREATE TRIGGER after_show_genre_insert
+AFTER INSERT ON Show_Genre
+FOR EACH ROW
+BEGIN
+    CALL ApplyTitleToGenreStats(NEW.GenreID, NULL, NEW.ShowID, 1);
+    CALL RefreshTitleDetail(NULL, NEW.ShowID);
+END //
+DELIMITER ;
+
+DELIMITER //
+CREATE TRIGGER after_show_genre_delete
+AFTER DELETE ON Show_Genre
+FOR EACH ROW
+BEGIN
+    CALL ApplyTitleToGenreStats(OLD.GenreID, NULL, OLD.ShowID, -1);
+    CALL RefreshTitleDetail(NULL, OLD.ShowID);
+END //
+DELIMITER ;
+
+DELIMITER //
+CREATE TRIGGER after_show_genre_update
+AFTER UPDATE ON Show_Genre
+FOR EACH ROW
+BEGIN
+    CALL ApplyTitleToGenreStats(OLD.GenreID, NULL, OLD.ShowID, -1);
+    CALL ApplyTitleToGenreStats(NEW.GenreID, NULL, NEW.ShowID, 1);
+    CALL RefreshTitleDetail(NULL, OLD.ShowID);
+    CALL RefreshTitleDetail(NULL, NEW.ShowID);
+END //
+DELIMITER ;
+
+-- FK cascades do not fire triggers, so unlink genres explicitly before a title
+-- goes away; the genre triggers above then subtract its totals.
+DELIMITER //
+CREATE TRIGGER before_movie_delete
+BEFORE DELETE ON Movie
+FOR EACH ROW
+BEGIN
+    DELETE FROM Movie_Genre WHERE MovieID = OLD.MovieID;
+END //
+DELIMITER ;
+
+DELIMITER //
+CREATE TRIGGER before_show_delete
+BEFORE DELETE ON TV_Show
+FOR EACH ROW
+BEGIN
+    DELETE FROM Show_Genre WHERE ShowID = OLD.ShowID;
+END //
+DELIMITER ;
+
+-- ---------------- Title detail ----------------
+-- One precomputed row per movie and show with its genres, credits, award,
+-- season and episode counts and rating totals, so the detail view reads one
+-- row per title and pages by rating along idx_title_detail_rating. The
+-- triggers below keep it current through RefreshTitleDetail; ApplyReviewToStats
+-- copies rating changes. FK cascades and renamed people or genres fire none of
+-- them: run RebuildTitleDetail() (python cli.py refresh-title-detail) from a
+-- scheduled job to catch up.
+
+CREATE TABLE Title_Detail (
+    TitleType VARCHAR(5) NOT NULL,          -- 'Movie' or 'Show'
+    TitleID INT NOT NULL,                   -- MovieID or ShowID
+    Title VARCHAR(200) NOT NULL,
+    ReleaseDate DATE,                       -- StartDate for shows
+    EndDate DATE,
+    Runtime INT,
+    Language VARCHAR(50),
+    Country VARCHAR(50),
+    Genres VARCHAR(1000),
+    Credits TEXT,                           -- 'Name (RoleType), ...' in RoleID order, up to 1000 bytes
+    CreditCount INT NOT NULL DEFAULT 0,
+    AwardCount INT NOT NULL DEFAULT 0,
+    SeasonCount INT NOT NULL DEFAULT 0,
+    EpisodeCount INT NOT NULL DEFAULT 0,
+    ReviewCount INT NOT NULL DEFAULT 0,
+    RatingCount INT NOT NULL DEFAULT 0,
+    AverageRating DECIMAL(4,2) NULL,
+    -- Sort key: unrated titles last
+    RatingRank DECIMAL(4,2) AS (IFNULL(AverageRating, 0)) STORED NOT NULL,
+    PRIMARY KEY (TitleType, TitleID),
+    INDEX idx_title_detail_rating (RatingRank, TitleType, TitleID)
+);
+
+DELIMITER //
+CREATE TRIGGER after_movie_insert
+AFTER INSERT ON Movie
+FOR EACH ROW
+BEGIN
+    CALL RefreshTitleDetail(NEW.MovieID, NULL);
+END //
+DELIMITER ;
+
+DELIMITER //
+CREATE TRIGGER after_movie_update
+AFTER UPDATE ON Movie
+FOR EACH ROW
+BEGIN
+    DELETE FROM Title_Detail WHERE TitleType = 'Movie' AND TitleID = OLD.MovieID;
+    CALL RefreshTitleDetail(NEW.MovieID, NULL);
+END //
+DELIMITER ;
+
+DELIMITER //
+CREATE TRIGGER after_movie_delete
+AFTER DELETE ON Movie
+FOR EACH ROW
+BEGIN
+    DELETE FROM Title_Detail WHERE TitleType = 'Movie' AND TitleID = OLD.MovieID;
+END //
+DELIMITER ;
+
+DELIMITER //
+CREATE TRIGGER after_show_insert
+AFTER INSERT ON TV_Show
+FOR EACH ROW
+BEGIN
+    CALL RefreshTitleDetail(NULL, NEW.ShowID);
+END //
+DELIMITER ;
+
+DELIMITER //
+CREATE TRIGGER after_show_update
+AFTER UPDATE ON TV_Show
+FOR EACH ROW
+BEGIN
+    DELETE FROM Title_Detail WHERE TitleType = 'Show' AND TitleID = OLD.ShowID;
+    CALL RefreshTitleDetail(NULL, NEW.ShowID);
+END //
+DELIMITER ;
+
+DELIMITER //
+CREATE TRIGGER after_show_delete
+AFTER DELETE ON TV_Show
+FOR EACH ROW
+BEGIN
+    DELETE FROM Title_Detail WHERE TitleType = 'Show' AND TitleID = OLD.ShowID;
+END //
+DELIMITER ;
+
+DELIMITER //
+CREATE TRIGGER after_role_insert
+AFTER INSERT ON Role
+FOR EACH ROW
+BEGIN
+    CALL RefreshTitleDetail(NEW.MovieID, NEW.ShowID);
+END //
+DELIMITER ;
+
+DELIMITER //
+CREATE TRIGGER after_role_update
+AFTER UPDATE ON Role
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.MovieID <=> NEW.MovieID AND OLD.ShowID <=> NEW.ShowID) THEN
+        CALL RefreshTitleDetail(OLD.MovieID, OLD.ShowID);
+    END IF;
+    CALL RefreshTitleDetail(NEW.MovieID, NEW.ShowID);
+END //
+DELIMITER ;
+
+DELIMITER //
+CREATE TRIGGER after_role_delete
+AFTER DELETE ON Role
+FOR EACH ROW
+BEGIN
+    CALL RefreshTitleDetail(OLD.MovieID, OLD.ShowID);
+END //
+DELIMITER ;
+
+-- Awards, seasons and episodes only move counters
+DELIMITER //
+CREATE TRIGGER after_award_winner_insert
+AFTER INSERT ON Award_Winner
+FOR EACH ROW
+BEGIN
+    UPDATE Title_Detail SET AwardCount = AwardCount + 1
+    WHERE (TitleType = 'Movie' AND TitleID = NEW.MovieID) OR (TitleType = 'Show' AND TitleID = NEW.ShowID);
+END //
+DELIMITER ;
+
+DELIMITER //
+CREATE TRIGGER after_award_winner_update
+AFTER UPDATE ON Award_Winner
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.MovieID <=> NEW.MovieID AND OLD.ShowID <=> NEW.ShowID) THEN
+        UPDATE Title_Detail SET AwardCount = AwardCount - 1
+        WHERE (TitleType = 'Movie' AND TitleID = OLD.MovieID) OR (TitleType = 'Show' AND TitleID = OLD.ShowID);
+        UPDATE Title_Detail SET AwardCount = AwardCount + 1
+        WHERE (TitleType = 'Movie' AND TitleID = NEW.MovieID) OR (TitleType = 'Show' AND TitleID = NEW.ShowID);
+    END IF;
+END //
+DELIMITER ;
+
+DELIMITER //
+CREATE TRIGGER after_award_winner_delete
+AFTER DELETE ON Award_Winner
+FOR EACH ROW
+BEGIN
+    UPDATE Title_Detail SET AwardCount = AwardCount - 1
+    WHERE (TitleType = 'Movie' AND TitleID = OLD.MovieID) OR (TitleType = 'Show' AND TitleID = OLD.ShowID);
+END //
+DELIMITER ;
+
+DELIMITER //
+CREATE TRIGGER after_season_insert
+AFTER INSERT ON Season
+FOR EACH ROW
+BEGIN
+    UPDATE Title_Detail SET SeasonCount = SeasonCount + 1
+    WHERE TitleType = 'Show' AND TitleID = NEW.ShowID;
+END //
+DELIMITER ;
+
+-- A season moves or goes with its episodes (deleted by FK cascade, which fires
+-- no Episode trigger), so recount both shows
+DELIMITER //
+CREATE TRIGGER after_season_update
+AFTER UPDATE ON Season
+FOR EACH ROW
+BEGIN
+    IF OLD.ShowID <> NEW.ShowID THEN
+        CALL RefreshTitleDetail(NULL, OLD.ShowID);
+        CALL RefreshTitleDetail(NULL, NEW.ShowID);
+    END IF;
+END //
+DELIMITER ;
+
+DELIMITER //
+CREATE TRIGGER after_season_delete
+AFTER DELETE ON Season
+FOR EACH ROW
+BEGIN
+    CALL RefreshTitleDetail(NULL, OLD.ShowID);
+END //
+DELIMITER ;
+
+DELIMITER //
+CREATE TRIGGER after_episode_insert
+AFTER INSERT ON Episode
+FOR EACH ROW
+BEGIN
+    UPDATE Title_Detail SET EpisodeCount = EpisodeCount + 1
+    WHERE TitleType = 'Show' AND TitleID = (SELECT ShowID FROM Season WHERE SeasonID = NEW.SeasonID);
+END //
+DELIMITER ;
+
+DELIMITER //
+CREATE TRIGGER after_episode_update
+AFTER UPDATE ON Episode
+FOR EACH ROW
+BEGIN
+    IF OLD.SeasonID <> NEW.SeasonID THEN
+        UPDATE Title_Detail SET EpisodeCount = EpisodeCount - 1
+        WHERE TitleType = 'Show' AND TitleID = (SELECT ShowID FROM Season WHERE SeasonID = OLD.SeasonID);
+        UPDATE Title_Detail SET EpisodeCount = EpisodeCount + 1
+        WHERE TitleType = 'Show' AND TitleID = (SELECT ShowID FROM Season WHERE SeasonID = NEW.SeasonID);
+    END IF;
+END //
+DELIMITER ;
+
+DELIMITER //
+CREATE TRIGGER after_episode_delete
+AFTER DELETE ON Episode
+FOR EACH ROW
+BEGIN
+    UPDATE Title_Detail SET EpisodeCount = EpisodeCount - 1
+    WHERE TitleType = 'Show' AND TitleID = (SELECT ShowID FROM Season WHERE SeasonID = OLD.SeasonID);
+END //
+DELIMITER ;
+
+-- Seed the summaries and the title details from the rows inserted by cinebase_schema.sql
+CALL RebuildRatingStats();
+CALL RebuildTitleDetail();
@@ -0,0 +1,67 @@
+from paging import KeysetPager, keyset_condition
+
+
+def test_single_column():
+    assert keyset_condition(["MovieID"], ">", (5,)) == ("(MovieID > %s)", [5])
+    assert keyset_condition(["MovieID"], "<", (5,)) == ("((MovieID < %s OR MovieID IS NULL))", [5])
+
+
+def test_composite_key_expands_to_index_range():
+    sql, params = keyset_condition(["a", "b", "c"], ">", (1, 2, 3))
+    assert sql == "(a > %s) OR (a = %s AND b > %s) OR (a = %s AND b = %s AND c > %s)"
+    assert params == [1, 1, 2, 1, 2, 3]
+
+
+def test_null_sorts_first_ascending():
+    # MySQL sorts NULL before any value, so after NULL come all non-NULL values
+    sql, params = keyset_condition(["a", "b"], ">", (None, 7))
+    assert sql == "(a IS NOT NULL) OR (a IS NULL AND b > %s)"
+    assert params == [7]
+
+
+def test_null_sorts_last_descending():
+    # Nothing follows NULL in descending order in its own column
+    sql, params = keyset_condition(["a", "b"], "<", (None, 7))
+    assert sql == "(a IS NULL AND (b < %s OR b IS NULL))"
+    assert params == [7]
+    assert keyset_condition(["a"], "<", (None,)) == ("FALSE", [])
+
+
+class Cursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.description = [("a",), ("b",)]
+
+    def execute(self, sql, params):
+        self.sql, self.params = sql, params
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class Connection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.cursors = []
+
+    def cursor(self):
+        self.cursors.append(Cursor(self.rows))
+        return self.cursors[-1]
+
+
+def test_keyset_pager_continues_after_null_key():
+    conn = Connection([(1, None), (2, 5)])
+    pager = KeysetPager("T", ["b", "a"], page_size=2, descending=True)
+    assert pager.next_page(conn) == [(1, None), (2, 5)]
+    assert pager.last_key == (5, 2)
+    pager.last_key = (None, 1)
+    conn.rows = [(0, None)]
+    assert pager.next_page(conn) == [(0, None)]
+    sql, params = conn.cursors[-1].sql, conn.cursors[-1].params
+    assert "WHERE ((b IS NULL AND (a < %s OR a IS NULL)))" in sql
+    assert sql.endswith("ORDER BY b DESC, a DESC LIMIT 2")
+    assert params == [1]
+    assert pager.at_end
@@ -0,0 +1,66 @@
+from result_cache import affected_tables, normalize_sql, tables_read
+
+
+def test_normalize_collapses_whitespace_and_semicolon():
+    assert normalize_sql("SELECT *\r\n  FROM\tMovie ;\n") == "SELECT * FROM Movie"
+
+
+def test_normalize_keeps_whitespace_inside_literals():
+    assert normalize_sql("SELECT 'a   b'  FROM Movie") == "SELECT 'a   b' FROM Movie"
+    assert normalize_sql('SELECT "x\t y"') == 'SELECT "x\t y"'
+    assert normalize_sql("SELECT 'a  b' , 'c  d'") == "SELECT 'a  b' , 'c  d'"
+
+
+def test_normalize_quotes_inside_literals():
+    # doubled and escaped quotes do not end the literal
+    assert normalize_sql("SELECT 'it''s   here'  ,  1") == "SELECT 'it''s   here' , 1"
+    assert normalize_sql(r"SELECT 'it\'s   here'  ,  1") == r"SELECT 'it\'s   here' , 1"
+    assert normalize_sql("""SELECT "say ""hi""  there"  ,  1""") == """SELECT "say ""hi""  there" , 1"""
+
+
+def test_normalize_distinguishes_literals():
+    assert normalize_sql("SELECT 'a  b'") != normalize_sql("SELECT 'a b'")
+
+
+def test_tables_read_from_and_join():
+    sql = "SELECT * FROM Movie m JOIN Movie_Genre mg ON m.MovieID = mg.MovieID LEFT JOIN `Genre` g USING (GenreID)"
+    assert tables_read(sql) == {"movie", "movie_genre", "genre"}
+
+
+def test_tables_read_unaliased_join():
+    # JOIN right after a table name is not its alias
+    assert tables_read("SELECT * FROM Movie JOIN Review USING (MovieID) STRAIGHT_JOIN Users") == \
+        {"movie", "review", "users"}
+    assert tables_read("SELECT * FROM Movie AS JOINED JOIN Review") == {"movie", "review"}
+
+
+def test_tables_read_comma_list_with_aliases():
+    assert tables_read("SELECT * FROM Movie m, Review AS r, Users WHERE r.UserID = Users.UserID") == \
+        {"movie", "review", "users"}
+    assert tables_read("select 1 from Movie as m , Review r where 1") == {"movie", "review"}
+
+
+def test_tables_read_subqueries():
+    sql = ("SELECT Username FROM Users WHERE UserID IN (SELECT UserID FROM Review "
+           "WHERE MovieID IN (SELECT MovieID FROM Award_Winner))")
+    assert tables_read(sql) == {"users", "review", "award_winner"}
+    assert tables_read("SELECT * FROM (SELECT MovieID FROM Movie) AS t") == {"movie"}
+
+
+def test_tables_read_qualified_names():
+    assert tables_read("SELECT * FROM cinebase.Movie m JOIN `cinebase`.`Review` r USING (MovieID)") == \
+        {"movie", "review"}
+
+
+def test_tables_read_straight_join():
+    assert tables_read("SELECT * FROM Movie STRAIGHT_JOIN Review") == {"movie", "review"}
+
+
+def test_tables_read_ignores_literals():
+    assert tables_read("SELECT 'rows from nowhere' FROM Movie WHERE Title = 'join me'") == {"movie"}
+
+
+def test_affected_tables_follows_triggers():
+    affected = affected_tables(["Review"])
+    assert {"review", "review_log", "movie_rating_stats", "title_detail"} <= affected
+    assert affected_tables(["Users"]) == {"users"}
@@ -0,0 +1,85 @@
+from search import TrigramIndex, boolean_query, merge_results, normalize, padded, trigrams
+
+
+def test_normalize_strips_accents_case_and_punctuation():
+    assert normalize("  Amélie: Le Fabuleux—Destin!! ") == "amelie le fabuleux destin"
+    assert normalize("ÆON Flux") == "æon flux"
+    assert normalize("!!!") == ""
+
+
+def test_trigrams_pad_word_starts():
+    assert trigrams("Up") == {"  u", " up", "up "}
+    assert trigrams("up", prefix=True) == {"  u", " up"}
+    assert trigrams("") == set()
+
+
+def test_every_word_trigram_is_in_the_padded_key():
+    words = normalize("The Dark Knight Rises").split()
+    key = padded(words)
+    assert all(g in key for g in trigrams("The Dark Knight Rises"))
+
+
+def test_boolean_query_drops_operators():
+    assert boolean_query("star wa") == "+star* +wa*"
+    assert boolean_query('"-star+ (wars)*') == "+star* +wars*"
+    assert boolean_query("+-*") == ""
+
+
+class Cursor:
+    def __init__(self, rows):
+        self.rows = list(rows)
+
+    def execute(self, sql, params=()):
+        self.table = sql.split(" FROM ")[1].split()[0]
+
+    def fetchmany(self, size):
+        rows = [r for t, r in self.rows if t == self.table]
+        self.rows = [(t, r) for t, r in self.rows if t != self.table]
+        return rows
+
+    def close(self):
+        pass
+
+
+class Connection:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def cursor(self):
+        return Cursor(self.rows)
+
+
+def built_index():
+    index = TrigramIndex()
+    index.build(Connection([
+        ("Movie", (1, "The Dark Knight")),
+        ("Movie", (2, "Dark Water")),
+        ("Movie", (3, "Amélie")),
+        ("TV_Show", (4, "Stranger Things")),
+        ("Person", (5, "Christopher Nolan")),
+        ("Person", (6, "???")),
+    ]))
+    return index
+
+
+def test_index_search_ranks_word_starts_and_tolerates_typos():
+    index = built_index()
+    assert len(index) == 6 and index.ready
+    assert [r[1] for r in index.search("dark")][:2] == [2, 1]      # shorter name first on a tie
+    assert index.search("nolen")[0][:3] == ("Person", 5, "Christopher Nolan")
+    assert index.search("amelie")[0][1] == 3
+    assert index.search("strang")[0][1] == 4       # unfinished last word
+
+
+def test_index_search_empty_inputs():
+    assert TrigramIndex().search("dark") == []
+    assert built_index().search("  !! ") == []
+    assert built_index().search("zzzz") == []
+
+
+def test_merge_results_prefers_fulltext_hits():
+    fuzzy = [("Movie", 1, "The Dark Knight", 0.9), ("Movie", 2, "Dark Water", 0.95)]
+    fulltext = [("Movie", 1, "The Dark Knight", 3.2), ("Person", 5, "Dark", 1.0)]
+    merged = merge_results(fuzzy, fulltext)
+    assert [r[:2] for r in merged] == [("Movie", 1), ("Person", 5), ("Movie", 2)]
+    assert merged[0][3] == 1.9
@@ -0,0 +1,354 @@
+"""
+A virtualized table widget for large result sets.
+
+ttk.Treeview creates a Tk item per row, which makes inserting half a million
+rows far slower than fetching them. VirtualGrid keeps rows in a ColumnBuffer
+(one Python list per column) and draws only the rows in the viewport plus a
+small overscan on a Canvas, reusing the same canvas items while scrolling.
+"""
+
+from tkinter import *
+from tkinter import ttk
+import tkinter.font as tkfont
+
+OVERSCAN = 2            # extra rows drawn below the viewport
+ROW_PAD = 6
+STRIPE = "#f5f5f5"
+SELECT_BG = "#cce4ff"
+FOCUS_OUTLINE = "#3b82f6"
+HEADER_BG = "#e6e6e6"
+
+
+def display(value):
+    return "" if value is None else str(value)
+
+
+class ColumnBuffer:
+    """Rows stored column-wise: `columns[c][i]` is the value of column c in row i."""
+
+    def __init__(self, names=()):
+        self.names = list(names)
+        self.columns = [[] for _ in self.names]
+
+    def __len__(self):
+        return len(self.columns[0]) if self.columns else 0
+
+    def reset(self, names):
+        self.names = list(names)
+        self.columns = [[] for _ in self.names]
+
+    def append(self, rows):
+        for c, col in enumerate(self.columns):
+            col.extend(row[c] for row in rows)
+
+    def prepend(self, rows):
+        for c, col in enumerate(self.columns):
+            col[:0] = [row[c] for row in rows]
+
+    def drop_front(self, n):
+        for col in self.columns:
+            del col[:n]
+
+    def drop_back(self, n):
+        if n > 0:
+            for col in self.columns:
+                del col[-n:]
+
+    def row(self, i):
+        return tuple(col[i] for col in self.columns)
+
+    def cell(self, i, c):
+        return self.columns[c][i]
+
+
+class VirtualGrid(Frame):
+    """
+    Scrollable grid over a ColumnBuffer. Rows are addressed by their index in
+    the buffer. Supports click / Ctrl-click / Shift-click selection and
+    keyboard navigation; `<<GridSelect>>` is generated when the selection changes.
+
+    `view_command(top, bottom, total)` is called whenever the visible range changes,
+    so a pager can fetch more rows as the user nears either end of the buffer.
+    """
+
+    def __init__(self, master, col_width=120, anchor="w", view_command=None, **kw):
+        super().__init__(master, **kw)
+        self.buffer = ColumnBuffer()
+        self.col_width = col_width
+        self.anchor = anchor
+        self.view_command = view_command
+        self.widths = []
+        self.top = 0                    # index of the first visible row
+        self.focus_index = None
+        self.selection = set()
+        self._anchor_index = None       # start of a Shift-click range
+
+        self.font = tkfont.nametofont("TkDefaultFont")
+        self.row_height = self.font.metrics("linespace") + ROW_PAD
+
+        self.header = Canvas(self, height=self.row_height, bg=HEADER_BG, highlightthickness=0)
+        self.body = Canvas(self, bg="white", highlightthickness=0, takefocus=1)
+        self.vsb = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.hsb = ttk.Scrollbar(self, orient="horizontal", command=self.xview)
+        self.body.configure(xscrollcommand=self._on_xscroll)
+
+        self.header.grid(row=0, column=0, sticky="ew")
+        self.body.grid(row=1, column=0, sticky="nsew")
+        self.vsb.grid(row=0, column=1, rowspan=2, sticky="ns")
+        self.hsb.grid(row=2, column=0, sticky="ew")
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self._cells = []                # canvas text items, [visible row][column]
+        self._bands = []                # row background rectangles
+        self._visible = 0
+
+        self.body.bind("<Configure>", lambda e: self._layout())
+        self.body.bind("<Button-1>", self._on_click)
+        self.body.bind("<Control-Button-1>", self._on_ctrl_click)
+        self.body.bind("<Shift-Button-1>", self._on_shift_click)
+        self.body.bind("<MouseWheel>", self._on_wheel)
+        self.body.bind("<Button-4>", lambda e: self.scroll_rows(-3))
+        self.body.bind("<Button-5>", lambda e: self.scroll_rows(3))
+        self.body.bind("<Up>", lambda e: self._move_focus(-1))
+        self.body.bind("<Down>", lambda e: self._move_focus(1))
+        self.body.bind("<Prior>", lambda e: self._move_focus(-max(self._page_rows(), 1)))
+        self.body.bind("<Next>", lambda e: self._move_focus(max(self._page_rows(), 1)))
+        self.body.bind("<Home>", lambda e: self._move_focus(-len(self.buffer)))
+        self.body.bind("<End>", lambda e: self._move_focus(len(self.buffer)))
+
+    # ---------------- Data ----------------
+    def set_columns(self, names, widths=None):
+        """Replace columns and rows."""
+        self.buffer.reset(names)
+        self.widths = list(widths) if widths else [self.col_width] * len(names)
+        self.top = 0
+        self.focus_index = None
+        self.selection = set()
+        self._anchor_index = None
+        self._build_cells()
+        self._draw_header()
+        self.render()
+
+    @property
+    def columns(self):
+        return self.buffer.names
+
+    def __len__(self):
+        return len(self.buffer)
+
+    def append_rows(self, rows):
+        self.buffer.append(rows)
+        self.render()
+
+    def prepend_rows(self, rows):
+        """Insert rows above the current ones, keeping the same rows in view."""
+        n = len(rows)
+        self.buffer.prepend(rows)
+        self._shift(n)
+        self.render()
+
+    def drop_front(self, n):
+        """Forget the first n rows, keeping the same rows in view."""
+        n = min(n, len(self.buffer))
+        self.buffer.drop_front(n)
+        self._shift(-n)
+        self.render()
+
+    def drop_back(self, n):
+        n = min(n, len(self.buffer))
+        self.buffer.drop_back(n)
+        total = len(self.buffer)
+        self.selection = {i for i in self.selection if i < total}
+        if self.focus_index is not None and self.focus_index >= total:
+            self.focus_index = None
+        self.render()
+
+    def _shift(self, n):
+        self.top = max(self.top + n, 0)
+        self.selection = {i + n for i in self.selection if i + n >= 0}
+        if self.focus_index is not None:
+            self.focus_index = self.focus_index + n if self.focus_index + n >= 0 else None
+        if self._anchor_index is not None:
+            self._anchor_index = self._anchor_index + n if self._anchor_index + n >= 0 else None
+
+    def row(self, index):
+        return self.buffer.row(index)
+
+    def focus(self):
+        """Index of the focused row, or None."""
+        return self.focus_index
+
+    def selected_indices(self):
+        return sorted(self.selection)
+
+    def selected_rows(self):
+        return [self.buffer.row(i) for i in sorted(self.selection)]
+
+    # ---------------- Scrolling ----------------
+    def _page_rows(self):
+        return max(self.body.winfo_height() // self.row_height, 1)
+
+    def _max_top(self):
+        return max(len(self.buffer) - self._page_rows(), 0)
+
+    def scroll_to(self, top):
+        top = min(max(int(top), 0), self._max_top())
+        if top != self.top:
+            self.top = top
+            self.render()
+
+    def scroll_rows(self, n):
+        self.scroll_to(self.top + n)
+
+    def at_end(self):
+        """True when the last row is in view (or there are no rows)."""
+        return self.top >= self._max_top()
+
+    def see(self, index):
+        if index < self.top:
+            self.scroll_to(index)
+        elif index >= self.top + self._page_rows():
+            self.scroll_to(index - self._page_rows() + 1)
+
+    def yview(self, *args):
+        """Scrollbar protocol: ("moveto", fraction) or ("scroll", n, "units"|"pages")."""
+        if not args:
+            return self._fractions()
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * len(self.buffer))
+        elif args[0] == "scroll":
+            n = int(args[1])
+            self.scroll_rows(n * self._page_rows() if args[2] == "pages" else n)
+
+    def xview(self, *args):
+        if not args:
+            return self.body.xview()
+        self.body.xview(*args)
+
+    def _on_xscroll(self, first, last):
+        """The body scrolled or was resized: move the scrollbar and keep the header over the same columns."""
+        self.hsb.set(first, last)
+        self.header.xview_moveto(first)
+
+    def _fractions(self):
+        total = len(self.buffer)
+        if not total:
+            return 0.0, 1.0
+        return self.top / total, min((self.top + self._page_rows()) / total, 1.0)
+
+    def _on_wheel(self, event):
+        step = -1 if event.delta > 0 else 1
+        self.scroll_rows(step * 3)
+
+    # ---------------- Selection ----------------
+    def _index_at(self, y):
+        index = self.top + int(self.body.canvasy(y)) // self.row_height
+        return index if 0 <= index < len(self.buffer) else None
+
+    def _select(self, index, mode):
+        if index is None:
+            return
+        if mode == "toggle":
+            self.selection ^= {index}
+            self._anchor_index = index
+        elif mode == "range" and self._anchor_index is not None:
+            lo, hi = sorted((self._anchor_index, index))
+            self.selection = set(range(lo, hi + 1))
+        else:
+            self.selection = {index}
+            self._anchor_index = index
+        self.focus_index = index
+        self.body.focus_set()
+        self.render()
+        self.event_generate("<<GridSelect>>")
+
+    def _on_click(self, event):
+        self._select(self._index_at(event.y), "single")
+
+    def _on_ctrl_click(self, event):
+        self._select(self._index_at(event.y), "toggle")
+        return "break"
+
+    def _on_shift_click(self, event):
+        self._select(self._index_at(event.y), "range")
+        return "break"
+
+    def _move_focus(self, n):
+        if not len(self.buffer):
+            return
+        current = self.focus_index if self.focus_index is not None else self.top
+        index = min(max(current + n, 0), len(self.buffer) - 1)
+        self._select(index, "single")
+        self.see(index)
+
+    # ---------------- Drawing ----------------
+    def _col_x(self):
+        xs = [0]
+        for w in self.widths:
+            xs.append(xs[-1] + w)
+        return xs
+
+    def _text_pos(self, x0, width):
+        if self.anchor == "center":
+            return x0 + width / 2
+        if self.anchor == "e":
+            return x0 + width - 4
+        return x0 + 4
+
+    def _draw_header(self):
+        self.header.delete("all")
+        xs = self._col_x()
+        for c, name in enumerate(self.buffer.names):
+            self.header.create_rectangle(xs[c], 0, xs[c + 1], self.row_height, outline="#c0c0c0", fill=HEADER_BG)
+            self.header.create_text(self._text_pos(xs[c], self.widths[c]), self.row_height / 2, text=name,
+                                    anchor=self.anchor if self.anchor != "center" else "center",
+                                    font=(self.font.actual("family"), self.font.actual("size"), "bold"))
+        width = xs[-1]
+        self.header.configure(scrollregion=(0, 0, width, self.row_height))
+
+    def _build_cells(self):
+        """(Re)create the pool of canvas items for one screenful of rows."""
+        self.body.delete("all")
+        self._cells = []
+        self._bands = []
+        xs = self._col_x()
+        self._visible = self._page_rows() + OVERSCAN
+        text_anchor = self.anchor if self.anchor != "center" else "center"
+        for r in range(self._visible):
+            y0 = r * self.row_height
+            self._bands.append(self.body.create_rectangle(0, y0, xs[-1], y0 + self.row_height, width=0))
+            self._cells.append([
+                self.body.create_text(self._text_pos(xs[c], self.widths[c]), y0 + self.row_height / 2,
+                                      anchor=text_anchor, font=self.font)
+                for c in range(len(self.widths))
+            ])
+        self.body.configure(scrollregion=(0, 0, xs[-1], self._visible * self.row_height))
+
+    def _layout(self):
+        if self._page_rows() + OVERSCAN != self._visible:
+            self._build_cells()
+        self.top = min(self.top, self._max_top())
+        self.render()
+
+    def render(self):
+        """Draw the rows currently in the viewport into the reusable canvas items."""
+        total = len(self.buffer)
+        columns = self.buffer.columns
+        for r, cells in enumerate(self._cells):
+            i = self.top + r
+            band = self._bands[r]
+            if i < total:
+                fill = SELECT_BG if i in self.selection else (STRIPE if i % 2 else "white")
+                self.body.itemconfigure(band, fill=fill, outline=FOCUS_OUTLINE if i == self.focus_index else "",
+                                        width=1 if i == self.focus_index else 0)
+                for c, item in enumerate(cells):
+                    self.body.itemconfigure(item, text=display(columns[c][i]))
+            else:
+                self.body.itemconfigure(band, fill="white", outline="", width=0)
+                for item in cells:
+                    self.body.itemconfigure(item, text="")
+        first, last = self._fractions()
+        self.vsb.set(first, last)
+        if self.view_command is not None:
+            self.view_command(self.top, min(self.top + self._page_rows(), total), total)